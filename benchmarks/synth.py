@@ -0,0 +1,319 @@
+"""Synthesis benchmarks for the nimbus_lib stacks.
+
+Every case builds stacks from generated configs in a fresh interpreter so
+that peak RSS and jsii start-up are measured per case.
+
+    python -m benchmarks.synth                    # print results
+    python -m benchmarks.synth --update-baseline  # rewrite baseline.json
+
+Lookups (``Vpc.from_lookup``/``HostedZone.from_lookup``) are not provided
+with context, so CDK resolves them to its dummy values and nothing touches
+the network.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess  # nosec
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+SIZES = (1, 10, 50)
+
+# Allowed growth over the stored baseline before a case counts as a
+# regression. Timings are noisy, structural metrics are deterministic.
+TOLERANCES = {
+    "import_seconds": 1.5,
+    "wall_seconds": 1.5,
+    "peak_rss_kib": 1.25,
+    "construct_count": 1.1,
+    "template_bytes": 1.1,
+}
+# Timings and RSS depend on the machine that recorded the baseline, so
+# they only gate when this is set (e.g. on the machine that wrote it)
+TIMINGS_ENV = "NIMBUS_BENCH_TIMINGS"
+MACHINE_METRICS = ("import_seconds", "wall_seconds", "peak_rss_kib")
+# Absolute headroom so sub-second timings do not flap
+SLACK = {
+    "import_seconds": 1.0,
+    "wall_seconds": 1.0,
+}
+
+ACCOUNT = "123456789012"
+REGION = "us-east-1"
+VPC_ID = "vpc-12345678"
+
+
+def _common(kind: str, size: int) -> dict[str, Any]:
+    return {
+        "stack_name": f"Bench{kind.capitalize()}{size}",
+        "env": "bench",
+        "account": ACCOUNT,
+        "region": REGION,
+    }
+
+
+def _allowlist(size: int) -> list[str]:
+    return [f"10.{idx // 256}.{idx % 256}.0/24" for idx in range(size)]
+
+
+def _ingress_confs(size: int) -> list:
+    from nimbus_lib import config as confs
+
+    return [
+        confs.IngressConfig(security_group_id=f"sg-{idx:08x}", port=5432)
+        for idx in range(size)
+    ]
+
+
+def fargate_config(size: int, name: str = "fargate"):
+    from nimbus_lib import config as confs
+
+    return confs.FargateConfig(
+        **_common(name, size),
+        vpc_id=VPC_ID,
+        container=confs.ContainerConfig(
+            port=8080,
+            image="nginx",
+            volumes=[
+                confs.VolumeConfig(
+                    path=f"/data/{idx}", filesys_id="fs-12345678"
+                )
+                for idx in range(size)
+            ],
+        ),
+        domains=[
+            confs.DomainConfig(domain="example.com", subdomain=f"svc{idx}")
+            for idx in range(size)
+        ],
+        ingress_confs=_ingress_confs(size),
+        ip_allowlist=_allowlist(size),
+    )
+
+
+def rds_config(size: int):
+    from nimbus_lib import config as confs
+
+    return confs.RdsConfig(**_common("rds", size), vpc_id=VPC_ID)
+
+
+def vpc_config(size: int):
+    from nimbus_lib import config as confs
+
+    return confs.VpcConfig(
+        **_common("vpc", size),
+        subnets=[
+            confs.SubnetConfig(
+                name=f"Subnet{idx}",
+                subnet_type="PUBLIC" if idx == 0 else "PRIVATE_ISOLATED",
+            )
+            for idx in range(size)
+        ],
+    )
+
+
+def bastion_config(size: int):
+    from nimbus_lib import config as confs
+
+    return confs.BastionConfig(
+        **_common("bastion", size),
+        vpc_id=VPC_ID,
+        key_pair_name="bench",
+        ingress_confs=_ingress_confs(size),
+        ip_allowlist=_allowlist(size),
+    )
+
+
+def _build_fargate(app, env, size: int) -> list:
+    from nimbus_lib.stacks.fargate_stack import FargateStack
+
+    return [FargateStack(app, fargate_config(size), env=env)]
+
+
+def _build_rds(app, env, size: int) -> list:
+    from nimbus_lib.stacks.rds_stack import RdsStack
+
+    return [RdsStack(app, rds_config(size), env=env)]
+
+
+def _build_vpc(app, env, size: int) -> list:
+    from nimbus_lib.stacks.vpc_stack import VpcStack
+
+    return [VpcStack(app, vpc_config(size), env=env)]
+
+
+def _build_bastion(app, env, size: int) -> list:
+    from nimbus_lib.stacks.bastion_stack import BastionStack
+
+    return [BastionStack(app, bastion_config(size), env=env)]
+
+
+def _build_app(app, env, size: int) -> list:
+    # Many small services in a single app
+    from nimbus_lib.stacks.fargate_stack import FargateStack
+
+    return [
+        FargateStack(app, fargate_config(1, f"service{idx}"), env=env)
+        for idx in range(size)
+    ]
+
+
+BUILDERS: dict[str, Callable[[Any, Any, int], list]] = {
+    "fargate": _build_fargate,
+    "rds": _build_rds,
+    "vpc": _build_vpc,
+    "bastion": _build_bastion,
+    "app": _build_app,
+}
+
+
+def cases() -> list[tuple[str, int]]:
+    # The RDS stack has no list-valued settings to grow
+    return [
+        (kind, size)
+        for kind in BUILDERS
+        for size in SIZES
+        if kind != "rds" or size == 1
+    ]
+
+
+def case_name(kind: str, size: int) -> str:
+    return f"{kind}-{size}"
+
+
+def _children_peak_rss_kib() -> int:
+    # The jsii runtime is a node child process; add its high water mark.
+    pid = os.getpid()
+    total = 0
+    try:
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text()
+    except OSError:
+        return 0
+
+    for child in children.split():
+        try:
+            status = Path(f"/proc/{child}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmHWM:"):
+                total += int(line.split()[1])
+    return total
+
+
+def measure(kind: str, size: int) -> dict[str, float | int]:
+    start = time.perf_counter()
+
+    # pylint: disable=import-outside-toplevel,unused-import
+    from aws_cdk import App, Environment
+    import nimbus_lib.stacks  # noqa: F401
+
+    import_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+
+    app = App()
+    env = Environment(account=ACCOUNT, region=REGION)
+    stacks = BUILDERS[kind](app, env, size)
+    assembly = app.synth()
+
+    wall_seconds = time.perf_counter() - start
+
+    template_bytes = 0
+    construct_count = 0
+    for stack in stacks:
+        artifact = assembly.get_stack_artifact(stack.artifact_id)
+        template_bytes += len(json.dumps(artifact.template))
+        construct_count += len(stack.node.find_all())
+
+    return {
+        "import_seconds": round(import_seconds, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_kib": (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            + _children_peak_rss_kib()
+        ),
+        "construct_count": construct_count,
+        "template_bytes": template_bytes,
+    }
+
+
+def run_case(kind: str, size: int) -> dict[str, float | int]:
+    # A fresh interpreter per case keeps jsii and peak RSS independent
+    result = subprocess.run(  # nosec
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.synth",
+            "--case",
+            case_name(kind, size),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def load_baseline() -> dict[str, dict[str, float | int]]:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+def check_timings() -> bool:
+    return os.environ.get(TIMINGS_ENV, "") not in ("", "0")
+
+
+def regressions(
+    result: dict[str, float | int],
+    baseline: dict[str, float | int],
+    timings: bool = False,
+) -> list[str]:
+    failures = []
+    for metric, tolerance in TOLERANCES.items():
+        if metric in MACHINE_METRICS and not timings:
+            continue
+        limit = baseline[metric] * tolerance + SLACK.get(metric, 0)
+        if result[metric] > limit:
+            failures.append(
+                f"{metric}: {result[metric]} > {limit:.3f} "
+                f"(baseline {baseline[metric]} x {tolerance})"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--case", help="run a single case, e.g. fargate-10")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help=f"write the results to {BASELINE_PATH.name}",
+    )
+    args = parser.parse_args()
+
+    if args.case:
+        kind, size = args.case.rsplit("-", 1)
+        print(json.dumps(measure(kind, int(size))))
+        return
+
+    results = {}
+    for kind, size in cases():
+        name = case_name(kind, size)
+        results[name] = run_case(kind, size)
+        print(name, json.dumps(results[name]))
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(
+            json.dumps(results, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
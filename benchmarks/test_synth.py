@@ -0,0 +1,20 @@
+import pytest
+from benchmarks import synth
+
+
+@pytest.mark.parametrize(
+    "kind,size",
+    synth.cases(),
+    ids=[synth.case_name(kind, size) for kind, size in synth.cases()],
+)
+def test_synth_benchmark(kind, size):
+    baseline = synth.load_baseline().get(synth.case_name(kind, size))
+    result = synth.run_case(kind, size)
+
+    if baseline is None:
+        pytest.skip(f"no baseline for {synth.case_name(kind, size)}")
+
+    failures = synth.regressions(
+        result, baseline, timings=synth.check_timings()
+    )
+    assert not failures, "\n".join(failures)
@@ -1,25 +1,106 @@
 from .components import (
     ContainerImageSource,
+    CpuArchitecture,
+    CdnConfig,
+    CdnPathConfig,
+    DependencyConfig,
     DomainConfig,
+    Ec2Config,
+    FileSystemConfig,
+    HealthCheckConfig,
+    AccessPointConfig,
+    AuroraConfig,
+    BlueGreenConfig,
+    CapacityConfig,
+    DeploymentConfig,
     ScalingConfig,
+    ScalingPolicy,
+    ScalingStepConfig,
+    CpuScalingPolicy,
+    MemoryScalingPolicy,
+    RequestCountScalingPolicy,
+    ResponseTimeScalingPolicy,
+    StepScalingPolicy,
+    BaseContainerConfig,
     ContainerConfig,
+    ContainerHealthCheckConfig,
+    TaskConfig,
     SecretConfig,
+    SidecarConfig,
     IngressConfig,
+    LoggingConfig,
+    NestingConfig,
+    ObservabilityConfig,
+    PrefixListConfig,
+    ProxyConfig,
+    ReadReplicaConfig,
+    RoutingConfig,
     SubnetConfig,
+    UlimitConfig,
+    VolumeConfig,
 )
-from .stacks import VpcConfig, FargateConfig, RdsConfig, BastionConfig
+from .stacks import (
+    VpcConfig,
+    FargateConfig,
+    RdsConfig,
+    BastionConfig,
+    CacheConfig,
+    LoadBalancedConfig,
+    SharedAlbConfig,
+)
+from .manifest import Manifest, load_manifest
+from .allowlist import AllowlistReport, compile_allowlist
 
 
 __all__ = [
     "ContainerImageSource",
+    "CpuArchitecture",
+    "CdnConfig",
+    "CdnPathConfig",
+    "DependencyConfig",
     "DomainConfig",
+    "Ec2Config",
+    "FileSystemConfig",
+    "HealthCheckConfig",
+    "AccessPointConfig",
+    "AuroraConfig",
+    "BlueGreenConfig",
+    "CapacityConfig",
+    "DeploymentConfig",
     "ScalingConfig",
+    "ScalingPolicy",
+    "ScalingStepConfig",
+    "CpuScalingPolicy",
+    "MemoryScalingPolicy",
+    "RequestCountScalingPolicy",
+    "ResponseTimeScalingPolicy",
+    "StepScalingPolicy",
+    "BaseContainerConfig",
     "ContainerConfig",
+    "ContainerHealthCheckConfig",
+    "TaskConfig",
     "SecretConfig",
+    "SidecarConfig",
     "IngressConfig",
+    "LoggingConfig",
+    "NestingConfig",
+    "ObservabilityConfig",
+    "PrefixListConfig",
+    "ProxyConfig",
+    "ReadReplicaConfig",
+    "RoutingConfig",
     "SubnetConfig",
+    "UlimitConfig",
+    "VolumeConfig",
     "VpcConfig",
     "FargateConfig",
     "RdsConfig",
     "BastionConfig",
+    "CacheConfig",
+    "LoadBalancedConfig",
+    "SharedAlbConfig",
+    "Manifest",
+    "load_manifest",
+    "AllowlistReport",
+    "compile_allowlist",
 ]
@@ -0,0 +1,80 @@
+"""Compile ``ip_allowlist`` entries into the fewest CIDRs.
+
+Every allowlist CIDR becomes one security group rule per port, and
+security groups default to 60 inbound rules per address family.
+Normalizing entries ("10.0.0.7" -> "10.0.0.7/32"), dropping duplicates
+and collapsing adjacent or overlapping networks keeps large allowlists
+under that quota and out of the template.
+"""
+from dataclasses import dataclass
+from ipaddress import IPv4Network, IPv6Network, collapse_addresses, ip_network
+from typing import Annotated, Iterable
+
+from pydantic import AfterValidator
+
+
+def parse_entry(entry: str) -> IPv4Network | IPv6Network:
+    # Host bits are dropped: "10.0.0.7/24" allows 10.0.0.0/24
+    return ip_network(entry.strip(), strict=False)
+
+
+def check_allowlist(entries: list[str]) -> list[str]:
+    for entry in entries:
+        try:
+            parse_entry(entry)
+        except ValueError as exc:
+            raise ValueError(f"invalid allowlist entry: {entry!r}") from exc
+    return entries
+
+
+IpAllowlist = Annotated[list[str], AfterValidator(check_allowlist)]
+
+
+def compile_allowlist(entries: Iterable[str]) -> list[str]:
+    """The minimal set of CIDRs covering entries, IPv4 before IPv6."""
+    networks = [parse_entry(entry) for entry in entries]
+    ipv4 = collapse_addresses(
+        net for net in networks if isinstance(net, IPv4Network)
+    )
+    ipv6 = collapse_addresses(
+        net for net in networks if isinstance(net, IPv6Network)
+    )
+    return [str(net) for net in (*ipv4, *ipv6)]
+
+
+def address_families(cidrs: Iterable[str]) -> list[int]:
+    return sorted({parse_entry(cidr).version for cidr in cidrs})
+
+
+@dataclass(frozen=True)
+class AllowlistReport:
+    entries: int
+    cidrs: int
+    # Security group rules for the allowlist across all ports
+    rules_before: int
+    rules_after: int
+
+    def __str__(self) -> str:
+        return (
+            f"allowlist: {self.entries} entries -> {self.cidrs} CIDRs, "
+            f"{self.rules_before} -> {self.rules_after} rules"
+        )
+
+
+def allowlist_report(
+    entries: list[str], ports: int, prefix_lists: int | None = None
+) -> AllowlistReport:
+    """Rule counts for entries on ``ports`` ports.
+
+    With ``prefix_lists`` each port gets one rule per prefix list instead
+    of one per CIDR. Note that a rule referencing a prefix list still
+    counts its max entries against the security group quota.
+    """
+    cidrs = compile_allowlist(entries)
+    per_port = len(cidrs) if prefix_lists is None else prefix_lists
+    return AllowlistReport(
+        entries=len(entries),
+        cidrs=len(cidrs),
+        rules_before=len(entries) * ports,
+        rules_after=per_port * ports,
+    )
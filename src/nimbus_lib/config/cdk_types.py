@@ -0,0 +1,450 @@
+"""Config field types that refer to CDK values without importing aws_cdk.
+
+Importing any aws_cdk module starts the jsii runtime, so config models
+store the *name* of a CDK enum member and the stacks resolve it, e.g.
+``ec2.SubnetType[config.subnet_type]``.
+"""
+from enum import Enum
+from typing import Annotated, Any, Literal
+
+from pydantic import BeforeValidator
+
+
+def enum_name(value: Any) -> Any:
+    # Accept CDK enum members as well as case-insensitive names; the
+    # Literal below does the membership check so it is the same whether
+    # or not aws_cdk has been imported.
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, str):
+        return value.upper()
+    return value
+
+
+def engine_version(value: Any) -> str:
+    # Accept rds.PostgresEngineVersion/Aurora*EngineVersion instances as
+    # well as "15.3" or "8.0.mysql_aurora.3.04.0"
+    for attr in (
+        "postgres_full_version",
+        "aurora_postgres_full_version",
+        "aurora_mysql_full_version",
+    ):
+        value = getattr(value, attr, value)
+    if not isinstance(value, str):
+        raise ValueError(f"expected an engine version, got {value!r}")
+    return value
+
+
+# ec2.SubnetType members
+SubnetTypeName = Annotated[
+    Literal[
+        "PRIVATE_ISOLATED", "PRIVATE_WITH_EGRESS", "PRIVATE_WITH_NAT", "PUBLIC"
+    ],
+    BeforeValidator(enum_name),
+]
+# ec2.InstanceSize members
+InstanceSizeName = Annotated[
+    Literal[
+        "NANO",
+        "MICRO",
+        "SMALL",
+        "MEDIUM",
+        "LARGE",
+        "XLARGE",
+        "XLARGE2",
+        "XLARGE3",
+        "XLARGE4",
+        "XLARGE6",
+        "XLARGE8",
+        "XLARGE9",
+        "XLARGE10",
+        "XLARGE12",
+        "XLARGE16",
+        "XLARGE18",
+        "XLARGE24",
+        "XLARGE32",
+        "XLARGE48",
+        "XLARGE56",
+        "XLARGE112",
+        "METAL",
+    ],
+    BeforeValidator(enum_name),
+]
+# ec2.InstanceClass members
+InstanceClassName = Annotated[
+    Literal[
+        "STANDARD3",
+        "M3",
+        "STANDARD4",
+        "M4",
+        "STANDARD5",
+        "M5",
+        "STANDARD5_NVME_DRIVE",
+        "M5D",
+        "STANDARD5_AMD",
+        "M5A",
+        "STANDARD5_AMD_NVME_DRIVE",
+        "M5AD",
+        "STANDARD5_HIGH_PERFORMANCE",
+        "M5N",
+        "STANDARD5_NVME_DRIVE_HIGH_PERFORMANCE",
+        "M5DN",
+        "STANDARD5_HIGH_COMPUTE",
+        "M5ZN",
+        "MEMORY3",
+        "R3",
+        "MEMORY4",
+        "R4",
+        "MEMORY5",
+        "R5",
+        "MEMORY6_AMD",
+        "R6A",
+        "MEMORY6_INTEL",
+        "R6I",
+        "MEMORY6_INTEL_NVME_DRIVE",
+        "R6ID",
+        "MEMORY5_HIGH_PERFORMANCE",
+        "R5N",
+        "MEMORY5_NVME_DRIVE",
+        "R5D",
+        "MEMORY5_NVME_DRIVE_HIGH_PERFORMANCE",
+        "R5DN",
+        "MEMORY5_AMD",
+        "R5A",
+        "MEMORY5_AMD_NVME_DRIVE",
+        "HIGH_MEMORY_3TB_1",
+        "U_3TB1",
+        "HIGH_MEMORY_6TB_1",
+        "U_6TB1",
+        "HIGH_MEMORY_9TB_1",
+        "U_9TB1",
+        "HIGH_MEMORY_12TB_1",
+        "U_12TB1",
+        "HIGH_MEMORY_18TB_1",
+        "U_18TB1",
+        "HIGH_MEMORY_24TB_1",
+        "U_24TB1",
+        "R5AD",
+        "MEMORY5_EBS_OPTIMIZED",
+        "R5B",
+        "MEMORY6_GRAVITON",
+        "R6G",
+        "MEMORY6_GRAVITON2_NVME_DRIVE",
+        "R6GD",
+        "MEMORY7_GRAVITON",
+        "R7G",
+        "COMPUTE3",
+        "C3",
+        "COMPUTE4",
+        "C4",
+        "COMPUTE5",
+        "C5",
+        "COMPUTE5_NVME_DRIVE",
+        "C5D",
+        "COMPUTE5_AMD",
+        "C5A",
+        "COMPUTE5_AMD_NVME_DRIVE",
+        "C5AD",
+        "COMPUTE5_HIGH_PERFORMANCE",
+        "C5N",
+        "COMPUTE6_INTEL",
+        "C6I",
+        "COMPUTE6_INTEL_NVME_DRIVE",
+        "C6ID",
+        "COMPUTE6_INTEL_HIGH_PERFORMANCE",
+        "C6IN",
+        "COMPUTE6_AMD",
+        "C6A",
+        "COMPUTE6_GRAVITON2",
+        "C6G",
+        "COMPUTE7_GRAVITON3",
+        "C7G",
+        "COMPUTE6_GRAVITON2_NVME_DRIVE",
+        "C6GD",
+        "COMPUTE6_GRAVITON2_HIGH_NETWORK_BANDWIDTH",
+        "C6GN",
+        "STORAGE2",
+        "D2",
+        "STORAGE3",
+        "D3",
+        "STORAGE3_ENHANCED_NETWORK",
+        "D3EN",
+        "STORAGE_COMPUTE_1",
+        "H1",
+        "IO3",
+        "I3",
+        "IO3_DENSE_NVME_DRIVE",
+        "I3EN",
+        "IO4_INTEL",
+        "I4I",
+        "STORAGE4_GRAVITON_NETWORK_OPTIMIZED",
+        "IM4GN",
+        "STORAGE4_GRAVITON_NETWORK_STORAGE_OPTIMIZED",
+        "IS4GEN",
+        "BURSTABLE2",
+        "T2",
+        "BURSTABLE3",
+        "T3",
+        "BURSTABLE3_AMD",
+        "T3A",
+        "BURSTABLE4_GRAVITON",
+        "T4G",
+        "MEMORY_INTENSIVE_1",
+        "X1",
+        "MEMORY_INTENSIVE_1_EXTENDED",
+        "X1E",
+        "MEMORY_INTENSIVE_2_GRAVITON2",
+        "X2G",
+        "MEMORY_INTENSIVE_2_GRAVITON2_NVME_DRIVE",
+        "X2GD",
+        "MEMORY_INTENSIVE_2_XT_INTEL",
+        "X2IEDN",
+        "MEMORY_INTENSIVE_2_INTEL",
+        "X2IDN",
+        "MEMORY_INTENSIVE_2_XTZ_INTEL",
+        "X2IEZN",
+        "FPGA1",
+        "F1",
+        "GRAPHICS3_SMALL",
+        "G3S",
+        "GRAPHICS3",
+        "G3",
+        "GRAPHICS4_NVME_DRIVE_HIGH_PERFORMANCE",
+        "G4DN",
+        "GRAPHICS4_AMD_NVME_DRIVE",
+        "G4AD",
+        "GRAPHICS5",
+        "G5",
+        "GRAPHICS5_GRAVITON2",
+        "G5G",
+        "PARALLEL2",
+        "P2",
+        "PARALLEL3",
+        "P3",
+        "PARALLEL3_NVME_DRIVE_HIGH_PERFORMANCE",
+        "P3DN",
+        "PARALLEL4_NVME_DRIVE_EXTENDED",
+        "P4DE",
+        "PARALLEL4",
+        "P4D",
+        "ARM1",
+        "A1",
+        "STANDARD6_GRAVITON",
+        "M6G",
+        "STANDARD6_INTEL",
+        "M6I",
+        "STANDARD6_INTEL_NVME_DRIVE",
+        "M6ID",
+        "STANDARD6_AMD",
+        "M6A",
+        "STANDARD6_GRAVITON2_NVME_DRIVE",
+        "M6GD",
+        "STANDARD7_GRAVITON",
+        "M7G",
+        "HIGH_COMPUTE_MEMORY1",
+        "Z1D",
+        "INFERENCE1",
+        "INF1",
+        "INFERENCE2",
+        "INF2",
+        "MACINTOSH1_INTEL",
+        "MAC1",
+        "VIDEO_TRANSCODING1",
+        "VT1",
+        "HIGH_PERFORMANCE_COMPUTING6_AMD",
+        "HPC6A",
+        "DEEP_LEARNING1",
+        "DL1",
+    ],
+    BeforeValidator(enum_name),
+]
+# RemovalPolicy members
+RemovalPolicyName = Annotated[
+    Literal["DESTROY", "RETAIN", "SNAPSHOT"], BeforeValidator(enum_name)
+]
+# applicationautoscaling.AdjustmentType members
+AdjustmentTypeName = Annotated[
+    Literal[
+        "CHANGE_IN_CAPACITY", "PERCENT_CHANGE_IN_CAPACITY", "EXACT_CAPACITY"
+    ],
+    BeforeValidator(enum_name),
+]
+# elbv2.TargetGroupLoadBalancingAlgorithmType members
+LoadBalancingAlgorithmName = Annotated[
+    Literal["ROUND_ROBIN", "LEAST_OUTSTANDING_REQUESTS"],
+    BeforeValidator(enum_name),
+]
+# elbv2.ApplicationProtocolVersion members
+ProtocolVersionName = Annotated[
+    Literal["GRPC", "HTTP1", "HTTP2"], BeforeValidator(enum_name)
+]
+# elbv2.SslPolicy members
+SslPolicyName = Annotated[
+    Literal[
+        "RECOMMENDED_TLS",
+        "RECOMMENDED",
+        "TLS13_RES",
+        "TLS13_EXT1",
+        "TLS13_EXT2",
+        "TLS13_10",
+        "TLS13_11",
+        "TLS13_13",
+        "FORWARD_SECRECY_TLS12_RES_GCM",
+        "FORWARD_SECRECY_TLS12_RES",
+        "FORWARD_SECRECY_TLS12",
+        "FORWARD_SECRECY_TLS11",
+        "FORWARD_SECRECY",
+        "TLS12",
+        "TLS12_EXT",
+        "TLS11",
+        "LEGACY",
+    ],
+    BeforeValidator(enum_name),
+]
+# cloudfront.OriginProtocolPolicy members
+OriginProtocolPolicyName = Annotated[
+    Literal["HTTP_ONLY", "MATCH_VIEWER", "HTTPS_ONLY"],
+    BeforeValidator(enum_name),
+]
+# cloudfront.PriceClass members
+PriceClassName = Annotated[
+    Literal["PRICE_CLASS_100", "PRICE_CLASS_200", "PRICE_CLASS_ALL"],
+    BeforeValidator(enum_name),
+]
+# rds.StorageType members
+StorageTypeName = Annotated[
+    Literal["STANDARD", "GP2", "GP3", "IO1"], BeforeValidator(enum_name)
+]
+# rds.PerformanceInsightRetention members
+PerformanceInsightRetentionName = Annotated[
+    Literal[
+        "DEFAULT",
+        "MONTHS_1",
+        "MONTHS_2",
+        "MONTHS_3",
+        "MONTHS_4",
+        "MONTHS_5",
+        "MONTHS_6",
+        "MONTHS_7",
+        "MONTHS_8",
+        "MONTHS_9",
+        "MONTHS_10",
+        "MONTHS_11",
+        "MONTHS_12",
+        "MONTHS_13",
+        "MONTHS_14",
+        "MONTHS_15",
+        "MONTHS_16",
+        "MONTHS_17",
+        "MONTHS_18",
+        "MONTHS_19",
+        "MONTHS_20",
+        "MONTHS_21",
+        "MONTHS_22",
+        "MONTHS_23",
+        "LONG_TERM",
+    ],
+    BeforeValidator(enum_name),
+]
+# efs.ThroughputMode members
+EfsThroughputModeName = Annotated[
+    Literal["BURSTING", "PROVISIONED", "ELASTIC"], BeforeValidator(enum_name)
+]
+# efs.PerformanceMode members
+EfsPerformanceModeName = Annotated[
+    Literal["GENERAL_PURPOSE", "MAX_IO"], BeforeValidator(enum_name)
+]
+# efs.LifecyclePolicy members
+EfsLifecyclePolicyName = Annotated[
+    Literal[
+        "AFTER_1_DAY",
+        "AFTER_7_DAYS",
+        "AFTER_14_DAYS",
+        "AFTER_30_DAYS",
+        "AFTER_60_DAYS",
+        "AFTER_90_DAYS",
+    ],
+    BeforeValidator(enum_name),
+]
+# ecs.UlimitName members
+UlimitNameName = Annotated[
+    Literal[
+        "CORE",
+        "CPU",
+        "DATA",
+        "FSIZE",
+        "LOCKS",
+        "MEMLOCK",
+        "MSGQUEUE",
+        "NICE",
+        "NOFILE",
+        "NPROC",
+        "RSS",
+        "RTPRIO",
+        "RTTIME",
+        "SIGPENDING",
+        "STACK",
+    ],
+    BeforeValidator(enum_name),
+]
+# ecs.ContainerDependencyCondition members
+ContainerDependencyConditionName = Annotated[
+    Literal["START", "COMPLETE", "SUCCESS", "HEALTHY"],
+    BeforeValidator(enum_name),
+]
+# logs.RetentionDays members
+RetentionDaysName = Annotated[
+    Literal[
+        "ONE_DAY",
+        "THREE_DAYS",
+        "FIVE_DAYS",
+        "ONE_WEEK",
+        "TWO_WEEKS",
+        "ONE_MONTH",
+        "TWO_MONTHS",
+        "THREE_MONTHS",
+        "FOUR_MONTHS",
+        "FIVE_MONTHS",
+        "SIX_MONTHS",
+        "ONE_YEAR",
+        "THIRTEEN_MONTHS",
+        "EIGHTEEN_MONTHS",
+        "TWO_YEARS",
+        "THREE_YEARS",
+        "FIVE_YEARS",
+        "SIX_YEARS",
+        "SEVEN_YEARS",
+        "EIGHT_YEARS",
+        "NINE_YEARS",
+        "TEN_YEARS",
+        "INFINITE",
+    ],
+    BeforeValidator(enum_name),
+]
+# Managed cloudfront.CachePolicy attributes (not an enum in CDK)
+ManagedCachePolicyName = Literal[
+    "CACHING_OPTIMIZED",
+    "CACHING_DISABLED",
+    "CACHING_OPTIMIZED_FOR_UNCOMPRESSED_OBJECTS",
+    "ELEMENTAL_MEDIA_PACKAGE",
+    "AMPLIFY",
+]
+EngineVersion = Annotated[str, BeforeValidator(engine_version)]
+# ec2.GatewayVpcEndpointAwsService attributes
+GatewayEndpointName = Literal["S3", "DYNAMODB"]
+# ec2.InterfaceVpcEndpointAwsService attributes (not an enum in CDK)
+InterfaceEndpointName = Literal[
+    "ECR",
+    "ECR_DOCKER",
+    "CLOUDWATCH_LOGS",
+    "CLOUDWATCH_MONITORING",
+    "SECRETS_MANAGER",
+    "SSM",
+    "SSM_MESSAGES",
+    "EC2_MESSAGES",
+    "STS",
+    "KMS",
+    "ELASTIC_FILESYSTEM",
+    "SQS",
+    "SNS",
+]
@@ -1,8 +1,21 @@
 from enum import Enum, unique
-from aws_cdk import aws_ec2 as ec2
+from typing import Annotated, Literal
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings
+from . import cdk_types as cdk
+
+# Valid Fargate task memory sizes (MiB) for each task CPU size (units)
+FARGATE_TASK_SIZES: dict[int, range | tuple[int, ...]] = {
+    # 0.25 vCPU skips 1536 MiB
+    256: (512, 1024, 2048),
+    512: range(1024, 4096 + 1, 1024),
+    1024: range(2048, 8192 + 1, 1024),
+    2048: range(4096, 16384 + 1, 1024),
+    4096: range(8192, 30720 + 1, 1024),
+    8192: range(16384, 61440 + 1, 4096),
+    16384: range(32768, 122880 + 1, 8192),
+}
 
 
 @unique
@@ -11,6 +24,12 @@ class ContainerImageSource(Enum):
     REGISTRY = "REGISTRY"
 
 
+@unique
+class CpuArchitecture(Enum):
+    X86_64 = "X86_64"
+    ARM64 = "ARM64"
+
+
 class IngressConfig(BaseSettings):
     security_group_id: str
     port: int
@@ -21,11 +40,35 @@ class SecretConfig(BaseSettings):
     region: str
 
 
+class CdnPathConfig(BaseSettings):
+    path_pattern: str
+    cache_policy: cdk.ManagedCachePolicyName = "CACHING_OPTIMIZED"
+    # Seconds to cache for; creates a custom cache policy instead
+    ttl: int | None = Field(default=None, ge=0)
+
+
+class CdnConfig(BaseSettings):
+    default_cache_policy: cdk.ManagedCachePolicyName = "CACHING_DISABLED"
+    paths: list[CdnPathConfig] = Field(default_factory=list)
+    compress: bool = True
+    price_class: cdk.PriceClassName = "PRICE_CLASS_100"
+    # The load balancer certificate is not valid for its own DNS name, but
+    # HTTPS_ONLY works as the viewer's Host header is forwarded; it's
+    # required with redirect_http
+    origin_protocol: cdk.OriginProtocolPolicyName = "HTTP_ONLY"
+    origin_http_port: int = 80
+    origin_https_port: int = 443
+    keepalive_timeout: int = Field(default=60, ge=1, le=60)
+    read_timeout: int = Field(default=30, ge=1, le=180)
+
+
 class DomainConfig(BaseSettings):
     domain: str
     subdomain: str | None = None
     private_zone: bool = False
     create_zone: bool = True
+    # Serve this domain through a CloudFront distribution
+    cdn: CdnConfig | None = None
 
     @property
     def name(self):
@@ -35,33 +78,451 @@ class DomainConfig(BaseSettings):
         return f"{self.subdomain}.{self.domain}"
 
 
+class RoutingConfig(BaseSettings):
+    # Listener rule priority; lower numbers are evaluated first
+    priority: int = Field(ge=1, le=50000)
+    hosts: list[str] = Field(default_factory=list)
+    paths: list[str] = Field(default_factory=list)
+
+
+class NestingConfig(BaseSettings):
+    # Move a group into a nested stack once it grows past its threshold;
+    # None keeps the group in the parent stack
+    domains: int | None = Field(default=10, ge=0)
+    security_group_rules: int | None = Field(default=50, ge=0)
+
+
+class PrefixListConfig(BaseSettings):
+    # Existing managed prefix lists to allow as well, e.g. the
+    # AllowlistPrefixList output of another stack
+    ids: list[str] = Field(default_factory=list)
+    # Room to grow the created lists without replacing them
+    spare_entries: int = Field(default=0, ge=0)
+
+
+class ProxyConfig(BaseSettings):
+    # Seconds a client waits for a pooled connection before erroring
+    borrow_timeout: int = Field(default=120, ge=1, le=3600)
+    max_connections_percent: int = Field(default=100, ge=1, le=100)
+    max_idle_connections_percent: int | None = Field(
+        default=None, ge=0, le=100
+    )
+    idle_client_timeout: int | None = Field(default=None, ge=1, le=28800)
+    require_tls: bool = True
+    iam_auth: bool = False
+
+
+class AuroraConfig(BaseSettings):
+    engine: Literal["postgresql", "mysql"] = "postgresql"
+    # Serverless v2 capacity in ACUs, in steps of 0.5
+    min_capacity: float = Field(default=0.5, ge=0.5, le=128, multiple_of=0.5)
+    max_capacity: float = Field(default=2, ge=1, le=128, multiple_of=0.5)
+    readers: int = Field(default=1, ge=0, le=15)
+    # Readers in promotion tier 0-1 track the writer's capacity, so a
+    # failover lands on a warm instance
+    readers_scale_with_writer: bool = True
+
+    @model_validator(mode="after")
+    def check_capacity(self) -> "AuroraConfig":
+        if self.min_capacity > self.max_capacity:
+            raise ValueError("min_capacity must not exceed max_capacity")
+        return self
+
+
 class Ec2Config(BaseSettings):
-    size: ec2.InstanceSize
-    type_: ec2.InstanceClass
+    size: cdk.InstanceSizeName
+    type_: cdk.InstanceClassName
+
+
+class ReadReplicaConfig(BaseSettings):
+    # Defaults to the primary's instance type
+    instance_type: Ec2Config | None = None
+    availability_zone: str | None = None
+
+
+class CpuScalingPolicy(BaseSettings):
+    kind: Literal["cpu"] = "cpu"
+    target_util_pct: float | int = 65
+    scale_in_cooldown: int = 60
+    scale_out_cooldown: int = 60
+
+
+class MemoryScalingPolicy(BaseSettings):
+    kind: Literal["memory"] = "memory"
+    target_util_pct: float | int = 75
+    scale_in_cooldown: int = 60
+    scale_out_cooldown: int = 60
+
+
+class RequestCountScalingPolicy(BaseSettings):
+    kind: Literal["request_count"] = "request_count"
+    requests_per_target: int
+    scale_in_cooldown: int = 60
+    scale_out_cooldown: int = 60
+
+
+class ResponseTimeScalingPolicy(BaseSettings):
+    kind: Literal["response_time"] = "response_time"
+    target_seconds: float
+    # Target tracking does not accept percentiles such as p99
+    statistic: Literal[
+        "Average", "Minimum", "Maximum", "Sum", "SampleCount"
+    ] = "Average"
+    scale_in_cooldown: int = 60
+    scale_out_cooldown: int = 60
+
+
+class ScalingStepConfig(BaseSettings):
+    change: int
+    lower: float | int | None = None
+    upper: float | int | None = None
+
+
+class StepScalingPolicy(BaseSettings):
+    kind: Literal["step"] = "step"
+    namespace: str
+    metric_name: str
+    dimensions: dict[str, str] = Field(default_factory=dict)
+    statistic: str = "Average"
+    period: int = 60
+    evaluation_periods: int = 1
+    steps: list[ScalingStepConfig]
+    adjustment_type: cdk.AdjustmentTypeName = "CHANGE_IN_CAPACITY"
+    cooldown: int = 60
+
+
+ScalingPolicy = Annotated[
+    CpuScalingPolicy
+    | MemoryScalingPolicy
+    | RequestCountScalingPolicy
+    | ResponseTimeScalingPolicy
+    | StepScalingPolicy,
+    Field(discriminator="kind"),
+]
+
+
+class HealthCheckConfig(BaseSettings):
+    path: str = "/"
+    healthy_http_codes: str = "200"
+    # Used instead of healthy_http_codes for gRPC targets
+    healthy_grpc_codes: str = "12"
+    interval: int = 30
+    timeout: int = 5
+    healthy_threshold: int = 5
+    unhealthy_threshold: int = 2
+
+
+class CapacityConfig(BaseSettings):
+    # Tasks always placed on on-demand FARGATE before weights apply
+    on_demand_base: int = 1
+    on_demand_weight: int = 1
+    spot_weight: int = 0
+    # Spot interruptions give a two minute warning; use it to drain
+    spot_stop_timeout: int = Field(default=120, ge=1, le=120)
+
+    @property
+    def uses_spot(self) -> bool:
+        return self.spot_weight > 0
+
+
+class BlueGreenConfig(BaseSettings):
+    # CodeDeploy shifts traffic to the new task set all at once, in one
+    # canary step followed by the rest, or in equal linear steps
+    traffic_shift: Literal["all_at_once", "canary", "linear"] = "canary"
+    shift_percent: int = Field(default=10, ge=1, le=99)
+    # Minutes between traffic shifts
+    shift_interval: int = Field(default=5, ge=1, le=2880)
+    # Minutes the old task set keeps running after all traffic moved
+    termination_wait: int = Field(default=5, ge=0, le=2880)
+    # Listener for the new task set, open to the VPC only; CodeDeploy
+    # needs the second target group attached to a listener
+    test_port: int = Field(default=9000, ge=1, le=65535)
+    # Roll back while an observability alarm is firing
+    rollback_on_alarm: bool = True
+
+
+class DeploymentConfig(BaseSettings):
+    # Rolling deploy bounds as a percent of the desired task count; a
+    # higher maximum starts more replacement tasks at once
+    min_healthy_percent: int | None = Field(default=None, ge=0, le=100)
+    max_healthy_percent: int | None = Field(default=None, ge=100, le=200)
+    # Stop deployments whose tasks keep failing to start or turn healthy
+    circuit_breaker: bool = False
+    # Roll back to the last completed deployment when the breaker trips
+    rollback: bool = True
+    # Seconds new tasks ignore failing load balancer health checks
+    health_check_grace_period: int | None = Field(default=None, ge=0)
+    # Replace rolling deploys with CodeDeploy blue/green
+    blue_green: BlueGreenConfig | None = None
+
+    @model_validator(mode="after")
+    def check_controller(self) -> "DeploymentConfig":
+        if self.blue_green is not None and self.circuit_breaker:
+            raise ValueError(
+                "the circuit breaker only applies to rolling deploys; "
+                "blue/green deploys roll back through CodeDeploy"
+            )
+        return self
 
 
 class ScalingConfig(BaseSettings):
+    min_task_count: int = 1
     max_task_count: int = 2
     target_cpu_util_pct: float | int = 65
+    policies: list[ScalingPolicy] = Field(default_factory=list)
+
+    @property
+    def scaling_policies(self) -> list[ScalingPolicy]:
+        # Fall back to the original CPU-only behaviour
+        if not self.policies:
+            return [CpuScalingPolicy(target_util_pct=self.target_cpu_util_pct)]
+        return self.policies
+
+
+class FileSystemConfig(BaseSettings):
+    # Only applies to the filesystem the stack creates (no filesys_id)
+    throughput_mode: cdk.EfsThroughputModeName = Field(default="BURSTING")
+    # MiB/s, PROVISIONED throughput only
+    provisioned_throughput: int | None = Field(default=None, ge=1)
+    performance_mode: cdk.EfsPerformanceModeName = Field(
+        default="GENERAL_PURPOSE"
+    )
+    # Move files to Infrequent Access after this long, e.g. AFTER_30_DAYS
+    lifecycle_policy: cdk.EfsLifecyclePolicyName | None = None
+    # Move files back out of Infrequent Access on first access
+    out_of_ia_on_access: bool = False
+
+    @model_validator(mode="after")
+    def check_throughput(self) -> "FileSystemConfig":
+        if (self.provisioned_throughput is not None) != (
+            self.throughput_mode == "PROVISIONED"
+        ):
+            raise ValueError(
+                "provisioned_throughput is required by, and only valid"
+                " with, PROVISIONED throughput_mode"
+            )
+        if self.performance_mode == "MAX_IO" and (
+            self.throughput_mode == "ELASTIC"
+        ):
+            raise ValueError("ELASTIC throughput requires GENERAL_PURPOSE")
+        return self
+
+
+class AccessPointConfig(BaseSettings):
+    # Root directory exposed to the container, created if missing
+    path: str
+    uid: int = 1000
+    gid: int = 1000
+    permissions: str = "755"
 
 
 class VolumeConfig(BaseSettings):
     path: str
     filesys_id: str | None = None
+    read_only: bool = False
+    access_point: AccessPointConfig | None = None
+    filesystem: FileSystemConfig = Field(default_factory=FileSystemConfig)
 
 
-class ContainerConfig(BaseSettings):
-    port: int
+class TaskConfig(BaseSettings):
+    cpu: int = 256
+    memory_mib: int = 512
+    ephemeral_storage_gib: int | None = None
+    architecture: CpuArchitecture = CpuArchitecture.X86_64
+
+    @model_validator(mode="after")
+    def check_task_size(self) -> "TaskConfig":
+        if self.cpu not in FARGATE_TASK_SIZES:
+            raise ValueError(
+                f"Unsupported Fargate task cpu: {self.cpu} "
+                f"(expected one of {sorted(FARGATE_TASK_SIZES)})"
+            )
+        if self.memory_mib not in FARGATE_TASK_SIZES[self.cpu]:
+            sizes = FARGATE_TASK_SIZES[self.cpu]
+            expected = (
+                f"{sizes.start}-{sizes.stop - 1} in steps of {sizes.step}"
+                if isinstance(sizes, range)
+                else f"one of {list(sizes)}"
+            )
+            raise ValueError(
+                f"Unsupported Fargate task memory for {self.cpu} cpu: "
+                f"{self.memory_mib} (expected {expected})"
+            )
+        if self.ephemeral_storage_gib is not None and not (
+            21 <= self.ephemeral_storage_gib <= 200
+        ):
+            raise ValueError(
+                "Fargate ephemeral storage must be between 21 and 200 GiB"
+            )
+        return self
+
+
+class UlimitConfig(BaseSettings):
+    name: cdk.UlimitNameName
+    soft_limit: int = Field(ge=0)
+    hard_limit: int = Field(ge=0)
+
+    @model_validator(mode="after")
+    def check_limits(self) -> "UlimitConfig":
+        if self.soft_limit > self.hard_limit:
+            raise ValueError("soft_limit must not exceed hard_limit")
+        return self
+
+
+class LoggingConfig(BaseSettings):
+    stream_prefix: str = "app"
+    retention: cdk.RetentionDaysName | None = None
+    # Buffer log lines instead of blocking the application when CloudWatch
+    # Logs is slow; lines beyond max_buffer_size_mib are dropped
+    non_blocking: bool = True
+    max_buffer_size_mib: int | None = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def check_buffer(self) -> "LoggingConfig":
+        if self.max_buffer_size_mib is not None and not self.non_blocking:
+            raise ValueError("max_buffer_size_mib requires non_blocking")
+        return self
+
+
+class ContainerHealthCheckConfig(BaseSettings):
+    # e.g. ["CMD-SHELL", "curl -f http://localhost/ || exit 1"]
+    command: list[str]
+    interval: int = Field(default=30, ge=5, le=300)
+    timeout: int = Field(default=5, ge=2, le=60)
+    retries: int = Field(default=3, ge=1, le=10)
+    start_period: int | None = Field(default=None, ge=0, le=300)
+
+
+class DependencyConfig(BaseSettings):
+    # Name of a sidecar in the same task
+    container: str
+    condition: cdk.ContainerDependencyConditionName = Field(default="START")
+
+
+class BaseContainerConfig(BaseSettings):
     image: str
     tag: str = "latest"
     source: ContainerImageSource = ContainerImageSource.REGISTRY
     volumes: list[VolumeConfig] = Field(default_factory=list)
     command: str | None = None
 
+    ulimits: list[UlimitConfig] = Field(default_factory=list)
+    # Run an init process as PID 1 to forward signals and reap zombies
+    init_process: bool = False
+    # Seconds between SIGTERM and SIGKILL, Fargate allows up to 120
+    stop_timeout: int | None = Field(default=None, ge=1, le=120)
+    logging: LoggingConfig | None = None
+    health_check: ContainerHealthCheckConfig | None = None
+    # Container-level share of the task's CPU units and memory
+    cpu: int | None = Field(default=None, ge=0)
+    memory_limit_mib: int | None = Field(default=None, ge=6)
+    memory_reservation_mib: int | None = Field(default=None, ge=6)
+    readonly_root_filesystem: bool = False
+    # Sidecars that must reach a condition before this container starts
+    depends_on: list[DependencyConfig] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_memory(self) -> "BaseContainerConfig":
+        if (
+            self.memory_limit_mib is not None
+            and self.memory_reservation_mib is not None
+            and self.memory_reservation_mib > self.memory_limit_mib
+        ):
+            raise ValueError(
+                "memory_reservation_mib must not exceed memory_limit_mib"
+            )
+        return self
+
+
+class SidecarConfig(BaseContainerConfig):
+    # Container name, reachable from the other containers on localhost
+    name: str = Field(pattern=r"^[a-zA-Z0-9_-]{1,255}$")
+    port: int | None = None
+    environment: dict[str, str] = Field(default_factory=dict)
+    # A non-essential sidecar may exit without stopping the task
+    essential: bool = True
+
+
+class ContainerConfig(BaseContainerConfig):
+    port: int
+    # Extra containers in the same task; only this container is
+    # registered with the load balancer
+    sidecars: list[SidecarConfig] = Field(default_factory=list)
+
+    @property
+    def all_volumes(self) -> list[VolumeConfig]:
+        volumes = list(self.volumes)
+        for sidecar in self.sidecars:
+            volumes.extend(sidecar.volumes)
+        return volumes
+
+    @model_validator(mode="after")
+    def check_volumes(self) -> "ContainerConfig":
+        # Volumes without filesys_id share the one filesystem the stack
+        # creates, so they must agree on how it's created
+        created = [
+            v.filesystem for v in self.all_volumes if v.filesys_id is None
+        ]
+        if any(fs != created[0] for fs in created[1:]):
+            raise ValueError(
+                "volumes without filesys_id must use the same filesystem"
+                " settings"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_sidecars(self) -> "ContainerConfig":
+        names = [sidecar.name for sidecar in self.sidecars]
+        if len(set(names)) != len(names):
+            raise ValueError("sidecar names must be unique")
+
+        sidecars = {sidecar.name: sidecar for sidecar in self.sidecars}
+        containers: list[BaseContainerConfig] = [self, *self.sidecars]
+        for container in containers:
+            for dependency in container.depends_on:
+                target = sidecars.get(dependency.container)
+                if target is None:
+                    raise ValueError(
+                        "unknown sidecar in depends_on:"
+                        f" {dependency.container}"
+                    )
+                if target is container:
+                    raise ValueError("a container can't depend on itself")
+                if (
+                    dependency.condition == "HEALTHY"
+                    and target.health_check is None
+                ):
+                    raise ValueError(
+                        f"HEALTHY requires a health_check on {target.name}"
+                    )
+        return self
+
+
+class ObservabilityConfig(BaseSettings):
+    # Task-level CPU/memory/task count metrics on the stack's own cluster
+    container_insights: bool = True
+    dashboard: bool = True
+    # Existing SNS topic for alarms; one is created when unset
+    alarm_topic_arn: str | None = None
+    alarm_emails: list[str] = Field(default_factory=list)
+    # Extra metrics on the dashboard, e.g. RdsStack.instance's identifier
+    rds_instance_ids: list[str] = Field(default_factory=list)
+
+    # Alarm thresholds; None disables the alarm
+    p99_response_time_seconds: float | None = Field(default=None, gt=0)
+    target_5xx_count: int | None = Field(default=10, ge=1)
+    cpu_util_pct: float | None = Field(default=90, gt=0, le=100)
+    memory_util_pct: float | None = Field(default=90, gt=0, le=100)
+    unhealthy_host_count: int | None = Field(default=None, ge=1)
+    # Fire when the service has scaled out to max_task_count
+    at_max_task_count: bool = True
+    period_seconds: int = Field(default=60, ge=10)
+    evaluation_periods: int = Field(default=5, ge=1)
+
 
 class SubnetConfig(BaseSettings):
     name: str
-    subnet_type: ec2.SubnetType
+    subnet_type: cdk.SubnetTypeName
     cidr_mask: int = 24
 
     @classmethod
@@ -69,14 +530,14 @@ class SubnetConfig(BaseSettings):
         return [
             cls(
                 name="Ingress",
-                subnet_type=ec2.SubnetType.PUBLIC,
+                subnet_type="PUBLIC",
             ),
             cls(
                 name="Compute",
-                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS,
+                subnet_type="PRIVATE_WITH_EGRESS",
             ),
             cls(
                 name="Isolated",
-                subnet_type=ec2.SubnetType.PRIVATE_ISOLATED,
+                subnet_type="PRIVATE_ISOLATED",
             ),
         ]
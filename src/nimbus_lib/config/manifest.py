@@ -0,0 +1,203 @@
+"""Load many stack configs from a single manifest file.
+
+A manifest (JSON, TOML or YAML) looks like::
+
+    defaults:                 # applied to every stack in every environment
+      account: "012345678910"
+      region: us-east-1
+    environments:
+      dev:
+        defaults: {vpc_id: vpc-dev}
+      staging:
+        extends: dev
+      prod:
+        extends: staging
+        defaults: {vpc_id: vpc-prod}
+    stacks:
+      - kind: fargate
+        stack_name: Api
+        container: {port: 8080, image: someuser/api}
+        environments:         # per-environment overrides for this stack
+          prod: {scaling: {max_task_count: 10}}
+
+Values are deep-merged, later winning: env file, manifest ``defaults``,
+environment ``defaults`` (base of the ``extends`` chain first), the stack
+entry, then the stack's override for each environment in the chain.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping
+
+from dotenv import dotenv_values
+
+from . import stacks
+
+DEFAULT_ENV_FILE: str | None = stacks.ENV_FILE
+
+STACK_KINDS: dict[str, type[stacks.StackConfig]] = {
+    "vpc": stacks.VpcConfig,
+    "rds": stacks.RdsConfig,
+    "bastion": stacks.BastionConfig,
+    "cache": stacks.CacheConfig,
+    "fargate": stacks.FargateConfig,
+    "shared_alb": stacks.SharedAlbConfig,
+}
+
+
+def _deep_merge(*layers: Mapping[str, Any]) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    for layer in layers:
+        for key, value in layer.items():
+            if isinstance(value, Mapping) and isinstance(
+                merged.get(key), Mapping
+            ):
+                merged[key] = _deep_merge(merged[key], value)
+            else:
+                merged[key] = value
+    return merged
+
+
+@lru_cache(maxsize=None)
+def _read_env_file(path: str) -> dict[str, Any]:
+    # Parsed once per path, mirroring SETTINGS_CONFIG: case insensitive
+    # keys, "__" for nesting and JSON for complex values.
+    values: dict[str, Any] = {}
+    if not Path(path).is_file():
+        return values
+
+    for key, raw in dotenv_values(path).items():
+        value: Any = raw
+        if raw is not None and raw.strip()[:1] in ("{", "["):
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError:
+                pass
+
+        *parents, leaf = key.lower().split("__")
+        target = values
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return values
+
+
+def _parse(path: Path) -> dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    suffix = path.suffix.lower()
+
+    if suffix == ".json":
+        return json.loads(text)
+    if suffix == ".toml":
+        try:
+            import tomllib  # pylint: disable=import-outside-toplevel
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib  # type: ignore
+
+        return tomllib.loads(text)
+    if suffix in (".yaml", ".yml"):
+        try:
+            import yaml  # pylint: disable=import-outside-toplevel
+        except ImportError as exc:
+            raise ImportError(
+                "YAML manifests require PyYAML: pip install nimbus-lib[yaml]"
+            ) from exc
+
+        return yaml.safe_load(text)
+
+    raise ValueError(f"Unsupported manifest format: {path.suffix}")
+
+
+class Manifest:
+    def __init__(
+        self,
+        data: Mapping[str, Any],
+        env_file: str | None = DEFAULT_ENV_FILE,
+    ) -> None:
+        self.defaults: dict[str, Any] = dict(data.get("defaults", {}))
+        self.environments: dict[str, dict[str, Any]] = dict(
+            data.get("environments", {})
+        )
+        self.stacks: list[dict[str, Any]] = list(data.get("stacks", []))
+        self.env_defaults = (
+            _read_env_file(str(env_file)) if env_file is not None else {}
+        )
+        self._shared: dict[str, dict[str, Any]] = {}
+
+        for entry in self.stacks:
+            if entry.get("kind") not in STACK_KINDS:
+                raise ValueError(
+                    f"Unknown stack kind {entry.get('kind')!r} for "
+                    f"{entry.get('stack_name')!r} (expected one of "
+                    f"{sorted(STACK_KINDS)})"
+                )
+
+    @classmethod
+    def from_file(
+        cls, path: str | Path, env_file: str | None = DEFAULT_ENV_FILE
+    ) -> "Manifest":
+        return cls(_parse(Path(path)), env_file=env_file)
+
+    def lineage(self, env: str) -> list[str]:
+        # Environment names from the root of the `extends` chain to `env`
+        chain: list[str] = []
+        current: str | None = env
+        while current is not None:
+            if current in chain:
+                raise ValueError(
+                    f"Cyclic environment inheritance: {' -> '.join(chain)}"
+                )
+            chain.append(current)
+            current = self.environments.get(current, {}).get("extends")
+        return list(reversed(chain))
+
+    def shared_defaults(self, env: str) -> dict[str, Any]:
+        if env not in self._shared:
+            self._shared[env] = _deep_merge(
+                self.env_defaults,
+                self.defaults,
+                *(
+                    self.environments.get(name, {}).get("defaults", {})
+                    for name in self.lineage(env)
+                ),
+                {"env": env},
+            )
+        return self._shared[env]
+
+    def configs(self, env: str) -> list[stacks.StackConfig]:
+        shared = self.shared_defaults(env)
+        lineage = self.lineage(env)
+
+        configs = []
+        for entry in self.stacks:
+            config_cls = STACK_KINDS[entry["kind"]]
+            stack = {
+                key: value
+                for key, value in entry.items()
+                if key not in ("kind", "environments")
+            }
+            overrides = entry.get("environments", {})
+            # Shared defaults cover every kind; keep the ones this kind has
+            values = _deep_merge(
+                {
+                    key: value
+                    for key, value in shared.items()
+                    if key in config_cls.model_fields
+                },
+                stack,
+                *(overrides.get(name, {}) for name in lineage),
+            )
+            # The env file has already been read once for every stack
+            configs.append(
+                config_cls(_env_file=None, **values)  # type: ignore[call-arg]
+            )
+        return configs
+
+    def all_configs(self) -> dict[str, list[stacks.StackConfig]]:
+        return {env: self.configs(env) for env in self.environments}
+
+
+def load_manifest(
+    path: str | Path, env: str, env_file: str | None = DEFAULT_ENV_FILE
+) -> list[stacks.StackConfig]:
+    return Manifest.from_file(path, env_file=env_file).configs(env)
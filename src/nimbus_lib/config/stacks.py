@@ -1,14 +1,17 @@
+import hashlib
 import os
-from typing import Iterable
+import re
+from typing import Iterable, Literal
 
-from aws_cdk import RemovalPolicy, aws_rds as rds, aws_ec2 as ec2
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from . import components as comps
+from . import allowlist as allow, cdk_types as cdk, components as comps
+
+ENV_FILE = os.environ.get("ENVFILE", ".env")
 
 SETTINGS_CONFIG = SettingsConfigDict(
     case_sensitive=False,
-    env_file=os.environ.get("ENVFILE", ".env"),
+    env_file=ENV_FILE,
     env_file_encoding="utf-8",
     env_nested_delimiter="__",
 )
@@ -32,6 +35,28 @@ class VpcConfig(StackConfig):
     subnets: list[comps.SubnetConfig] = Field(
         default_factory=comps.SubnetConfig.vpc_defaults
     )
+    # Defaults to one NAT gateway per AZ
+    nat_gateways: int | None = Field(default=None, ge=0)
+    # Keep AWS API traffic from private subnets off the NAT gateways
+    gateway_endpoints: list[cdk.GatewayEndpointName] = Field(
+        default_factory=list
+    )
+    interface_endpoints: list[cdk.InterfaceEndpointName] = Field(
+        default_factory=list
+    )
+    # Subnets for interface endpoints, CDK picks private subnets by default
+    endpoint_subnet_type: cdk.SubnetTypeName | None = None
+
+    @model_validator(mode="after")
+    def check_nat_gateways(self) -> "VpcConfig":
+        if self.nat_gateways is not None and self.nat_gateways > self.max_azs:
+            raise ValueError("nat_gateways can't exceed max_azs")
+        return self
+
+    @classmethod
+    def ecs_endpoints(cls) -> list[cdk.InterfaceEndpointName]:
+        # What Fargate tasks need to pull from ECR, log and read secrets
+        return ["ECR", "ECR_DOCKER", "CLOUDWATCH_LOGS", "SECRETS_MANAGER"]
 
 
 class RdsConfig(StackConfig):
@@ -40,19 +65,164 @@ class RdsConfig(StackConfig):
     allocated_storage: int = 32
     database_name: str = "main"
     instance_type: comps.Ec2Config = Field(
-        default=comps.Ec2Config(
-            size=ec2.InstanceSize.MICRO, type_=ec2.InstanceClass.T4G
-        )
+        default=comps.Ec2Config(size="MICRO", type_="T4G")
     )
-    # TODO support non-postgres
-    engine_version: rds.PostgresEngineVersion = (
-        rds.PostgresEngineVersion.VER_15_3
-    )
-    removal_policy: RemovalPolicy = Field(default=RemovalPolicy.SNAPSHOT)
+    # Postgres (or Aurora) engine version, e.g. "15.3" or, for Aurora
+    # MySQL, "8.0.mysql_aurora.3.04.0"
+    engine_version: cdk.EngineVersion = "15.3"
+    # Use an Aurora Serverless v2 cluster instead of a single instance
+    aurora: comps.AuroraConfig | None = None
+    removal_policy: cdk.RemovalPolicyName = Field(default="SNAPSHOT")
     deletion_protection: bool = Field(default=False)
-    subnet_type: ec2.SubnetType = Field(
-        default=ec2.SubnetType.PRIVATE_ISOLATED
-    )
+    subnet_type: cdk.SubnetTypeName = Field(default="PRIVATE_ISOLATED")
+    # Pool connections through an RDS Proxy
+    proxy: comps.ProxyConfig | None = None
+
+    storage_type: cdk.StorageTypeName | None = None
+    iops: int | None = Field(default=None, ge=1000)
+    # MiB/s, gp3 only
+    storage_throughput: int | None = Field(default=None, ge=125)
+    # Enables storage autoscaling up to this many GiB
+    max_allocated_storage: int | None = None
+    performance_insights: bool = False
+    performance_insight_retention: (
+        cdk.PerformanceInsightRetentionName | None
+    ) = None
+    read_replicas: list[comps.ReadReplicaConfig] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_aurora(self) -> "RdsConfig":
+        if self.aurora is None:
+            return self
+        if self.read_replicas:
+            raise ValueError("use aurora.readers instead of read_replicas")
+        if (
+            self.storage_type is not None
+            or self.iops is not None
+            or self.storage_throughput is not None
+            or self.max_allocated_storage is not None
+        ):
+            raise ValueError("aurora storage is managed by the cluster")
+        is_mysql_version = "mysql_aurora" in self.engine_version
+        if is_mysql_version != (self.aurora.engine == "mysql"):
+            raise ValueError(
+                f"engine_version {self.engine_version} does not match the"
+                f" aurora {self.aurora.engine} engine"
+            )
+        return self
+
+    @property
+    def engine_family(self) -> str:
+        if self.aurora is not None and self.aurora.engine == "mysql":
+            return "mysql"
+        return "postgresql"
+
+    @model_validator(mode="after")
+    def check_storage(self) -> "RdsConfig":
+        if self.iops is not None and self.storage_type not in ("IO1", "GP3"):
+            raise ValueError("iops requires storage_type IO1 or GP3")
+        if self.storage_throughput is not None and self.storage_type != "GP3":
+            raise ValueError("storage_throughput requires storage_type GP3")
+        if (
+            self.max_allocated_storage is not None
+            and self.max_allocated_storage <= self.allocated_storage
+        ):
+            raise ValueError(
+                "max_allocated_storage must be above allocated_storage"
+            )
+        if (
+            self.performance_insight_retention is not None
+            and not self.performance_insights
+        ):
+            raise ValueError(
+                "performance_insight_retention requires performance_insights"
+            )
+        return self
+
+
+class CacheConfig(StackConfig):
+    vpc_id: str
+    engine: Literal["redis", "valkey"] = "redis"
+    # Defaults to the latest version the stack knows for the engine
+    engine_version: str | None = None
+    # Use an ElastiCache Serverless cache instead of a replication group
+    serverless: bool = False
+    node_type: str = "cache.t4g.micro"
+    cluster_mode: bool = False
+    shards: int = Field(default=1, ge=1, le=500)
+    replicas_per_shard: int = Field(default=1, ge=0, le=5)
+    parameter_group_name: str | None = None
+    port: int = 6379
+    subnet_type: cdk.SubnetTypeName = Field(default="PRIVATE_ISOLATED")
+    transit_encryption: bool = True
+    snapshot_retention_limit: int = Field(default=0, ge=0, le=35)
+    # Serverless usage limits
+    max_data_storage_gb: int | None = Field(default=None, ge=1)
+    max_ecpu_per_second: int | None = Field(default=None, ge=1000)
+
+    @model_validator(mode="after")
+    def check_topology(self) -> "CacheConfig":
+        if self.shards > 1 and not self.cluster_mode:
+            raise ValueError("more than one shard requires cluster_mode")
+        if self.serverless and self.port != 6379:
+            raise ValueError("serverless caches always listen on 6379")
+        return self
+
+    @model_validator(mode="after")
+    def check_serverless(self) -> "CacheConfig":
+        if self.serverless:
+            # Replication group settings a serverless cache has no use for
+            ignored = sorted(
+                self.model_fields_set
+                & {
+                    "node_type",
+                    "cluster_mode",
+                    "shards",
+                    "replicas_per_shard",
+                    "parameter_group_name",
+                }
+            )
+            if not self.transit_encryption:
+                # Serverless caches always require TLS
+                ignored.append("transit_encryption")
+        else:
+            ignored = [
+                name
+                for name in ("max_data_storage_gb", "max_ecpu_per_second")
+                if getattr(self, name) is not None
+            ]
+        if ignored:
+            kind = "serverless" if self.serverless else "replication group"
+            raise ValueError(
+                f"{', '.join(ignored)} not supported by {kind} caches"
+            )
+        return self
+
+    @property
+    def serverless_cache_name(self) -> str:
+        # Lowercase letters, digits and single hyphens, starting with a
+        # letter and at most 40 characters
+        name = re.sub(r"[^a-z0-9]+", "-", self.construct_id.lower())
+        name = name.strip("-")
+        if not name[:1].isalpha():
+            name = f"cache-{name}".rstrip("-")
+        if len(name) > 40:
+            # Keep truncated names of similar stacks apart
+            digest = hashlib.sha256(self.construct_id.encode()).hexdigest()
+            name = f"{name[:31].rstrip('-')}-{digest[:8]}"
+        return name
+
+
+def _allowlist_report(
+    config: "BastionConfig | LoadBalancedConfig", ports: int
+) -> allow.AllowlistReport:
+    prefix_lists = None
+    if config.allowlist_prefix_list is not None:
+        # One created list per address family plus the existing ones
+        prefix_lists = len(allow.address_families(config.ip_allowlist)) + len(
+            config.allowlist_prefix_list.ids
+        )
+    return allow.allowlist_report(config.ip_allowlist, ports, prefix_lists)
 
 
 class BastionConfig(StackConfig):
@@ -60,32 +230,236 @@ class BastionConfig(StackConfig):
     key_pair_name: str
     ssh_port: int = 22
     bootstrap_script: str | None = None
-    ip_allowlist: list[str] = Field(default_factory=list)
+    ip_allowlist: allow.IpAllowlist = Field(default_factory=list)
+    # Allow the allowlist through managed prefix lists
+    allowlist_prefix_list: comps.PrefixListConfig | None = None
     ingress_confs: list[comps.IngressConfig] = Field(default_factory=list)
 
+    @property
+    def allowlist_report(self) -> allow.AllowlistReport:
+        return _allowlist_report(self, ports=1)
+
 
-class FargateConfig(StackConfig):
+class LoadBalancedConfig(StackConfig):
     vpc_id: str
-    container: comps.ContainerConfig
     public_access: bool = False
-    scaling: comps.ScalingConfig = comps.ScalingConfig()
-    ip_allowlist: list[str] = Field(default_factory=list)
-    ingress_confs: list[comps.IngressConfig] = Field(default_factory=list)
+    ip_allowlist: allow.IpAllowlist = Field(default_factory=list)
+    # Allow the allowlist through managed prefix lists
+    allowlist_prefix_list: comps.PrefixListConfig | None = None
     domains: list[comps.DomainConfig] = Field(default_factory=list)
 
     external_http_port: int = 80
     external_https_port: int = 443
 
+    # Seconds a connection may be idle before the load balancer closes it
+    idle_timeout: int | None = Field(default=None, ge=1, le=4000)
+    # Redirect the HTTP port to HTTPS (only when HTTPS is supported)
+    redirect_http: bool = False
+    ssl_policy: cdk.SslPolicyName | None = None
+    # Nest domains or security groups once they grow large
+    nesting: comps.NestingConfig | None = None
+
+    @model_validator(mode="after")
+    def check_cdn_origin(self) -> "LoadBalancedConfig":
+        # CloudFront would follow the HTTP listener's redirect forever
+        if self.redirect_ports and self.http_cdn_domains:
+            raise ValueError(
+                "redirect_http needs cdn.origin_protocol HTTPS_ONLY for "
+                + ", ".join(self.http_cdn_domains)
+            )
+        return self
+
     @property
-    def use_efs(self) -> bool:
-        return len(self.container.volumes) > 0
+    def http_cdn_domains(self) -> list[str]:
+        # Domains whose distribution may reach the origin over HTTP
+        return [
+            domain.name
+            for domain in self.domains
+            if domain.cdn is not None
+            and domain.cdn.origin_protocol != "HTTPS_ONLY"
+        ]
 
     @property
     def supports_https(self) -> bool:
         return any(self.domains)
 
+    @property
+    def allowlist_report(self) -> allow.AllowlistReport:
+        return _allowlist_report(self, ports=len(tuple(self.external_ports)))
+
+    @property
+    def security_group_rules(self) -> int:
+        # Load balancer rules: the VPC, the allowlist, the internet and
+        # CloudFront
+        sources = 1 + int(self.public_access)
+        ports = len(tuple(self.external_ports))
+        cdn_ports = 0
+        if not self.public_access:
+            cdn_ports = len(
+                set(self.cdn_origin_ports) & set(self.external_ports)
+            )
+        return sources * ports + cdn_ports + self.allowlist_report.rules_after
+
+    @property
+    def cdn_origin_ports(self) -> Iterable[int]:
+        # Ports CloudFront connects to for domains served through a cdn
+        ports = set()
+        for domain in self.domains:
+            if domain.cdn is None:
+                continue
+            if domain.cdn.origin_protocol != "HTTPS_ONLY":
+                ports.add(domain.cdn.origin_http_port)
+            if domain.cdn.origin_protocol != "HTTP_ONLY":
+                ports.add(domain.cdn.origin_https_port)
+        return tuple(sorted(ports))
+
     @property
     def external_ports(self) -> Iterable[int]:
         if self.supports_https:
             return (self.external_http_port, self.external_https_port)
         return (self.external_http_port,)
+
+    @property
+    def redirect_ports(self) -> Iterable[int]:
+        if self.redirect_http and self.supports_https:
+            return (self.external_http_port,)
+        return ()
+
+    @property
+    def forward_ports(self) -> Iterable[int]:
+        return tuple(
+            port
+            for port in self.external_ports
+            if port not in self.redirect_ports
+        )
+
+
+class SharedAlbConfig(LoadBalancedConfig):
+    container_insights: bool = False
+
+
+class FargateConfig(LoadBalancedConfig):
+    container: comps.ContainerConfig
+    task: comps.TaskConfig = comps.TaskConfig()
+    scaling: comps.ScalingConfig = comps.ScalingConfig()
+    capacity: comps.CapacityConfig | None = None
+    deployment: comps.DeploymentConfig = comps.DeploymentConfig()
+    ingress_confs: list[comps.IngressConfig] = Field(default_factory=list)
+    # Listener rule used when attached to a SharedAlbStack
+    routing: comps.RoutingConfig | None = None
+
+    health_check: comps.HealthCheckConfig = comps.HealthCheckConfig()
+    # Seconds new targets ramp up before receiving their full share
+    slow_start: int | None = Field(default=None, ge=30, le=900)
+    # Seconds the load balancer waits before deregistering draining targets
+    deregistration_delay: int | None = Field(default=None, ge=0, le=3600)
+    load_balancing_algorithm: cdk.LoadBalancingAlgorithmName | None = None
+    # Load balancer cookie duration in seconds; unset disables stickiness
+    stickiness_seconds: int | None = Field(default=None, ge=1, le=604800)
+    protocol_version: cdk.ProtocolVersionName | None = None
+    # Dashboard, alarms and Container Insights
+    observability: comps.ObservabilityConfig | None = None
+
+    @model_validator(mode="after")
+    def check_container_size(self) -> "FargateConfig":
+        containers: list[comps.BaseContainerConfig] = [
+            self.container,
+            *self.container.sidecars,
+        ]
+        if sum(c.cpu or 0 for c in containers) > self.task.cpu:
+            raise ValueError("container cpu exceeds the task's cpu")
+        for container in containers:
+            if (
+                container.memory_limit_mib is not None
+                and container.memory_limit_mib > self.task.memory_mib
+            ):
+                raise ValueError("container memory exceeds the task's memory")
+        # Fargate reserves each container's soft limit (or hard limit)
+        reserved = sum(
+            c.memory_reservation_mib or c.memory_limit_mib or 0
+            for c in containers
+        )
+        if reserved > self.task.memory_mib:
+            raise ValueError("container memory exceeds the task's memory")
+        return self
+
+    @model_validator(mode="after")
+    def check_slow_start(self) -> "FargateConfig":
+        if (
+            self.slow_start is not None
+            and self.load_balancing_algorithm == "LEAST_OUTSTANDING_REQUESTS"
+        ):
+            raise ValueError(
+                "slow_start is not supported with least outstanding requests"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_shared_alb(self) -> "FargateConfig":
+        # The shared load balancer owns these; don't silently drop them
+        if self.routing is None:
+            return self
+        ignored = {
+            "public_access": self.public_access,
+            "ip_allowlist": self.ip_allowlist,
+            "allowlist_prefix_list": self.allowlist_prefix_list,
+            "idle_timeout": self.idle_timeout is not None,
+            "redirect_http": self.redirect_http,
+            "ssl_policy": self.ssl_policy is not None,
+        }
+        if any(ignored.values()):
+            names = ", ".join(name for name, set_ in ignored.items() if set_)
+            raise ValueError(
+                f"{names} must be set on the shared load balancer when "
+                "routing is used"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_protocol_version(self) -> "FargateConfig":
+        # GRPC and HTTP2 targets can only sit behind HTTPS listeners; a
+        # shared load balancer's listeners are checked when attaching
+        if self.routing is not None:
+            return self
+        if self.protocol_version in ("GRPC", "HTTP2") and any(
+            port != self.external_https_port for port in self.forward_ports
+        ):
+            raise ValueError(
+                f"{self.protocol_version} targets need HTTPS listeners; set "
+                "domains and redirect_http"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_blue_green(self) -> "FargateConfig":
+        blue_green = self.deployment.blue_green
+        if blue_green is None:
+            return self
+        if self.routing is not None:
+            raise ValueError(
+                "blue/green deploys need the service's own load balancer"
+            )
+        if len(tuple(self.forward_ports)) != 1:
+            raise ValueError(
+                "blue/green deploys shift a single listener; set "
+                "redirect_http when serving HTTPS"
+            )
+        if blue_green.test_port in self.external_ports:
+            raise ValueError("test_port must differ from the external ports")
+        return self
+
+    @property
+    def security_group_rules(self) -> int:
+        # Plus the service's own ingress rule and one per ingress config
+        return super().security_group_rules + 1 + len(self.ingress_confs)
+
+    @property
+    def use_efs(self) -> bool:
+        return len(self.container.all_volumes) > 0
+
+    @property
+    def route_hosts(self) -> list[str]:
+        # Route on the service's own domains unless hosts are given
+        if self.routing is not None and self.routing.hosts:
+            return self.routing.hosts
+        return [domain.name for domain in self.domains]
@@ -1,3 +1,37 @@
-from .fargate_stack import FargateStack
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["FargateStack"]
+if TYPE_CHECKING:
+    from .bastion_stack import BastionStack
+    from .cache_stack import CacheStack
+    from .fargate_stack import FargateStack
+    from .rds_stack import RdsStack
+    from .shared_alb_stack import SharedAlbStack
+    from .vpc_stack import VpcStack
+
+# Stacks are imported on first access; loading a stack module starts the
+# jsii runtime for every CDK submodule it uses.
+_MODULES = {
+    "BastionStack": ".bastion_stack",
+    "CacheStack": ".cache_stack",
+    "FargateStack": ".fargate_stack",
+    "RdsStack": ".rds_stack",
+    "SharedAlbStack": ".shared_alb_stack",
+    "VpcStack": ".vpc_stack",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_MODULES[name], __name__), name)
+
+
+__all__ = [
+    "BastionStack",
+    "CacheStack",
+    "FargateStack",
+    "RdsStack",
+    "SharedAlbStack",
+    "VpcStack",
+]
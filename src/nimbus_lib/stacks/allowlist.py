@@ -0,0 +1,71 @@
+from constructs import Construct
+from aws_cdk import (
+    CfnOutput,
+    Stack,
+    aws_ec2 as ec2,
+)
+from nimbus_lib import config as confs
+from nimbus_lib.config.allowlist import (
+    address_families,
+    compile_allowlist,
+    parse_entry,
+)
+from .nameable import Nameable
+from .profiling import profiled
+
+
+# Base for stacks that take an ip_allowlist
+class Allowlisting(Stack, Nameable):
+    @profiled
+    def allowlist_peers(
+        self,
+        config: confs.BastionConfig | confs.LoadBalancedConfig,
+        scope: Construct | None = None,
+    ) -> list[ec2.IPeer]:
+        # One peer per compiled CIDR, or one per prefix list
+        cidrs = compile_allowlist(config.ip_allowlist)
+        prefix_list = config.allowlist_prefix_list
+        if prefix_list is None:
+            return [
+                ec2.Peer.ipv6(cidr) if ":" in cidr else ec2.Peer.ipv4(cidr)
+                for cidr in cidrs
+            ]
+
+        peers = [ec2.Peer.prefix_list(list_id) for list_id in prefix_list.ids]
+        for family in address_families(cidrs):
+            entries = [c for c in cidrs if parse_entry(c).version == family]
+            created = self.allowlist_prefix_list(
+                family, entries, prefix_list.spare_entries, scope or self
+            )
+            peers.append(ec2.Peer.prefix_list(created.prefix_list_id))
+        return peers
+
+    def allowlist_prefix_list(
+        self,
+        family: int,
+        cidrs: list[str],
+        spare_entries: int,
+        scope: Construct,
+    ) -> ec2.PrefixList:
+        name = self._name(f"AllowlistIPv{family}")
+        # Every port and security group in the stack shares the list
+        existing = scope.node.try_find_child(name)
+        if isinstance(existing, ec2.PrefixList):
+            return existing
+
+        prefix_list = ec2.PrefixList(
+            scope,
+            name,
+            address_family=ec2.AddressFamily[f"IP_V{family}"],
+            max_entries=len(cidrs) + spare_entries,
+            entries=[
+                ec2.CfnPrefixList.EntryProperty(cidr=cidr) for cidr in cidrs
+            ],
+        )
+        # Other stacks can allow the same list via PrefixListConfig.ids
+        CfnOutput(
+            self,
+            self._name(f"AllowlistPrefixListIPv{family}"),
+            value=prefix_list.prefix_list_id,
+        )
+        return prefix_list
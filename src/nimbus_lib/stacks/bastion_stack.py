@@ -2,17 +2,16 @@ from typing import Generic, TypeVar
 from constructs import Construct
 from aws_cdk import (
     CfnOutput,
-    Stack,
     aws_ec2 as ec2,
 )
 from nimbus_lib import config as confs
-from .nameable import Nameable
+from .allowlist import Allowlisting
 
 # pylint: disable=invalid-name
 TConfig = TypeVar("TConfig", bound=confs.BastionConfig)
 
 
-class BastionStack(Stack, Nameable, Generic[TConfig]):
+class BastionStack(Allowlisting, Generic[TConfig]):
     @property
     def _base_name(self) -> str:
         return self.construct_id
@@ -82,11 +81,9 @@ class BastionStack(Stack, Nameable, Generic[TConfig]):
         )
 
         # Setup incoming access
-        for ip_address in config.ip_allowlist:
+        for peer in self.allowlist_peers(config):
             sec_group.add_ingress_rule(
-                ec2.Peer.ipv4(
-                    ip_address if "/" in ip_address else f"{ip_address}/32"
-                ),
+                peer,
                 ec2.Port.tcp(config.ssh_port),
                 "IP access from allowlist",
             )
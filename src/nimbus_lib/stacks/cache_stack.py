@@ -0,0 +1,162 @@
+from typing import Generic, TypeVar
+from constructs import Construct
+from aws_cdk import (
+    CfnOutput,
+    CfnResource,
+    Stack,
+    aws_ec2 as ec2,
+    aws_elasticache as elasticache,
+)
+from nimbus_lib import config as confs
+from .nameable import Nameable
+
+# pylint: disable=invalid-name
+TConfig = TypeVar("TConfig", bound=confs.CacheConfig)
+
+DEFAULT_ENGINE_VERSIONS = {"redis": "7.1", "valkey": "7.2"}
+
+
+class CacheStack(Stack, Nameable, Generic[TConfig]):
+    @property
+    def _base_name(self) -> str:
+        return self.construct_id
+
+    def __init__(
+        self,
+        scope: Construct,
+        config: TConfig,
+        **kwargs,
+    ) -> None:
+        self.construct_id = config.construct_id
+        super().__init__(scope, self.construct_id, **kwargs)
+        self.config = config
+
+        vpc = ec2.Vpc.from_lookup(
+            self,
+            self._name("VPC"),
+            vpc_id=config.vpc_id,
+        )
+
+        self.security_group = ec2.SecurityGroup(
+            self,
+            self._name("CacheSecurityGroup"),
+            vpc=vpc,
+            description=(
+                "Cache Security Group to allow connections from other subnets"
+            ),
+        )
+        subnet_ids = vpc.select_subnets(
+            subnet_type=ec2.SubnetType[config.subnet_type]
+        ).subnet_ids
+
+        if config.serverless:
+            self.endpoint_address = self.serverless_cache(config, subnet_ids)
+        else:
+            self.endpoint_address = self.replication_group(config, subnet_ids)
+
+        CfnOutput(
+            self,
+            self._name("CacheEndpoint"),
+            value=self.endpoint_address,
+            description="The endpoint address of the cache",
+        )
+
+        CfnOutput(
+            self,
+            self._name("CacheSecurityGroupID"),
+            value=self.security_group.security_group_id,
+            description="The ID of the cache's security group",
+        )
+
+    def engine_version(self, config: TConfig) -> str:
+        return config.engine_version or DEFAULT_ENGINE_VERSIONS[config.engine]
+
+    def replication_group(self, config: TConfig, subnet_ids: list[str]) -> str:
+        subnet_group = elasticache.CfnSubnetGroup(
+            self,
+            self._name("CacheSubnetGroup"),
+            description=f"Subnets for {self.construct_id}",
+            subnet_ids=subnet_ids,
+        )
+
+        engine_version = self.engine_version(config)
+        parameter_group_name = config.parameter_group_name
+        if parameter_group_name is None and config.cluster_mode:
+            major_version = engine_version.split(".", 1)[0]
+            parameter_group_name = (
+                f"default.{config.engine}{major_version}.cluster.on"
+            )
+
+        has_replicas = config.replicas_per_shard > 0
+        replication_group = elasticache.CfnReplicationGroup(
+            self,
+            self._name("CacheReplicationGroup"),
+            replication_group_description=self.construct_id,
+            engine=config.engine,
+            engine_version=engine_version,
+            cache_node_type=config.node_type,
+            cache_parameter_group_name=parameter_group_name,
+            cache_subnet_group_name=subnet_group.ref,
+            security_group_ids=[self.security_group.security_group_id],
+            port=config.port,
+            cluster_mode="enabled" if config.cluster_mode else "disabled",
+            num_node_groups=config.shards,
+            replicas_per_node_group=config.replicas_per_shard,
+            automatic_failover_enabled=has_replicas,
+            multi_az_enabled=has_replicas,
+            at_rest_encryption_enabled=True,
+            transit_encryption_enabled=config.transit_encryption,
+            snapshot_retention_limit=config.snapshot_retention_limit,
+        )
+
+        if config.cluster_mode:
+            return replication_group.attr_configuration_end_point_address
+
+        CfnOutput(
+            self,
+            self._name("CacheReaderEndpoint"),
+            value=replication_group.attr_reader_end_point_address,
+            description="The reader endpoint address of the cache",
+        )
+        return replication_group.attr_primary_end_point_address
+
+    def serverless_cache(self, config: TConfig, subnet_ids: list[str]) -> str:
+        usage_limits = {}
+        if config.max_data_storage_gb is not None:
+            usage_limits["DataStorage"] = {
+                "Maximum": config.max_data_storage_gb,
+                "Unit": "GB",
+            }
+        if config.max_ecpu_per_second is not None:
+            usage_limits["ECPUPerSecond"] = {
+                "Maximum": config.max_ecpu_per_second
+            }
+
+        # CDK 2.84 predates the ElastiCache Serverless L1 construct
+        serverless_cache = CfnResource(
+            self,
+            self._name("ServerlessCache"),
+            type="AWS::ElastiCache::ServerlessCache",
+            properties={
+                "ServerlessCacheName": config.serverless_cache_name,
+                "Engine": config.engine,
+                "MajorEngineVersion": self.engine_version(config).split(
+                    ".", 1
+                )[0],
+                "SecurityGroupIds": [self.security_group.security_group_id],
+                "SubnetIds": subnet_ids,
+                "CacheUsageLimits": usage_limits or None,
+                "SnapshotRetentionLimit": (
+                    config.snapshot_retention_limit or None
+                ),
+            },
+        )
+        return serverless_cache.get_att("Endpoint.Address").to_string()
+
+    def ingress_config(self) -> confs.IngressConfig:
+        # Lets a FargateConfig in the same app reach the cache via
+        # `ingress_confs`.
+        return confs.IngressConfig(
+            security_group_id=self.security_group.security_group_id,
+            port=self.config.port,
+        )
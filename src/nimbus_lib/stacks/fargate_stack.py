@@ -1,29 +1,35 @@
 # pylint: disable=unused-argument
-from typing import Any, Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 from constructs import Construct
 from aws_cdk import (
-    Fn,
     CfnOutput,
     Duration,
-    Stack,
+    Size,
     aws_certificatemanager as acm,
-    aws_route53 as route53,
-    aws_route53_targets as route53_targets,
     aws_efs as efs,
     aws_ec2 as ec2,
     aws_ecr as ecr,
     aws_ecs as ecs,
     aws_iam as iam,
     aws_elasticloadbalancingv2 as elbv2,
+    aws_applicationautoscaling as appscaling,
+    aws_cloudwatch as cloudwatch,
+    aws_codedeploy as codedeploy,
+    aws_logs as logs,
 )
 from nimbus_lib import config as confs
-from .nameable import Nameable
+from .load_balancing import LoadBalancing
+from .observability import Observability
+from .profiling import profiled
+
+if TYPE_CHECKING:
+    from .shared_alb_stack import SharedAlbStack
 
 # pylint: disable=invalid-name
 TConfig = TypeVar("TConfig", bound=confs.FargateConfig)
 
 
-class FargateStack(Stack, Nameable, Generic[TConfig]):
+class FargateStack(LoadBalancing, Observability, Generic[TConfig]):
     @property
     def _base_name(self) -> str:
         return self.construct_id
@@ -32,72 +38,298 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
         self,
         scope: Construct,
         config: TConfig,
+        shared: "SharedAlbStack | None" = None,
         **kwargs,
     ) -> None:
         self.construct_id = config.construct_id
         super().__init__(scope, self.construct_id, **kwargs)
+        self.file_systems: list[efs.IFileSystem] = []
 
         vpc = self.vpc(config.vpc_id)
-        fargate = self.fargate(config, vpc)
-        self.setup_scaling(config, fargate)
-
-        load_balancer = self.load_balancer(config, vpc)
-        certs = self.setup_domains(load_balancer, config.domains, vpc)
-        self.setup_listeners(
-            config,
-            load_balancer,
-            certs,
-            fargate,
+        fargate = self.fargate(
+            config, vpc, shared.cluster if shared is not None else None
         )
 
+        listeners: dict[int, elbv2.ApplicationListener] = {}
+        if shared is None:
+            load_balancer = self.load_balancer(config, vpc)
+            certs = self.setup_domains(
+                load_balancer,
+                config.domains,
+                vpc,
+                self.nested_scope(config, "domains"),
+            )
+            target_group = self.target_group(config, vpc, fargate)
+            listeners = self.setup_listeners(
+                config,
+                load_balancer,
+                certs,
+                target_group,
+            )
+        else:
+            load_balancer = shared.alb
+            certs = self.setup_domains(
+                load_balancer,
+                config.domains,
+                vpc,
+                self.nested_scope(config, "domains"),
+            )
+            target_group = self.target_group(config, vpc, fargate)
+            self.setup_listener_rules(config, shared, certs, target_group)
+        self.setup_scaling(config, fargate, target_group)
+
+        green_target_group = test_listener = None
+        if config.deployment.blue_green is not None:
+            # Before the alarms, which watch both target groups
+            green_target_group, test_listener = self.green_target_group(
+                config, vpc, load_balancer, config.deployment.blue_green
+            )
+
+        self.alarms: list[cloudwatch.Alarm] = []
+        if config.observability is not None:
+            self.alarms = self.setup_observability(
+                config.observability,
+                config.scaling,
+                fargate,
+                target_group,
+                self.file_systems,
+                container_insights=(
+                    config.observability.container_insights
+                    if shared is None
+                    else shared.config.container_insights
+                ),
+                green_target_group=green_target_group,
+            )
+
+        self.deployment_group: codedeploy.EcsDeploymentGroup | None = None
+        if green_target_group is not None and test_listener is not None:
+            # The config rejects blue/green on a shared load balancer
+            self.deployment_group = self.setup_blue_green(
+                config,
+                fargate,
+                target_group,
+                green_target_group,
+                test_listener,
+                listeners,
+            )
+
         CfnOutput(
             self,
             self._name("LoadBalancerDNS"),
             value=load_balancer.load_balancer_dns_name,
         )
 
-    def vpc(self, vpc_id: str | None) -> ec2.IVpc:
-        if vpc_id is not None:
-            return ec2.Vpc.from_lookup(
-                self,
-                self._name("VPC"),
-                vpc_id=vpc_id,
+    @profiled
+    def setup_container(
+        self,
+        config: TConfig,
+        taskdef: ecs.FargateTaskDefinition,
+    ) -> ecs.ContainerDefinition:
+        # The primary container is always the first definition
+        container = self.add_container(
+            config,
+            taskdef,
+            config.container,
+            index=0,
+            construct_name="TaskContainer",
+            environment=self.image_environment(config),
+            secrets=self.image_secrets(config),
+        )
+        container.add_port_mappings(
+            ecs.PortMapping(container_port=config.container.port)
+        )
+
+        return container
+
+    @profiled
+    def setup_sidecars(
+        self,
+        config: TConfig,
+        taskdef: ecs.FargateTaskDefinition,
+        container: ecs.ContainerDefinition,
+    ) -> dict[str, ecs.ContainerDefinition]:
+        sidecars = {}
+        for idx, sidecar_config in enumerate(config.container.sidecars):
+            sidecar = self.add_container(
+                config,
+                taskdef,
+                sidecar_config,
+                index=idx + 1,
+                construct_name=f"{sidecar_config.name}Sidecar",
+                environment=sidecar_config.environment,
+                container_name=sidecar_config.name,
+                essential=sidecar_config.essential,
+            )
+            if sidecar_config.port is not None:
+                sidecar.add_port_mappings(
+                    ecs.PortMapping(container_port=sidecar_config.port)
+                )
+            sidecars[sidecar_config.name] = sidecar
+
+        # Dependencies can only be added once every container exists
+        dependents: list[
+            tuple[confs.BaseContainerConfig, ecs.ContainerDefinition]
+        ] = [(config.container, container)]
+        dependents.extend(
+            (sidecar_config, sidecars[sidecar_config.name])
+            for sidecar_config in config.container.sidecars
+        )
+        for container_config, container_def in dependents:
+            container_def.add_container_dependencies(
+                *[
+                    ecs.ContainerDependency(
+                        container=sidecars[dependency.container],
+                        condition=ecs.ContainerDependencyCondition[
+                            dependency.condition
+                        ],
+                    )
+                    for dependency in container_config.depends_on
+                ]
             )
 
-        azs = Fn.get_azs()
-        return ec2.Vpc(self, self._name("VPC"), availability_zones=azs)
+        return sidecars
 
-    def setup_container(
+    # pylint: disable=too-many-arguments
+    def add_container(
         self,
         config: TConfig,
         taskdef: ecs.FargateTaskDefinition,
+        container_config: confs.BaseContainerConfig,
+        index: int,
+        construct_name: str,
+        environment: dict[str, Any],
+        secrets: dict[str, Any] | None = None,
+        container_name: str | None = None,
+        essential: bool | None = None,
     ) -> ecs.ContainerDefinition:
         command = None
-        if config.container.command:
-            command = config.container.command.split(" ")
+        if container_config.command:
+            command = container_config.command.split(" ")
 
         container = taskdef.add_container(
-            self._name("TaskContainer"),
-            image=self.container_image(config.container),
-            environment=self.image_environment(config),
-            secrets=self.image_secrets(config),
+            self._name(construct_name),
+            container_name=container_name,
+            essential=essential,
+            image=self.container_image(
+                container_config,
+                repo_name="Repo" if index == 0 else f"{construct_name}Repo",
+            ),
+            environment=environment,
+            secrets=secrets,
             command=command,
+            stop_timeout=self.stop_timeout(config, container_config),
+            logging=self.log_driver(container_config.logging),
+            health_check=self.container_health_check(
+                container_config.health_check
+            ),
+            linux_parameters=(
+                ecs.LinuxParameters(
+                    self,
+                    self._name(
+                        "LinuxParameters"
+                        if index == 0
+                        else f"{construct_name}LinuxParameters"
+                    ),
+                    init_process_enabled=True,
+                )
+                if container_config.init_process
+                else None
+            ),
+            cpu=container_config.cpu,
+            memory_limit_mib=container_config.memory_limit_mib,
+            memory_reservation_mib=container_config.memory_reservation_mib,
+            readonly_root_filesystem=(
+                container_config.readonly_root_filesystem or None
+            ),
         )
-        container.add_port_mappings(
-            ecs.PortMapping(container_port=config.container.port)
+        container.add_ulimits(
+            *[
+                ecs.Ulimit(
+                    name=ecs.UlimitName[ulimit.name],
+                    soft_limit=ulimit.soft_limit,
+                    hard_limit=ulimit.hard_limit,
+                )
+                for ulimit in container_config.ulimits
+            ]
         )
 
+        logging = container_config.logging
+        if logging is not None and logging.max_buffer_size_mib is not None:
+            # AwsLogDriver has no max-buffer-size option in this CDK
+            # version, so set it on the rendered container definition.
+            cfn_taskdef = taskdef.node.default_child
+            cfn_taskdef.add_property_override(  # type: ignore
+                (
+                    f"ContainerDefinitions.{index}.LogConfiguration.Options"
+                    ".max-buffer-size"
+                ),
+                f"{logging.max_buffer_size_mib}m",
+            )
+
         return container
 
+    def stop_timeout(
+        self,
+        config: TConfig,
+        container_config: confs.BaseContainerConfig | None = None,
+    ) -> Duration | None:
+        if container_config is None:
+            container_config = config.container
+        # An explicit container stop timeout wins over the spot default
+        if container_config.stop_timeout is not None:
+            return Duration.seconds(container_config.stop_timeout)
+        if config.capacity is not None and config.capacity.uses_spot:
+            return Duration.seconds(config.capacity.spot_stop_timeout)
+        return None
+
+    def log_driver(
+        self, logging: confs.LoggingConfig | None
+    ) -> ecs.LogDriver | None:
+        if logging is None:
+            return None
+        return ecs.LogDrivers.aws_logs(
+            stream_prefix=logging.stream_prefix,
+            log_retention=(
+                logs.RetentionDays[logging.retention]
+                if logging.retention is not None
+                else None
+            ),
+            mode=(
+                ecs.AwsLogDriverMode.NON_BLOCKING
+                if logging.non_blocking
+                else ecs.AwsLogDriverMode.BLOCKING
+            ),
+        )
+
+    def container_health_check(
+        self, health_check: confs.ContainerHealthCheckConfig | None
+    ) -> ecs.HealthCheck | None:
+        if health_check is None:
+            return None
+        return ecs.HealthCheck(
+            command=health_check.command,
+            interval=Duration.seconds(health_check.interval),
+            timeout=Duration.seconds(health_check.timeout),
+            retries=health_check.retries,
+            start_period=(
+                Duration.seconds(health_check.start_period)
+                if health_check.start_period is not None
+                else None
+            ),
+        )
+
+    @profiled
     def efs_filesystem(
         self,
         vpc: ec2.IVpc,
         fargate_sg: ec2.SecurityGroup,
         filesystem_id: str | None = None,
+        filesystem_config: confs.FileSystemConfig | None = None,
+        suffix: str = "",
     ) -> efs.IFileSystem:
         filesys_sg = ec2.SecurityGroup(
             self,
-            self._name("FileSystemSecGrp"),
+            self._name(f"FileSystemSecGrp{suffix}"),
             vpc=vpc,
         )
         # Give the fargate service access
@@ -106,26 +338,48 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
             ec2.Port.tcp(2049),
         )
 
-        if filesystem_id is None:
-            # Create an EFS file system
-            file_system = efs.FileSystem(
+        if filesystem_id is not None:
+            return efs.FileSystem.from_file_system_attributes(
                 self,
-                self._name("FileSystem"),
-                vpc=vpc,
-                performance_mode=efs.PerformanceMode.GENERAL_PURPOSE,
-                security_group=filesys_sg,
-            )
-        else:
-            file_system = efs.FileSystem.from_file_system_attributes(
-                self,
-                self._name("FileSystem"),
+                self._name(f"FileSystem{suffix}"),
                 file_system_id=filesystem_id,
                 security_group=filesys_sg,
             )
 
-        return file_system
+        if filesystem_config is None:
+            filesystem_config = confs.FileSystemConfig()
+
+        # Create an EFS file system
+        return efs.FileSystem(
+            self,
+            self._name("FileSystem"),
+            vpc=vpc,
+            performance_mode=efs.PerformanceMode[
+                filesystem_config.performance_mode
+            ],
+            throughput_mode=efs.ThroughputMode[
+                filesystem_config.throughput_mode
+            ],
+            provisioned_throughput_per_second=(
+                Size.mebibytes(filesystem_config.provisioned_throughput)
+                if filesystem_config.provisioned_throughput is not None
+                else None
+            ),
+            lifecycle_policy=(
+                efs.LifecyclePolicy[filesystem_config.lifecycle_policy]
+                if filesystem_config.lifecycle_policy is not None
+                else None
+            ),
+            out_of_infrequent_access_policy=(
+                efs.OutOfInfrequentAccessPolicy.AFTER_1_ACCESS
+                if filesystem_config.out_of_ia_on_access
+                else None
+            ),
+            security_group=filesys_sg,
+        )
 
     # pylint: disable=too-many-arguments
+    @profiled
     def setup_container_volumes(
         self,
         config: TConfig,
@@ -133,38 +387,97 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
         fargate_sg: ec2.SecurityGroup,
         taskdef: ecs.FargateTaskDefinition,
         container: ecs.ContainerDefinition,
+        sidecars: dict[str, ecs.ContainerDefinition] | None = None,
     ) -> None:
         filesystems = {}
 
-        # Create all volumes and corresponding mount points
-        for idx, volume_config in enumerate(config.container.volumes):
-            file_system = filesystems.setdefault(
-                volume_config.filesys_id,
-                self.efs_filesystem(vpc, fargate_sg, volume_config.filesys_id),
+        mounts = [
+            (container, volume_config)
+            for volume_config in config.container.volumes
+        ]
+        for sidecar_config in config.container.sidecars:
+            mounts.extend(
+                ((sidecars or {})[sidecar_config.name], volume_config)
+                for volume_config in sidecar_config.volumes
             )
 
+        # A single filesystem keeps the original construct IDs; with
+        # several, imported ones get their own constructs, named by ID
+        single = len({volume.filesys_id for _, volume in mounts}) == 1
+
+        # Create all volumes and corresponding mount points
+        for idx, (mount_container, volume_config) in enumerate(mounts):
+            # Each filesystem (and its security group) is created once
+            if volume_config.filesys_id not in filesystems:
+                filesystems[volume_config.filesys_id] = self.efs_filesystem(
+                    vpc,
+                    fargate_sg,
+                    volume_config.filesys_id,
+                    volume_config.filesystem,
+                    "" if single else volume_config.filesys_id or "",
+                )
+                self.file_systems.append(filesystems[volume_config.filesys_id])
+            file_system = filesystems[volume_config.filesys_id]
+
+            authorization_config = None
+            if volume_config.access_point is not None:
+                access_point = self.access_point(
+                    idx, file_system, volume_config.access_point
+                )
+                authorization_config = ecs.AuthorizationConfig(
+                    access_point_id=access_point.access_point_id
+                )
+
             volume_name = f"vol-{idx}"
             taskdef.add_volume(
                 name=volume_name,
                 efs_volume_configuration=ecs.EfsVolumeConfiguration(
                     file_system_id=file_system.file_system_id,
                     transit_encryption="ENABLED",
+                    authorization_config=authorization_config,
                 ),
             )
-            container.add_mount_points(
+            mount_container.add_mount_points(
                 ecs.MountPoint(
                     source_volume=volume_name,
-                    read_only=False,
+                    read_only=volume_config.read_only,
                     container_path=volume_config.path,
                 )
             )
 
+    def access_point(
+        self,
+        idx: int,
+        file_system: efs.IFileSystem,
+        access_point_config: confs.AccessPointConfig,
+    ) -> efs.AccessPoint:
+        return efs.AccessPoint(
+            self,
+            self._name(f"AccessPoint{idx}"),
+            file_system=file_system,
+            path=access_point_config.path,
+            create_acl=efs.Acl(
+                owner_uid=str(access_point_config.uid),
+                owner_gid=str(access_point_config.gid),
+                permissions=access_point_config.permissions,
+            ),
+            posix_user=efs.PosixUser(
+                uid=str(access_point_config.uid),
+                gid=str(access_point_config.gid),
+            ),
+        )
+
+    @profiled
     def task_definition(
         self, config: TConfig, vpc: ec2.IVpc, fargate_sg: ec2.SecurityGroup
     ) -> ecs.FargateTaskDefinition:
         taskdef = ecs.FargateTaskDefinition(
             self,
             self._name("FargateTaskDef"),
+            cpu=config.task.cpu,
+            memory_limit_mib=config.task.memory_mib,
+            ephemeral_storage_gib=config.task.ephemeral_storage_gib,
+            runtime_platform=self.runtime_platform(config.task),
             # Pyright ignore is necessary due to inconsistencies in
             # parameter naming ("grantee" vs "identity"), not types.
             task_role=self.task_role(config),  # pyright: ignore
@@ -172,19 +485,37 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
         )
 
         container = self.setup_container(config, taskdef)
+        sidecars = self.setup_sidecars(config, taskdef, container)
         if config.use_efs:
             self.setup_container_volumes(
-                config, vpc, fargate_sg, taskdef, container
+                config, vpc, fargate_sg, taskdef, container, sidecars
             )
 
         return taskdef
 
+    def runtime_platform(
+        self, config: confs.TaskConfig
+    ) -> ecs.RuntimePlatform:
+        if config.architecture == confs.CpuArchitecture.ARM64:
+            cpu_architecture = ecs.CpuArchitecture.ARM64
+        elif config.architecture == confs.CpuArchitecture.X86_64:
+            cpu_architecture = ecs.CpuArchitecture.X86_64
+        else:
+            raise NotImplementedError(
+                f"Unimplemented cpu architecture: {config.architecture}"
+            )
+
+        return ecs.RuntimePlatform(
+            cpu_architecture=cpu_architecture,
+            operating_system_family=ecs.OperatingSystemFamily.LINUX,
+        )
+
     def container_image(
-        self, config: confs.ContainerConfig
+        self, config: confs.BaseContainerConfig, repo_name: str = "Repo"
     ) -> ecs.ContainerImage:
         if config.source == confs.ContainerImageSource.ECR:
             container_repo = ecr.Repository.from_repository_name(
-                self, self._name("Repo"), config.image
+                self, self._name(repo_name), config.image
             )
 
             return ecs.ContainerImage.from_ecr_repository(
@@ -205,6 +536,7 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
     def image_secrets(self, config: TConfig) -> dict[str, Any]:
         return {}
 
+    @profiled
     def task_role(self, config: TConfig) -> iam.Role:
         # Setup role permissions
         return iam.Role(
@@ -213,6 +545,7 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
             assumed_by=iam.ServicePrincipal("ecs-tasks.amazonaws.com"),
         )
 
+    @profiled
     def task_execution_role(self, config: TConfig) -> iam.Role:
         # Setup role permissions
         role = iam.Role(
@@ -240,12 +573,29 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
 
         return role
 
-    def fargate(self, config: TConfig, vpc: ec2.IVpc) -> ecs.FargateService:
+    @profiled
+    def fargate(
+        self,
+        config: TConfig,
+        vpc: ec2.IVpc,
+        cluster: ecs.ICluster | None = None,
+    ) -> ecs.FargateService:
         #
         # SETUP THE FARGATE SERVICE
         #
 
-        cluster = ecs.Cluster(self, self._name("Cluster"), vpc=vpc)
+        if cluster is None:
+            cluster = ecs.Cluster(
+                self,
+                self._name("Cluster"),
+                vpc=vpc,
+                enable_fargate_capacity_providers=config.capacity is not None,
+                container_insights=(
+                    config.observability.container_insights
+                    if config.observability is not None
+                    else None
+                ),
+            )
 
         # Create Fargate Service
 
@@ -260,140 +610,412 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
                 config, vpc, fargate_egress_sg
             ),
             security_groups=[fargate_ingress_sg, fargate_egress_sg],
+            capacity_provider_strategies=self.capacity_provider_strategies(
+                config
+            ),
+            min_healthy_percent=config.deployment.min_healthy_percent,
+            max_healthy_percent=config.deployment.max_healthy_percent,
+            circuit_breaker=(
+                ecs.DeploymentCircuitBreaker(
+                    rollback=config.deployment.rollback
+                )
+                if config.deployment.circuit_breaker
+                else None
+            ),
+            health_check_grace_period=(
+                Duration.seconds(config.deployment.health_check_grace_period)
+                if config.deployment.health_check_grace_period is not None
+                else None
+            ),
+            deployment_controller=(
+                ecs.DeploymentController(
+                    type=ecs.DeploymentControllerType.CODE_DEPLOY
+                )
+                if config.deployment.blue_green is not None
+                else None
+            ),
         )
 
         return fargate
 
-    def setup_domains(
-        self,
-        load_balancer: elbv2.ApplicationLoadBalancer,
-        domains: list[confs.DomainConfig],
-        vpc: ec2.IVpc,
-    ) -> list[acm.ICertificate]:
-        certs = []
-        # Setup certificates and zones
-        for domain in domains:
-            # Retrieve Route53 Alias Record to point to the Load Balancer
-            zone_name = self._name(f"{domain.name}HostedZone")
-
-            if domain.create_zone:
-                hosted_zone = route53.HostedZone(
-                    self,
-                    zone_name,
-                    zone_name=domain.domain,
-                    vpcs=[vpc] if domain.private_zone else None,
-                )
-            else:
-                hosted_zone = route53.HostedZone.from_lookup(
-                    self,
-                    zone_name,
-                    domain_name=domain.domain,
-                    private_zone=domain.private_zone,
-                    vpc_id=vpc.vpc_id if domain.private_zone else None,
-                )
+    def capacity_provider_strategies(
+        self, config: TConfig
+    ) -> list[ecs.CapacityProviderStrategy] | None:
+        # Without a capacity config the service uses the FARGATE launch type
+        if config.capacity is None:
+            return None
 
-            cert_name = self._name(f"{domain.name}Cert")
-            certificate = acm.Certificate(
-                self,
-                cert_name,
-                domain_name=domain.name,
-                validation=acm.CertificateValidation.from_dns(hosted_zone),
+        strategies = [
+            ecs.CapacityProviderStrategy(
+                capacity_provider="FARGATE",
+                base=config.capacity.on_demand_base,
+                weight=config.capacity.on_demand_weight,
             )
-            certs.append(certificate)
-
-            route53.ARecord(
-                self,
-                self._name(f"{domain.name}ARecord"),
-                zone=hosted_zone,
-                record_name=domain.name,
-                target=route53.RecordTarget.from_alias(
-                    route53_targets.LoadBalancerTarget(load_balancer)
-                ),
+        ]
+        if config.capacity.uses_spot:
+            strategies.append(
+                ecs.CapacityProviderStrategy(
+                    capacity_provider="FARGATE_SPOT",
+                    weight=config.capacity.spot_weight,
+                )
             )
+        return strategies
 
-        return certs
-
+    @profiled
     def setup_scaling(
-        self, config: TConfig, fargate: ecs.FargateService
+        self,
+        config: TConfig,
+        fargate: ecs.FargateService,
+        target_group: elbv2.ApplicationTargetGroup,
     ) -> None:
-        # Setup AutoScaling policy
+        # Setup AutoScaling policies
         scaling = fargate.auto_scale_task_count(
-            max_capacity=config.scaling.max_task_count
+            min_capacity=config.scaling.min_task_count,
+            max_capacity=config.scaling.max_task_count,
+        )
+        for idx, policy in enumerate(config.scaling.scaling_policies):
+            self.scaling_policy(scaling, policy, target_group, idx)
+
+    def scaling_policy(
+        self,
+        scaling: ecs.ScalableTaskCount,
+        policy: confs.ScalingPolicy,
+        target_group: elbv2.ApplicationTargetGroup,
+        idx: int,
+    ) -> None:
+        # The first CPU policy keeps its original construct ID
+        suffix = "" if idx == 0 else str(idx)
+
+        if isinstance(policy, confs.CpuScalingPolicy):
+            scaling.scale_on_cpu_utilization(
+                self._name(f"CpuScaling{suffix}"),
+                target_utilization_percent=policy.target_util_pct,
+                scale_in_cooldown=Duration.seconds(policy.scale_in_cooldown),
+                scale_out_cooldown=Duration.seconds(policy.scale_out_cooldown),
+            )
+        elif isinstance(policy, confs.MemoryScalingPolicy):
+            scaling.scale_on_memory_utilization(
+                self._name(f"MemoryScaling{suffix}"),
+                target_utilization_percent=policy.target_util_pct,
+                scale_in_cooldown=Duration.seconds(policy.scale_in_cooldown),
+                scale_out_cooldown=Duration.seconds(policy.scale_out_cooldown),
+            )
+        elif isinstance(policy, confs.RequestCountScalingPolicy):
+            scaling.scale_on_request_count(
+                self._name(f"RequestCountScaling{suffix}"),
+                requests_per_target=policy.requests_per_target,
+                target_group=target_group,
+                scale_in_cooldown=Duration.seconds(policy.scale_in_cooldown),
+                scale_out_cooldown=Duration.seconds(policy.scale_out_cooldown),
+            )
+        elif isinstance(policy, confs.ResponseTimeScalingPolicy):
+            scaling.scale_to_track_custom_metric(
+                self._name(f"ResponseTimeScaling{suffix}"),
+                metric=target_group.metrics.target_response_time(
+                    statistic=policy.statistic
+                ),
+                target_value=policy.target_seconds,
+                scale_in_cooldown=Duration.seconds(policy.scale_in_cooldown),
+                scale_out_cooldown=Duration.seconds(policy.scale_out_cooldown),
+            )
+        elif isinstance(policy, confs.StepScalingPolicy):
+            scaling.scale_on_metric(
+                self._name(f"StepScaling{suffix}"),
+                metric=cloudwatch.Metric(
+                    namespace=policy.namespace,
+                    metric_name=policy.metric_name,
+                    dimensions_map=policy.dimensions,
+                    statistic=policy.statistic,
+                    period=Duration.seconds(policy.period),
+                ),
+                scaling_steps=[
+                    appscaling.ScalingInterval(
+                        change=step.change, lower=step.lower, upper=step.upper
+                    )
+                    for step in policy.steps
+                ],
+                adjustment_type=appscaling.AdjustmentType[
+                    policy.adjustment_type
+                ],
+                cooldown=Duration.seconds(policy.cooldown),
+                evaluation_periods=policy.evaluation_periods,
+            )
+        else:
+            raise NotImplementedError(
+                f"Unimplemented scaling policy: {policy.kind}"
+            )
+
+    @profiled
+    def target_group(
+        self,
+        config: TConfig,
+        vpc: ec2.IVpc,
+        fargate: ecs.FargateService | None,
+        name: str = "TargetGroup",
+    ) -> elbv2.ApplicationTargetGroup:
+        # A single target group is shared by every listener so that
+        # per-target metrics reflect all of the service's traffic.
+        return elbv2.ApplicationTargetGroup(
+            self,
+            self._name(name),
+            vpc=vpc,
+            port=config.container.port,  # HTTPS terminates at the balancer
+            protocol=elbv2.ApplicationProtocol.HTTP,
+            target_type=elbv2.TargetType.IP,
+            # Only the primary container receives load balancer traffic;
+            # CodeDeploy registers tasks in a blue/green target group
+            targets=(
+                [
+                    fargate.load_balancer_target(
+                        container_name=self._name("TaskContainer"),
+                        container_port=config.container.port,
+                    )
+                ]
+                if fargate is not None
+                else None
+            ),
+            health_check=self.health_check(
+                config.health_check, grpc=config.protocol_version == "GRPC"
+            ),
+            slow_start=(
+                Duration.seconds(config.slow_start)
+                if config.slow_start is not None
+                else None
+            ),
+            deregistration_delay=(
+                Duration.seconds(config.deregistration_delay)
+                if config.deregistration_delay is not None
+                else None
+            ),
+            load_balancing_algorithm_type=(
+                elbv2.TargetGroupLoadBalancingAlgorithmType[
+                    config.load_balancing_algorithm
+                ]
+                if config.load_balancing_algorithm is not None
+                else None
+            ),
+            stickiness_cookie_duration=(
+                Duration.seconds(config.stickiness_seconds)
+                if config.stickiness_seconds is not None
+                else None
+            ),
+            protocol_version=(
+                elbv2.ApplicationProtocolVersion[config.protocol_version]
+                if config.protocol_version is not None
+                else None
+            ),
         )
-        scaling.scale_on_cpu_utilization(
-            self._name("CpuScaling"),
-            target_utilization_percent=config.scaling.target_cpu_util_pct,
-            scale_in_cooldown=Duration.seconds(60),
-            scale_out_cooldown=Duration.seconds(60),
+
+    def health_check(
+        self, config: confs.HealthCheckConfig, grpc: bool = False
+    ) -> elbv2.HealthCheck:
+        return elbv2.HealthCheck(
+            path=config.path,
+            healthy_http_codes=None if grpc else config.healthy_http_codes,
+            healthy_grpc_codes=config.healthy_grpc_codes if grpc else None,
+            interval=Duration.seconds(config.interval),
+            timeout=Duration.seconds(config.timeout),
+            healthy_threshold_count=config.healthy_threshold,
+            unhealthy_threshold_count=config.unhealthy_threshold,
         )
 
+    @profiled
     def setup_listeners(
         self,
         config: TConfig,
         load_balancer: elbv2.ApplicationLoadBalancer,
         certs: list[acm.ICertificate],
-        fargate: ecs.FargateService,
-    ):
+        target_group: elbv2.ApplicationTargetGroup,
+    ) -> dict[int, elbv2.ApplicationListener]:
+        listeners = {}
         for port in config.external_ports:
-            listener_name = f"Listener{port}"
-            listener = load_balancer.add_listener(
-                self._name(listener_name), port=port, open=False
-            )
-            listener.add_targets(
-                f"{listener_name}Target",
-                port=config.container.port,  # HTTPS terminates at the balancer
-                targets=[fargate],
-            )
-
-            if port == config.external_https_port:
-                listener.add_certificates(
-                    self._name(f"{listener_name}Certs"), certs
+            listener = self.listener(config, load_balancer, port, certs)
+            if port in config.forward_ports:
+                listener.add_target_groups(
+                    f"Listener{port}Target",
+                    target_groups=[target_group],
                 )
-            # TODO healthcheck
+            listeners[port] = listener
+        return listeners
 
-    def load_balancer(
-        self, config: TConfig, vpc: ec2.IVpc
-    ) -> elbv2.ApplicationLoadBalancer:
-        # Create a Security Group for the Load Balancer
-        lb_security_group = ec2.SecurityGroup(
-            self, self._name("LBSecGrp"), vpc=vpc
+    @profiled
+    def green_target_group(
+        self,
+        config: TConfig,
+        vpc: ec2.IVpc,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        blue_green: confs.BlueGreenConfig,
+    ) -> tuple[elbv2.ApplicationTargetGroup, elbv2.ApplicationListener]:
+        # Replacement tasks start in the green target group behind the
+        # test listener, then CodeDeploy shifts the production listener
+        green_target_group = self.target_group(
+            config, vpc, None, "GreenTargetGroup"
         )
+        test_listener = load_balancer.add_listener(
+            self._name(f"Listener{blue_green.test_port}"),
+            port=blue_green.test_port,
+            protocol=elbv2.ApplicationProtocol.HTTP,
+            open=False,
+            default_target_groups=[green_target_group],
+        )
+        load_balancer.connections.allow_from(
+            ec2.Peer.ipv4(vpc.vpc_cidr_block),
+            ec2.Port.tcp(blue_green.test_port),
+            "Blue/green test traffic from VPC",
+        )
+        return green_target_group, test_listener
 
-        for port in config.external_ports:
-            lb_security_group.add_ingress_rule(
-                ec2.Peer.ipv4(vpc.vpc_cidr_block),
-                ec2.Port.tcp(port),
-                "Allow http inbound from VPC",
-            )
+    # pylint: disable=too-many-arguments
+    @profiled
+    def setup_blue_green(
+        self,
+        config: TConfig,
+        fargate: ecs.FargateService,
+        target_group: elbv2.ApplicationTargetGroup,
+        green_target_group: elbv2.ApplicationTargetGroup,
+        test_listener: elbv2.ApplicationListener,
+        listeners: dict[int, elbv2.ApplicationListener],
+    ) -> codedeploy.EcsDeploymentGroup:
+        blue_green = config.deployment.blue_green
+        if blue_green is None:
+            raise ValueError(f"{config.stack_name}: blue_green is not set")
 
-            # If specified, allow access from this IP.
-            for ip_address in config.ip_allowlist:
-                lb_security_group.add_ingress_rule(
-                    ec2.Peer.ipv4(
-                        ip_address if "/" in ip_address else f"{ip_address}/32"
+        (port,) = config.forward_ports
+        alarms = self.alarms if blue_green.rollback_on_alarm else []
+        return codedeploy.EcsDeploymentGroup(
+            self,
+            self._name("DeploymentGroup"),
+            service=fargate,
+            blue_green_deployment_config=(
+                codedeploy.EcsBlueGreenDeploymentConfig(
+                    blue_target_group=target_group,
+                    green_target_group=green_target_group,
+                    listener=listeners[port],
+                    test_listener=test_listener,
+                    termination_wait_time=Duration.minutes(
+                        blue_green.termination_wait
                     ),
-                    ec2.Port.tcp(port),
-                    "developer access",
-                )
-            # If specified, allow access from the entire internet
-            if config.public_access:
-                lb_security_group.add_ingress_rule(
-                    ec2.Peer.any_ipv4(),
-                    ec2.Port.tcp(port),
-                    "unrestricted internet access",
                 )
+            ),
+            deployment_config=self.deployment_config(blue_green),
+            alarms=alarms or None,
+            auto_rollback=codedeploy.AutoRollbackConfig(
+                failed_deployment=True,
+                stopped_deployment=True,
+                deployment_in_alarm=bool(alarms),
+            ),
+        )
+
+    def deployment_config(
+        self, blue_green: confs.BlueGreenConfig
+    ) -> codedeploy.IEcsDeploymentConfig:
+        if blue_green.traffic_shift == "all_at_once":
+            return codedeploy.EcsDeploymentConfig.ALL_AT_ONCE
 
-        # Create a Application Load Balancer
-        load_balancer = elbv2.ApplicationLoadBalancer(
+        interval = Duration.minutes(blue_green.shift_interval)
+        traffic_routing = (
+            codedeploy.TrafficRouting.time_based_canary(
+                interval=interval, percentage=blue_green.shift_percent
+            )
+            if blue_green.traffic_shift == "canary"
+            else codedeploy.TrafficRouting.time_based_linear(
+                interval=interval, percentage=blue_green.shift_percent
+            )
+        )
+        return codedeploy.EcsDeploymentConfig(
             self,
-            self._name("LoadBalancer"),
-            vpc=vpc,
-            internet_facing=True,
-            security_group=lb_security_group,
+            self._name("DeploymentConfig"),
+            traffic_routing=traffic_routing,
         )
 
-        return load_balancer
+    @profiled
+    def setup_listener_rules(
+        self,
+        config: TConfig,
+        shared: "SharedAlbStack",
+        certs: list[acm.ICertificate],
+        target_group: elbv2.ApplicationTargetGroup,
+    ) -> None:
+        if config.routing is None:
+            raise ValueError(
+                f"{config.stack_name}: routing is required to attach to a "
+                "shared load balancer"
+            )
+
+        conditions = []
+        if config.route_hosts:
+            conditions.append(
+                elbv2.ListenerCondition.host_headers(config.route_hosts)
+            )
+        if config.routing.paths:
+            conditions.append(
+                elbv2.ListenerCondition.path_patterns(config.routing.paths)
+            )
+        if not conditions:
+            raise ValueError(
+                f"{config.stack_name}: routing needs hosts, paths or domains"
+            )
+        if config.protocol_version in ("GRPC", "HTTP2") and any(
+            port != shared.https_port for port in shared.listeners
+        ):
+            raise ValueError(
+                f"{config.stack_name}: {config.protocol_version} targets need "
+                "HTTPS listeners; set domains and redirect_http on the shared "
+                "load balancer"
+            )
+        if shared.config.redirect_ports and config.http_cdn_domains:
+            raise ValueError(
+                f"{config.stack_name}: the shared load balancer redirects "
+                "HTTP; set cdn.origin_protocol HTTPS_ONLY for "
+                + ", ".join(config.http_cdn_domains)
+            )
+        if certs and shared.https_port is None:
+            raise ValueError(
+                f"{config.stack_name}: the shared load balancer has no HTTPS "
+                "listener for this service's certificates"
+            )
+
+        # Rules and certificates live in this stack so the shared stack
+        # never depends on a service stack.
+        for port, listener in shared.listeners.items():
+            listener_name = f"Listener{port}"
+            elbv2.ApplicationListenerRule(
+                self,
+                self._name(f"{listener_name}Rule"),
+                listener=listener,
+                priority=config.routing.priority,
+                conditions=conditions,
+                target_groups=[target_group],
+            )
 
+            if certs and port == shared.https_port:
+                elbv2.ApplicationListenerCertificate(
+                    self,
+                    self._name(f"{listener_name}Certs"),
+                    listener=listener,
+                    certificates=certs,
+                )
+
+            # CloudFront reaches this service's cdn domains through the
+            # shared load balancer
+            if (
+                port in config.cdn_origin_ports
+                and not shared.config.public_access
+            ):
+                ec2.CfnSecurityGroupIngress(
+                    self,
+                    self._name(f"{listener_name}CdnIngress"),
+                    group_id=shared.alb.connections.security_groups[
+                        0
+                    ].security_group_id,
+                    ip_protocol="tcp",
+                    from_port=port,
+                    to_port=port,
+                    source_prefix_list_id=self.cdn_origin_prefix_list(self),
+                    description="cloudfront origin access",
+                )
+
+    @profiled
     def fargate_security_groups(
         self, config: TConfig, vpc: ec2.IVpc
     ) -> tuple[ec2.SecurityGroup, ec2.SecurityGroup]:
@@ -401,9 +1023,11 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
         # SECURITY GROUPS AND NETWORKING
         #
 
+        scope = self.nested_scope(config, "security_groups")
+
         # Setup incoming access
         ingress_sec_group = ec2.SecurityGroup(
-            self,
+            scope,
             self._name("FargateIngressSecGrp"),
             vpc=vpc,
             description=(
@@ -418,7 +1042,7 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
 
         # Setup access to AWS resources
         egress_sec_group = ec2.SecurityGroup(
-            self,
+            scope,
             self._name("FargateEgressSecGrp"),
             vpc=vpc,
             description=(
@@ -429,7 +1053,7 @@ class FargateStack(Stack, Nameable, Generic[TConfig]):
         # Give fargate access to all of the ingress configurations
         for idx, ingress in enumerate(config.ingress_confs):
             conf_security_group = ec2.SecurityGroup.from_security_group_id(
-                self,
+                scope,
                 self._name(f"IngressSecGrp{idx}"),
                 security_group_id=ingress.security_group_id,
             )
@@ -0,0 +1,354 @@
+from typing import Literal
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    Fn,
+    NestedStack,
+    aws_certificatemanager as acm,
+    aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
+    aws_route53 as route53,
+    aws_route53_targets as route53_targets,
+    aws_ec2 as ec2,
+    aws_elasticloadbalancingv2 as elbv2,
+    custom_resources as cr,
+)
+from nimbus_lib import config as confs
+from .allowlist import Allowlisting
+from .profiling import profiled
+
+CLOUDFRONT_ORIGIN_FACING = "com.amazonaws.global.cloudfront.origin-facing"
+
+
+# Base for stacks that own an Application Load Balancer
+class LoadBalancing(Allowlisting):
+    @profiled
+    def nested_scope(
+        self,
+        config: confs.LoadBalancedConfig,
+        group: Literal["domains", "security_groups"],
+    ) -> Construct:
+        # Large groups move into a nested stack, keeping the parent clear
+        # of CloudFormation's resource count and template size limits
+        if config.nesting is None:
+            return self
+        if group == "domains":
+            size, threshold = len(config.domains), config.nesting.domains
+        else:
+            size = config.security_group_rules
+            threshold = config.nesting.security_group_rules
+        if threshold is None or size <= threshold:
+            return self
+
+        name = self._name("Domains" if group == "domains" else "SecGrps")
+        existing = self.node.try_find_child(name)
+        if isinstance(existing, NestedStack):
+            return existing
+        return NestedStack(self, name)
+
+    @profiled
+    def vpc(self, vpc_id: str | None) -> ec2.IVpc:
+        if vpc_id is not None:
+            return ec2.Vpc.from_lookup(
+                self,
+                self._name("VPC"),
+                vpc_id=vpc_id,
+            )
+
+        azs = Fn.get_azs()
+        return ec2.Vpc(self, self._name("VPC"), availability_zones=azs)
+
+    @profiled
+    def setup_domains(
+        self,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        domains: list[confs.DomainConfig],
+        vpc: ec2.IVpc,
+        scope: Construct | None = None,
+    ) -> list[acm.ICertificate]:
+        scope = scope or self
+        certs = []
+        # Setup certificates and zones
+        for domain in domains:
+            # Retrieve Route53 Alias Record to point to the Load Balancer
+            zone_name = self._name(f"{domain.name}HostedZone")
+
+            if domain.create_zone:
+                hosted_zone = route53.HostedZone(
+                    scope,
+                    zone_name,
+                    zone_name=domain.domain,
+                    vpcs=[vpc] if domain.private_zone else None,
+                )
+            else:
+                hosted_zone = route53.HostedZone.from_lookup(
+                    scope,
+                    zone_name,
+                    domain_name=domain.domain,
+                    private_zone=domain.private_zone,
+                    vpc_id=vpc.vpc_id if domain.private_zone else None,
+                )
+
+            cert_name = self._name(f"{domain.name}Cert")
+            certificate = acm.Certificate(
+                scope,
+                cert_name,
+                domain_name=domain.name,
+                validation=acm.CertificateValidation.from_dns(hosted_zone),
+            )
+            certs.append(certificate)
+
+            if domain.cdn is None:
+                target = route53.RecordTarget.from_alias(
+                    route53_targets.LoadBalancerTarget(load_balancer)
+                )
+            else:
+                distribution = self.distribution(
+                    domain,
+                    domain.cdn,
+                    load_balancer,
+                    hosted_zone,
+                    certificate,
+                    scope,
+                )
+                target = route53.RecordTarget.from_alias(
+                    # jsii parameter naming differs from IAliasRecordTarget
+                    route53_targets.CloudFrontTarget(  # pyright: ignore
+                        distribution
+                    )
+                )
+
+            route53.ARecord(
+                scope,
+                self._name(f"{domain.name}ARecord"),
+                zone=hosted_zone,
+                record_name=domain.name,
+                target=target,
+            )
+
+        return certs
+
+    # pylint: disable=too-many-arguments
+    @profiled
+    def distribution(
+        self,
+        domain: confs.DomainConfig,
+        cdn: confs.CdnConfig,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        hosted_zone: route53.IHostedZone,
+        certificate: acm.ICertificate,
+        scope: Construct | None = None,
+    ) -> cloudfront.Distribution:
+        scope = scope or self
+        # CloudFront only accepts certificates from us-east-1. The
+        # replacement for the deprecated DnsValidatedCertificate is a
+        # separate us-east-1 stack with cross-region references, which are
+        # experimental in this CDK version and would make every service
+        # depend on another stack, so it's kept until that is stable.
+        if self.region != "us-east-1":
+            certificate = acm.DnsValidatedCertificate(
+                scope,
+                self._name(f"{domain.name}CdnCert"),
+                domain_name=domain.name,
+                hosted_zone=hosted_zone,
+                region="us-east-1",
+            )
+
+        # jsii parameter naming differs from IOrigin
+        origin: cloudfront.IOrigin
+        origin = origins.LoadBalancerV2Origin(  # pyright: ignore
+            load_balancer,
+            protocol_policy=cloudfront.OriginProtocolPolicy[
+                cdn.origin_protocol
+            ],
+            http_port=cdn.origin_http_port,
+            https_port=cdn.origin_https_port,
+            keepalive_timeout=Duration.seconds(cdn.keepalive_timeout),
+            read_timeout=Duration.seconds(cdn.read_timeout),
+        )
+
+        additional_behaviors = {}
+        for idx, path in enumerate(cdn.paths):
+            if path.ttl is None:
+                cache_policy = getattr(
+                    cloudfront.CachePolicy, path.cache_policy
+                )
+            else:
+                cache_policy = cloudfront.CachePolicy(
+                    scope,
+                    self._name(f"{domain.name}CdnPath{idx}CachePolicy"),
+                    default_ttl=Duration.seconds(path.ttl),
+                    max_ttl=Duration.seconds(path.ttl),
+                    enable_accept_encoding_gzip=cdn.compress,
+                    enable_accept_encoding_brotli=cdn.compress,
+                )
+            additional_behaviors[path.path_pattern] = self.cdn_behavior(
+                cdn, origin, cache_policy
+            )
+
+        return cloudfront.Distribution(
+            scope,
+            self._name(f"{domain.name}Distribution"),
+            default_behavior=self.cdn_behavior(
+                cdn,
+                origin,
+                getattr(cloudfront.CachePolicy, cdn.default_cache_policy),
+            ),
+            additional_behaviors=additional_behaviors,
+            domain_names=[domain.name],
+            certificate=certificate,
+            price_class=cloudfront.PriceClass[cdn.price_class],
+        )
+
+    def cdn_behavior(
+        self,
+        cdn: confs.CdnConfig,
+        origin: cloudfront.IOrigin,
+        cache_policy: cloudfront.ICachePolicy,
+    ) -> cloudfront.BehaviorOptions:
+        return cloudfront.BehaviorOptions(
+            origin=origin,
+            cache_policy=cache_policy,
+            # Forward the Host header so listener host rules still match
+            origin_request_policy=cloudfront.OriginRequestPolicy.ALL_VIEWER,
+            viewer_protocol_policy=(
+                cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+            ),
+            allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+            compress=cdn.compress,
+        )
+
+    @profiled
+    def load_balancer(
+        self, config: confs.LoadBalancedConfig, vpc: ec2.IVpc
+    ) -> elbv2.ApplicationLoadBalancer:
+        # Create a Security Group for the Load Balancer
+        scope = self.nested_scope(config, "security_groups")
+        lb_security_group = ec2.SecurityGroup(
+            scope, self._name("LBSecGrp"), vpc=vpc
+        )
+        allowlist = self.allowlist_peers(config, scope)
+        # CloudFront's ranges weigh ~55 rules, so only add them when the
+        # load balancer isn't already open to the internet
+        cdn_origin = None
+        if config.cdn_origin_ports and not config.public_access:
+            cdn_origin = ec2.Peer.prefix_list(
+                self.cdn_origin_prefix_list(scope)
+            )
+
+        for port in config.external_ports:
+            lb_security_group.add_ingress_rule(
+                ec2.Peer.ipv4(vpc.vpc_cidr_block),
+                ec2.Port.tcp(port),
+                "Allow http inbound from VPC",
+            )
+
+            # If specified, allow access from this IP.
+            for peer in allowlist:
+                lb_security_group.add_ingress_rule(
+                    peer,
+                    ec2.Port.tcp(port),
+                    "developer access",
+                )
+            # If specified, allow access from the entire internet
+            if config.public_access:
+                lb_security_group.add_ingress_rule(
+                    ec2.Peer.any_ipv4(),
+                    ec2.Port.tcp(port),
+                    "unrestricted internet access",
+                )
+            # Let CloudFront reach the origin for domains with a cdn
+            if cdn_origin is not None and port in config.cdn_origin_ports:
+                lb_security_group.add_ingress_rule(
+                    cdn_origin,
+                    ec2.Port.tcp(port),
+                    "cloudfront origin access",
+                )
+
+        # Create a Application Load Balancer
+        load_balancer = elbv2.ApplicationLoadBalancer(
+            self,
+            self._name("LoadBalancer"),
+            vpc=vpc,
+            internet_facing=True,
+            security_group=lb_security_group,
+            idle_timeout=(
+                Duration.seconds(config.idle_timeout)
+                if config.idle_timeout is not None
+                else None
+            ),
+        )
+
+        return load_balancer
+
+    def cdn_origin_prefix_list(self, scope: Construct) -> str:
+        name = self._name("CdnOriginPrefixList")
+        lookup = scope.node.try_find_child(name)
+        if not isinstance(lookup, cr.AwsCustomResource):
+            # The managed prefix list ID differs per region and there is
+            # no context lookup for it, so resolve it at deploy time
+            lookup = cr.AwsCustomResource(
+                scope,
+                name,
+                on_update=cr.AwsSdkCall(
+                    service="EC2",
+                    action="describeManagedPrefixLists",
+                    parameters={
+                        "Filters": [
+                            {
+                                "Name": "prefix-list-name",
+                                "Values": [CLOUDFRONT_ORIGIN_FACING],
+                            }
+                        ]
+                    },
+                    physical_resource_id=cr.PhysicalResourceId.of(
+                        CLOUDFRONT_ORIGIN_FACING
+                    ),
+                    output_paths=["PrefixLists.0.PrefixListId"],
+                ),
+                policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                    resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
+                ),
+                install_latest_aws_sdk=False,
+            )
+        return lookup.get_response_field("PrefixLists.0.PrefixListId")
+
+    def listener(
+        self,
+        config: confs.LoadBalancedConfig,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        port: int,
+        certs: list[acm.ICertificate],
+        default_action: elbv2.ListenerAction | None = None,
+    ) -> elbv2.ApplicationListener:
+        listener_name = f"Listener{port}"
+
+        if port in config.redirect_ports:
+            return load_balancer.add_listener(
+                self._name(listener_name),
+                port=port,
+                open=False,
+                default_action=elbv2.ListenerAction.redirect(
+                    protocol="HTTPS",
+                    port=str(config.external_https_port),
+                    permanent=True,
+                ),
+            )
+
+        is_https = port == config.external_https_port
+        listener = load_balancer.add_listener(
+            self._name(listener_name),
+            port=port,
+            open=False,
+            default_action=default_action,
+            ssl_policy=(
+                elbv2.SslPolicy[config.ssl_policy]
+                if is_https and config.ssl_policy is not None
+                else None
+            ),
+        )
+        if is_https:
+            listener.add_certificates(
+                self._name(f"{listener_name}Certs"), certs
+            )
+        return listener
@@ -0,0 +1,331 @@
+from typing import Any, Callable
+from aws_cdk import (
+    CfnOutput,
+    Duration,
+    Stack,
+    aws_cloudwatch as cloudwatch,
+    aws_cloudwatch_actions as cw_actions,
+    aws_ecs as ecs,
+    aws_efs as efs,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_sns as sns,
+    aws_sns_subscriptions as subscriptions,
+)
+from nimbus_lib import config as confs
+from .nameable import Nameable
+from .profiling import profiled
+
+
+# Dashboard and alarms for a load balanced Fargate service
+class Observability(Stack, Nameable):
+    # pylint: disable=too-many-arguments
+    @profiled
+    def setup_observability(
+        self,
+        config: confs.ObservabilityConfig,
+        scaling: confs.ScalingConfig,
+        fargate: ecs.FargateService,
+        target_group: elbv2.ApplicationTargetGroup,
+        file_systems: list[efs.IFileSystem],
+        container_insights: bool,
+        green_target_group: elbv2.ApplicationTargetGroup | None = None,
+    ) -> list[cloudwatch.Alarm]:
+        period = Duration.seconds(config.period_seconds)
+        # Task counts are only published with Container Insights enabled
+        running_tasks = (
+            cloudwatch.Metric(
+                namespace="ECS/ContainerInsights",
+                metric_name="RunningTaskCount",
+                dimensions_map={
+                    "ClusterName": fargate.cluster.cluster_name,
+                    "ServiceName": fargate.service_name,
+                },
+                statistic="Average",
+                period=period,
+            )
+            if container_insights
+            else None
+        )
+
+        if config.dashboard:
+            self.setup_dashboard(
+                config,
+                scaling,
+                fargate,
+                target_group,
+                file_systems,
+                running_tasks,
+                period,
+            )
+        # Blue/green deploys alternate production traffic between both
+        # target groups, so alarms must watch whichever one serves it
+        target_groups = [target_group]
+        if green_target_group is not None:
+            target_groups.append(green_target_group)
+        return self.setup_alarms(
+            config, scaling, fargate, target_groups, running_tasks, period
+        )
+
+    # pylint: disable=too-many-arguments
+    def setup_dashboard(
+        self,
+        config: confs.ObservabilityConfig,
+        scaling: confs.ScalingConfig,
+        fargate: ecs.FargateService,
+        target_group: elbv2.ApplicationTargetGroup,
+        file_systems: list[efs.IFileSystem],
+        running_tasks: cloudwatch.Metric | None,
+        period: Duration,
+    ) -> cloudwatch.Dashboard:
+        dashboard = cloudwatch.Dashboard(self, self._name("Dashboard"))
+
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Target response time",
+                left=[
+                    target_group.metrics.target_response_time(
+                        statistic=statistic, label=statistic, period=period
+                    )
+                    for statistic in ("p50", "p90", "p99")
+                ],
+                width=12,
+            ),
+            cloudwatch.GraphWidget(
+                title="Requests and 5xx",
+                left=[target_group.metrics.request_count(period=period)],
+                right=[
+                    target_group.metrics.http_code_target(
+                        elbv2.HttpCodeTarget.TARGET_5XX_COUNT, period=period
+                    )
+                ],
+                width=12,
+            ),
+        )
+
+        tasks_widget = (
+            cloudwatch.GraphWidget(
+                title="Running tasks",
+                left=[running_tasks],
+                left_annotations=[
+                    cloudwatch.HorizontalAnnotation(
+                        value=scaling.max_task_count, label="max_task_count"
+                    )
+                ],
+                width=12,
+            )
+            if running_tasks is not None
+            else cloudwatch.GraphWidget(
+                title="Healthy hosts",
+                left=[target_group.metrics.healthy_host_count(period=period)],
+                width=12,
+            )
+        )
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="CPU and memory utilization",
+                left=[
+                    fargate.metric_cpu_utilization(period=period),
+                    fargate.metric_memory_utilization(period=period),
+                ],
+                width=12,
+            ),
+            tasks_widget,
+        )
+
+        for idx, file_system in enumerate(file_systems):
+            dashboard.add_widgets(
+                *[
+                    cloudwatch.GraphWidget(
+                        title=f"EFS {idx} {metric_name}",
+                        left=[
+                            cloudwatch.Metric(
+                                namespace="AWS/EFS",
+                                metric_name=metric_name,
+                                dimensions_map={
+                                    "FileSystemId": file_system.file_system_id
+                                },
+                                statistic=statistic,
+                                period=period,
+                            )
+                        ],
+                        width=8,
+                    )
+                    for metric_name, statistic in (
+                        ("PercentIOLimit", "Maximum"),
+                        ("ClientConnections", "Sum"),
+                        ("BurstCreditBalance", "Minimum"),
+                    )
+                ]
+            )
+
+        for instance_id in config.rds_instance_ids:
+            dashboard.add_widgets(
+                *[
+                    cloudwatch.GraphWidget(
+                        title=f"RDS {metric_name}",
+                        left=[
+                            cloudwatch.Metric(
+                                namespace="AWS/RDS",
+                                metric_name=metric_name,
+                                dimensions_map={
+                                    "DBInstanceIdentifier": instance_id
+                                },
+                                statistic="Average",
+                                period=period,
+                            )
+                        ],
+                        width=8,
+                    )
+                    for metric_name in (
+                        "CPUUtilization",
+                        "DatabaseConnections",
+                        "FreeableMemory",
+                    )
+                ]
+            )
+
+        return dashboard
+
+    # pylint: disable=too-many-arguments
+    def setup_alarms(
+        self,
+        config: confs.ObservabilityConfig,
+        scaling: confs.ScalingConfig,
+        fargate: ecs.FargateService,
+        target_groups: list[elbv2.ApplicationTargetGroup],
+        running_tasks: cloudwatch.Metric | None,
+        period: Duration,
+    ) -> list[cloudwatch.Alarm]:
+        def across_target_groups(
+            function: str, metric: Callable[[Any], cloudwatch.Metric]
+        ) -> cloudwatch.Metric | cloudwatch.MathExpression:
+            if len(target_groups) == 1:
+                return metric(target_groups[0].metrics)
+            # Array functions skip target groups without datapoints
+            using = {
+                f"m{idx}": metric(group.metrics)
+                for idx, group in enumerate(target_groups)
+            }
+            return cloudwatch.MathExpression(
+                expression=f"{function}([{', '.join(using)}])",
+                using_metrics=using,
+                period=period,
+            )
+
+        above = cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD
+        at_least = (
+            cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD
+        )
+
+        thresholds: list[
+            tuple[
+                str,
+                cloudwatch.Metric | cloudwatch.MathExpression,
+                float | None,
+                Any,
+            ]
+        ]
+        thresholds = [
+            (
+                "P99ResponseTime",
+                across_target_groups(
+                    "MAX",
+                    lambda metrics: metrics.target_response_time(
+                        statistic="p99", period=period
+                    ),
+                ),
+                config.p99_response_time_seconds,
+                above,
+            ),
+            (
+                "Target5xx",
+                across_target_groups(
+                    "SUM",
+                    lambda metrics: metrics.http_code_target(
+                        elbv2.HttpCodeTarget.TARGET_5XX_COUNT, period=period
+                    ),
+                ),
+                config.target_5xx_count,
+                at_least,
+            ),
+            (
+                "CpuUtilization",
+                fargate.metric_cpu_utilization(period=period),
+                config.cpu_util_pct,
+                above,
+            ),
+            (
+                "MemoryUtilization",
+                fargate.metric_memory_utilization(period=period),
+                config.memory_util_pct,
+                above,
+            ),
+            (
+                "UnhealthyHosts",
+                across_target_groups(
+                    "SUM",
+                    lambda metrics: metrics.unhealthy_host_count(
+                        period=period
+                    ),
+                ),
+                config.unhealthy_host_count,
+                at_least,
+            ),
+        ]
+        if running_tasks is not None and config.at_max_task_count:
+            thresholds.append(
+                (
+                    "AtMaxTaskCount",
+                    running_tasks,
+                    scaling.max_task_count,
+                    at_least,
+                )
+            )
+
+        alarms = []
+        for name, metric, threshold, comparison in thresholds:
+            if threshold is None:
+                continue
+            alarms.append(
+                metric.create_alarm(
+                    self,
+                    self._name(f"{name}Alarm"),
+                    threshold=threshold,
+                    evaluation_periods=config.evaluation_periods,
+                    comparison_operator=comparison,
+                    # No requests or tasks reporting is not an incident
+                    treat_missing_data=(
+                        cloudwatch.TreatMissingData.NOT_BREACHING
+                    ),
+                )
+            )
+
+        if alarms:
+            topic = self.alarm_topic(config)
+            for alarm in alarms:
+                alarm.add_alarm_action(cw_actions.SnsAction(topic))
+        return alarms
+
+    def alarm_topic(self, config: confs.ObservabilityConfig) -> sns.ITopic:
+        topic: sns.ITopic
+        if config.alarm_topic_arn is not None:
+            topic = sns.Topic.from_topic_arn(
+                self, self._name("AlarmTopic"), config.alarm_topic_arn
+            )
+        else:
+            # jsii parameter naming differs from ITopic
+            topic = sns.Topic(  # pyright: ignore
+                self, self._name("AlarmTopic")
+            )
+            CfnOutput(
+                self,
+                self._name("AlarmTopicArn"),
+                value=topic.topic_arn,
+                description="The SNS topic receiving the service's alarms",
+            )
+
+        for email in config.alarm_emails:
+            topic.add_subscription(
+                subscriptions.EmailSubscription(email)  # pyright: ignore
+            )
+        return topic
@@ -0,0 +1,54 @@
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from constructs import Construct
+
+# App context flag that turns on construct attribution
+PROFILE_CONTEXT = "nimbus:profile"
+
+TMethod = TypeVar("TMethod", bound=Callable[..., Any])
+
+
+def profiled(method: TMethod) -> TMethod:
+    """Record the constructs a builder method adds, when profiling is on.
+
+    nimbus_lib.synth.profile_stack uses ``construct_owners`` to attribute
+    template resources and bytes to builder methods. A nested builder
+    claims its constructs first, so callers only get what they add
+    themselves.
+    """
+
+    @wraps(method)
+    def wrapper(self: "Construct", *args: Any, **kwargs: Any) -> Any:
+        if not _profiling(self):
+            return method(self, *args, **kwargs)
+
+        before = {child.node.path for child in self.node.find_all()}
+        result = method(self, *args, **kwargs)
+
+        owners = construct_owners(self)
+        for child in self.node.find_all():
+            if child.node.path not in before:
+                owners.setdefault(child.node.path, method.__name__)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def construct_owners(stack: "Construct") -> dict[str, str]:
+    # Maps construct paths to the method that created them
+    owners = getattr(stack, "_construct_owners", None)
+    if owners is None:
+        owners = {}
+        setattr(stack, "_construct_owners", owners)
+    return owners
+
+
+def _profiling(stack: "Construct") -> bool:
+    # Walking the construct tree is slow; only do it when asked
+    enabled = getattr(stack, "_profiling", None)
+    if enabled is None:
+        enabled = bool(stack.node.try_get_context(PROFILE_CONTEXT))
+        setattr(stack, "_profiling", enabled)
+    return enabled
@@ -2,16 +2,22 @@ from typing import Generic, TypeVar
 from constructs import Construct
 from aws_cdk import (
     CfnOutput,
+    Duration,
+    RemovalPolicy,
     Stack,
     aws_rds as rds,
     aws_ec2 as ec2,
 )
 from nimbus_lib import config as confs
 from .nameable import Nameable
+from .profiling import profiled
 
 # pylint: disable=invalid-name
 TConfig = TypeVar("TConfig", bound=confs.RdsConfig)
 
+# RDS Proxy always listens on the engine's default port
+PROXY_PORTS = {"postgresql": 5432, "mysql": 3306}
+
 
 class RdsStack(Stack, Nameable, Generic[TConfig]):
     @property
@@ -26,6 +32,8 @@ class RdsStack(Stack, Nameable, Generic[TConfig]):
     ) -> None:
         self.construct_id = config.construct_id
         super().__init__(scope, self.construct_id, **kwargs)
+        self.config = config
+        self.proxy: rds.DatabaseProxy | None = None
 
         vpc = ec2.Vpc.from_lookup(
             self,
@@ -33,10 +41,6 @@ class RdsStack(Stack, Nameable, Generic[TConfig]):
             vpc_id=config.vpc_id,
         )
 
-        instance_type = ec2.InstanceType.of(
-            config.instance_type.type_, config.instance_type.size
-        )
-
         # Create a new security group
         rds_security_group = ec2.SecurityGroup(
             self,
@@ -46,27 +50,74 @@ class RdsStack(Stack, Nameable, Generic[TConfig]):
                 "RDS Security Group to allow connections from other subnets"
             ),
         )
+        self.security_group = rds_security_group
+
+        self.instance: rds.DatabaseInstance | None = None
+        self.cluster: rds.DatabaseCluster | None = None
+        self.read_replicas: list[rds.DatabaseInstanceReadReplica] = []
+        database: rds.DatabaseInstance | rds.DatabaseCluster
+        if config.aurora is None:
+            database = self.instance = self.database_instance(
+                config, vpc, rds_security_group
+            )
+            self.read_replicas = self.setup_read_replicas(
+                config, vpc, database, rds_security_group
+            )
+        else:
+            database = self.cluster = self.database_cluster(
+                config, config.aurora, vpc, rds_security_group
+            )
+
+        # Associate the secret with the database
+        database.add_rotation_single_user()
+
+        if config.proxy is not None:
+            self.proxy, self.proxy_security_group = self.setup_proxy(
+                config, config.proxy, vpc, database, rds_security_group
+            )
+
+        CfnOutput(
+            self,
+            self._name("RDSSecurityGroupID"),
+            value=rds_security_group.security_group_id,
+            description="The ID of the RDS instance's security group",
+        )
 
+    @profiled
+    def database_instance(
+        self,
+        config: TConfig,
+        vpc: ec2.IVpc,
+        rds_security_group: ec2.SecurityGroup,
+    ) -> rds.DatabaseInstance:
         rds_instance = rds.DatabaseInstance(
             self,
             self._name("RDSInstance"),
             database_name=config.database_name,
             engine=rds.DatabaseInstanceEngine.postgres(
-                version=config.engine_version
+                version=rds.PostgresEngineVersion.of(
+                    config.engine_version,
+                    config.engine_version.split(".", 1)[0],
+                )
             ),
-            instance_type=instance_type,
-            vpc_subnets={"subnet_type": config.subnet_type},
+            instance_type=self.instance_type(config.instance_type),
+            vpc_subnets={"subnet_type": ec2.SubnetType[config.subnet_type]},
             vpc=vpc,
             port=config.db_port,
-            removal_policy=config.removal_policy,
+            removal_policy=RemovalPolicy[config.removal_policy],
             deletion_protection=config.deletion_protection,
             allocated_storage=config.allocated_storage,
+            max_allocated_storage=config.max_allocated_storage,
+            storage_type=self.storage_type(config),
+            iops=config.iops,
+            storage_throughput=config.storage_throughput,
+            enable_performance_insights=config.performance_insights or None,
+            performance_insight_retention=self.performance_insight_retention(
+                config
+            ),
             security_groups=[rds_security_group],
         )
 
-        # Associate the secret with the RDS instance
-        rds_instance.add_rotation_single_user()
-
         CfnOutput(
             self,
             self._name("RDSInstanceARN"),
@@ -81,9 +132,236 @@ class RdsStack(Stack, Nameable, Generic[TConfig]):
             description="The endpoint address of the RDS instance",
         )
 
+        return rds_instance
+
+    @profiled
+    def database_cluster(
+        self,
+        config: TConfig,
+        aurora: confs.AuroraConfig,
+        vpc: ec2.IVpc,
+        rds_security_group: ec2.SecurityGroup,
+    ) -> rds.DatabaseCluster:
+        engine: rds.IClusterEngine
+        if aurora.engine == "mysql":
+            # "8.0.mysql_aurora.3.04.0" is major version "8.0"
+            major_version = config.engine_version.split(".mysql_aurora")[0]
+            engine = rds.DatabaseClusterEngine.aurora_mysql(
+                version=rds.AuroraMysqlEngineVersion.of(
+                    config.engine_version, major_version
+                )
+            )
+        else:
+            major_version = config.engine_version.split(".", 1)[0]
+            engine = rds.DatabaseClusterEngine.aurora_postgres(
+                version=rds.AuroraPostgresEngineVersion.of(
+                    config.engine_version, major_version
+                )
+            )
+
+        performance_insights = {
+            "enable_performance_insights": config.performance_insights or None,
+            "performance_insight_retention": (
+                self.performance_insight_retention(config)
+            ),
+        }
+        cluster = rds.DatabaseCluster(
+            self,
+            self._name("RDSCluster"),
+            default_database_name=config.database_name,
+            engine=engine,
+            writer=rds.ClusterInstance.serverless_v2(
+                "Writer", **performance_insights
+            ),
+            readers=[
+                rds.ClusterInstance.serverless_v2(
+                    f"Reader{idx}",
+                    scale_with_writer=aurora.readers_scale_with_writer,
+                    **performance_insights,
+                )
+                for idx in range(aurora.readers)
+            ],
+            serverless_v2_min_capacity=aurora.min_capacity,
+            serverless_v2_max_capacity=aurora.max_capacity,
+            vpc_subnets={"subnet_type": ec2.SubnetType[config.subnet_type]},
+            vpc=vpc,
+            port=config.db_port,
+            removal_policy=RemovalPolicy[config.removal_policy],
+            deletion_protection=config.deletion_protection,
+            security_groups=[rds_security_group],
+        )
+
         CfnOutput(
             self,
-            self._name("RDSSecurityGroupID"),
-            value=rds_security_group.security_group_id,
-            description="The ID of the RDS instance's security group",
+            self._name("RDSClusterIdentifier"),
+            value=cluster.cluster_identifier,
+            description="The identifier of the Aurora cluster",
+        )
+
+        CfnOutput(
+            self,
+            self._name("RDSClusterEndpoint"),
+            value=cluster.cluster_endpoint.hostname,
+            description="The writer endpoint address of the Aurora cluster",
+        )
+
+        CfnOutput(
+            self,
+            self._name("RDSClusterReaderEndpoint"),
+            value=cluster.cluster_read_endpoint.hostname,
+            description="The reader endpoint address of the Aurora cluster",
+        )
+
+        return cluster
+
+    def instance_type(self, ec2_config: confs.Ec2Config) -> ec2.InstanceType:
+        return ec2.InstanceType.of(
+            ec2.InstanceClass[ec2_config.type_],
+            ec2.InstanceSize[ec2_config.size],
+        )
+
+    def storage_type(self, config: TConfig) -> rds.StorageType | None:
+        if config.storage_type is None:
+            return None
+        return rds.StorageType[config.storage_type]
+
+    def performance_insight_retention(
+        self, config: TConfig
+    ) -> rds.PerformanceInsightRetention | None:
+        if config.performance_insight_retention is None:
+            return None
+        return rds.PerformanceInsightRetention[
+            config.performance_insight_retention
+        ]
+
+    @profiled
+    def setup_read_replicas(
+        self,
+        config: TConfig,
+        vpc: ec2.IVpc,
+        rds_instance: rds.DatabaseInstance,
+        rds_security_group: ec2.SecurityGroup,
+    ) -> list[rds.DatabaseInstanceReadReplica]:
+        # Replicas hold no data of their own and can't be snapshotted on
+        # delete, so only RETAIN carries over from the primary.
+        removal_policy = (
+            RemovalPolicy.RETAIN
+            if config.removal_policy == "RETAIN"
+            else RemovalPolicy.DESTROY
+        )
+
+        replicas = []
+        for idx, replica_config in enumerate(config.read_replicas):
+            replica = rds.DatabaseInstanceReadReplica(
+                self,
+                self._name(f"RDSReadReplica{idx}"),
+                source_database_instance=rds_instance,
+                instance_type=self.instance_type(
+                    replica_config.instance_type or config.instance_type
+                ),
+                availability_zone=replica_config.availability_zone,
+                vpc_subnets={
+                    "subnet_type": ec2.SubnetType[config.subnet_type]
+                },
+                vpc=vpc,
+                port=config.db_port,
+                removal_policy=removal_policy,
+                max_allocated_storage=config.max_allocated_storage,
+                storage_type=self.storage_type(config),
+                iops=config.iops,
+                storage_throughput=config.storage_throughput,
+                enable_performance_insights=(
+                    config.performance_insights or None
+                ),
+                performance_insight_retention=(
+                    self.performance_insight_retention(config)
+                ),
+                security_groups=[rds_security_group],
+            )
+            replicas.append(replica)
+
+            CfnOutput(
+                self,
+                self._name(f"RDSReadReplica{idx}Endpoint"),
+                value=replica.db_instance_endpoint_address,
+                description=f"The endpoint address of read replica {idx}",
+            )
+
+        return replicas
+
+    # pylint: disable=too-many-arguments
+    @profiled
+    def setup_proxy(
+        self,
+        config: TConfig,
+        proxy_config: confs.ProxyConfig,
+        vpc: ec2.IVpc,
+        database: rds.DatabaseInstance | rds.DatabaseCluster,
+        rds_security_group: ec2.SecurityGroup,
+    ) -> tuple[rds.DatabaseProxy, ec2.SecurityGroup]:
+        proxy_security_group = ec2.SecurityGroup(
+            self,
+            self._name("RDSProxySecurityGroup"),
+            vpc=vpc,
+            description="RDS Proxy Security Group to pool client connections",
+        )
+        rds_security_group.add_ingress_rule(
+            proxy_security_group,
+            ec2.Port.tcp(config.db_port),
+            "RDS Proxy access",
+        )
+
+        if database.secret is None:
+            raise ValueError("missing generated secret for RDS database")
+
+        # The proxy reads the secret rotated by add_rotation_single_user
+        proxy = database.add_proxy(
+            self._name("RDSProxy"),
+            secrets=[database.secret],
+            vpc=vpc,
+            vpc_subnets={"subnet_type": ec2.SubnetType[config.subnet_type]},
+            security_groups=[proxy_security_group],
+            borrow_timeout=Duration.seconds(proxy_config.borrow_timeout),
+            max_connections_percent=proxy_config.max_connections_percent,
+            max_idle_connections_percent=(
+                proxy_config.max_idle_connections_percent
+            ),
+            idle_client_timeout=(
+                Duration.seconds(proxy_config.idle_client_timeout)
+                if proxy_config.idle_client_timeout is not None
+                else None
+            ),
+            require_tls=proxy_config.require_tls,
+            iam_auth=proxy_config.iam_auth,
+        )
+
+        CfnOutput(
+            self,
+            self._name("RDSProxyEndpoint"),
+            value=proxy.endpoint,
+            description="The endpoint of the RDS Proxy",
+        )
+
+        CfnOutput(
+            self,
+            self._name("RDSProxySecurityGroupID"),
+            value=proxy_security_group.security_group_id,
+            description=(
+                "The ID of the RDS Proxy's security group, for ingress_confs"
+            ),
+        )
+
+        return proxy, proxy_security_group
+
+    def ingress_config(self) -> confs.IngressConfig:
+        # Lets a FargateConfig in the same app reach the database (through
+        # the proxy when there is one) via `ingress_confs`.
+        if self.proxy is not None:
+            return confs.IngressConfig(
+                security_group_id=self.proxy_security_group.security_group_id,
+                port=PROXY_PORTS[self.config.engine_family],
+            )
+        return confs.IngressConfig(
+            security_group_id=self.security_group.security_group_id,
+            port=self.config.db_port,
         )
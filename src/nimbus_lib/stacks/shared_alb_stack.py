@@ -0,0 +1,80 @@
+from typing import Generic, TypeVar
+from constructs import Construct
+from aws_cdk import (
+    CfnOutput,
+    aws_certificatemanager as acm,
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+from nimbus_lib import config as confs
+from .load_balancing import LoadBalancing
+
+# pylint: disable=invalid-name
+TConfig = TypeVar("TConfig", bound=confs.SharedAlbConfig)
+
+
+# A cluster and load balancer shared by several FargateStacks. Services
+# attach by passing this stack as `shared`; each one adds listener rules
+# routing on its `FargateConfig.routing`.
+class SharedAlbStack(LoadBalancing, Generic[TConfig]):
+    @property
+    def _base_name(self) -> str:
+        return self.construct_id
+
+    def __init__(
+        self,
+        scope: Construct,
+        config: TConfig,
+        **kwargs,
+    ) -> None:
+        self.construct_id = config.construct_id
+        super().__init__(scope, self.construct_id, **kwargs)
+        self.config = config
+
+        vpc = self.vpc(config.vpc_id)
+        self.cluster = ecs.Cluster(
+            self,
+            self._name("Cluster"),
+            vpc=vpc,
+            enable_fargate_capacity_providers=True,
+            container_insights=config.container_insights or None,
+        )
+        self.alb = self.load_balancer(config, vpc)
+        certs = self.setup_domains(
+            self.alb,
+            config.domains,
+            vpc,
+            self.nested_scope(config, "domains"),
+        )
+        self.listeners = self.setup_listeners(config, self.alb, certs)
+        self.https_port = (
+            config.external_https_port if config.supports_https else None
+        )
+
+        CfnOutput(
+            self,
+            self._name("LoadBalancerDNS"),
+            value=self.alb.load_balancer_dns_name,
+        )
+
+    def setup_listeners(
+        self,
+        config: TConfig,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        certs: list[acm.ICertificate],
+    ) -> dict[int, elbv2.ApplicationListener]:
+        listeners = {}
+        for port in config.external_ports:
+            listener = self.listener(
+                config,
+                load_balancer,
+                port,
+                certs,
+                # Requests that match no service rule
+                default_action=elbv2.ListenerAction.fixed_response(404),
+            )
+            # Services only add rules to listeners that forward traffic
+            if port in config.forward_ports:
+                listeners[port] = listener
+
+        return listeners
@@ -31,7 +31,9 @@ class VpcStack(Stack, Nameable, Generic[TConfig]):
             self._name("VPC"),
             subnet_configuration=subnets,
             max_azs=config.max_azs,
+            nat_gateways=config.nat_gateways,
         )
+        self.setup_endpoints(config)
 
         CfnOutput(
             self,
@@ -47,6 +49,29 @@ class VpcStack(Stack, Nameable, Generic[TConfig]):
             description="The ID of the virtual private cloud",
         )
 
+    def setup_endpoints(self, config: TConfig) -> None:
+        for name in config.gateway_endpoints:
+            self.vpc.add_gateway_endpoint(
+                self._name(f"{name}GatewayEndpoint"),
+                service=getattr(ec2.GatewayVpcEndpointAwsService, name),
+            )
+
+        subnets = (
+            ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType[config.endpoint_subnet_type]
+            )
+            if config.endpoint_subnet_type is not None
+            else None
+        )
+        for name in config.interface_endpoints:
+            # Private DNS lets the SDKs use the endpoint unchanged
+            self.vpc.add_interface_endpoint(
+                self._name(f"{name}InterfaceEndpoint"),
+                service=getattr(ec2.InterfaceVpcEndpointAwsService, name),
+                subnets=subnets,
+                private_dns_enabled=True,
+            )
+
     def subnets(
         self, configs: list[confs.SubnetConfig]
     ) -> list[ec2.SubnetConfiguration]:
@@ -55,7 +80,7 @@ class VpcStack(Stack, Nameable, Generic[TConfig]):
             subnets.append(
                 ec2.SubnetConfiguration(
                     name=config.name,
-                    subnet_type=config.subnet_type,
+                    subnet_type=ec2.SubnetType[config.subnet_type],
                     cidr_mask=config.cidr_mask,
                 )
             )
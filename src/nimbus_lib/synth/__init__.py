@@ -0,0 +1,28 @@
+from .cache import SynthCache, SynthCacheReport
+from .lookups import (
+    FileLookupProvider,
+    LookupEntry,
+    LookupProvider,
+    LookupReport,
+    missing_lookups,
+)
+from nimbus_lib.stacks.profiling import PROFILE_CONTEXT
+from .profile import MethodProfile, TemplateProfile, profile_stack
+from .parallel import ParallelSynth, ParallelSynthReport, StackTiming
+
+__all__ = [
+    "FileLookupProvider",
+    "LookupEntry",
+    "LookupProvider",
+    "LookupReport",
+    "missing_lookups",
+    "PROFILE_CONTEXT",
+    "MethodProfile",
+    "TemplateProfile",
+    "profile_stack",
+    "ParallelSynth",
+    "ParallelSynthReport",
+    "StackTiming",
+    "SynthCache",
+    "SynthCacheReport",
+]
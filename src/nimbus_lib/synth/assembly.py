@@ -0,0 +1,57 @@
+"""Helpers for copying stacks between cloud assembly directories."""
+import json
+import shutil
+from pathlib import Path
+from typing import Any
+
+MANIFEST_FILE = "manifest.json"
+TREE_FILE = "tree.json"
+
+
+def read_json(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_json(path: Path, data: dict[str, Any]) -> None:
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def stack_files(
+    outdir: Path, artifacts: dict[str, Any], artifact_id: str
+) -> tuple[dict[str, Any], list[str]]:
+    """The manifest artifacts and files that make up one stack."""
+    stack_artifact = artifacts[artifact_id]
+    stack_artifacts = {artifact_id: stack_artifact}
+    files = [stack_artifact["properties"]["templateFile"]]
+    for dependency in stack_artifact.get("dependencies", []):
+        artifact = artifacts.get(dependency, {})
+        if artifact.get("type") != "cdk:asset-manifest":
+            continue
+        stack_artifacts[dependency] = artifact
+        asset_manifest = artifact["properties"]["file"]
+        files.append(asset_manifest)
+        files.extend(asset_paths(outdir / asset_manifest))
+    return stack_artifacts, list(dict.fromkeys(files))
+
+
+def asset_paths(asset_manifest: Path) -> list[str]:
+    assets = read_json(asset_manifest)
+    paths = [
+        asset["source"]["path"] for asset in assets.get("files", {}).values()
+    ]
+    paths.extend(
+        asset["source"]["directory"]
+        for asset in assets.get("dockerImages", {}).values()
+        if "directory" in asset["source"]
+    )
+    return paths
+
+
+def copy_path(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if source.is_dir():
+        # Asset directories are named by content hash, so an existing
+        # directory already holds the same files
+        shutil.copytree(source, target, dirs_exist_ok=True)
+    else:
+        shutil.copy2(source, target)
@@ -0,0 +1,234 @@
+"""Reuse synthesized stack templates when nothing that shapes them changed.
+
+Stacks are added through :meth:`SynthCache.add` instead of being built
+directly. The cache key covers:
+
+* the validated config
+* the stack class, the source of every nimbus_lib module and of the other
+  classes in its MRO (so edits to nimbus_lib or to an app's stack
+  subclass invalidate it)
+* the stack kwargs, such as ``env``
+* the CDK context passed in by the CLI
+* the nimbus-lib and aws-cdk-lib versions
+
+On a hit the stack is not constructed. :meth:`SynthCache.synth` copies
+its template, asset manifest and assets back into the cloud assembly
+instead::
+
+    cache = SynthCache()
+    app = App()
+    for config in configs:
+        cache.add(app, FargateStack, config, env=env)
+    cache.synth(app)
+    print(cache.report)
+
+Stacks referenced by other stacks (e.g. a ``SharedAlbStack`` passed as
+``shared``) must be built directly, since a cached stack has no
+constructs to reference. Results from a synth with missing lookup
+context are never stored, because they hold CDK's dummy values.
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Type, TypeVar
+
+from pydantic_settings import BaseSettings
+
+from . import assembly
+
+if TYPE_CHECKING:
+    from aws_cdk import App, Stack, cx_api
+
+DEFAULT_CACHE_DIR = ".nimbus-synth-cache"
+# Context (cdk.json, cdk.context.json, -c flags) handed to the app by the CLI
+CONTEXT_ENV = "CDK_CONTEXT_JSON"
+ENTRY_FILE = "entry.json"
+
+# pylint: disable=invalid-name
+TStack = TypeVar("TStack", bound="Stack")
+
+
+@dataclass
+class SynthCacheReport:
+    hits: list[str] = field(default_factory=list)
+    misses: list[str] = field(default_factory=list)
+    # Misses that could not be stored (e.g. missing lookup context)
+    skipped: list[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"synth cache: {len(self.hits)} hit(s), {len(self.misses)}"
+            f" miss(es), {len(self.skipped)} not stored"
+        )
+
+
+def _version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@lru_cache(maxsize=None)
+def _package_digest() -> str:
+    # Stacks call helpers and read config from all over nimbus_lib, so any
+    # edit to the package invalidates every entry
+    root = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _source_digest(stack_cls: type) -> str:
+    digest = hashlib.sha256(_package_digest().encode())
+    for klass in stack_cls.__mro__:
+        # CDK's own classes are covered by the aws-cdk-lib version and
+        # nimbus_lib's by the package digest
+        if klass.__module__.split(".", 1)[0] in (
+            "aws_cdk",
+            "jsii",
+            "builtins",
+            "nimbus_lib",
+        ):
+            continue
+        try:
+            source = inspect.getsourcefile(klass)
+        except TypeError:
+            continue
+        if source is not None and os.path.isfile(source):
+            digest.update(Path(source).read_bytes())
+    return digest.hexdigest()
+
+
+class SynthCache:
+    def __init__(self, directory: str | os.PathLike = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+        self.report = SynthCacheReport()
+        # artifact id -> key, for stacks built (miss) or restored (hit)
+        self._built: dict[str, str] = {}
+        self._restored: dict[str, str] = {}
+
+    def key(
+        self,
+        stack_cls: Type["Stack"],
+        config: BaseSettings,
+        **kwargs: Any,
+    ) -> str:
+        payload = {
+            "stack": f"{stack_cls.__module__}.{stack_cls.__qualname__}",
+            "source": _source_digest(stack_cls),
+            "config": config.model_dump(mode="json"),
+            "kwargs": repr(sorted(kwargs.items())),
+            "context": os.environ.get(CONTEXT_ENV, ""),
+            "nimbus_lib": _version("nimbus-lib"),
+            "aws_cdk": _version("aws-cdk-lib"),
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def add(
+        self,
+        app: "App",
+        stack_cls: Type[TStack],
+        config: BaseSettings,
+        **kwargs: Any,
+    ) -> TStack | None:
+        """Build the stack, or return None when its cached output is reused."""
+        key = self.key(stack_cls, config, **kwargs)
+        entry = self._read_entry(key)
+        if entry is not None:
+            self._restored[entry["artifact_id"]] = key
+            self.report.hits.append(entry["artifact_id"])
+            return None
+
+        # nimbus_lib stacks take a config where Stack takes an id
+        stack = stack_cls(app, config, **kwargs)  # pyright: ignore
+        self._built[stack.artifact_id] = key
+        self.report.misses.append(stack.artifact_id)
+        return stack
+
+    def synth(self, app: "App") -> "cx_api.CloudAssembly":
+        cloud_assembly = app.synth()
+        outdir = Path(cloud_assembly.directory)
+        manifest_path = outdir / assembly.MANIFEST_FILE
+        manifest = assembly.read_json(manifest_path)
+
+        for artifact_id, key in self._built.items():
+            if manifest.get("missing"):
+                self.report.skipped.append(artifact_id)
+                continue
+            self._store(key, artifact_id, outdir, manifest["artifacts"])
+
+        for artifact_id, key in self._restored.items():
+            entry = self._read_entry(key)
+            if entry is None:
+                raise RuntimeError(f"cache entry for {artifact_id} vanished")
+            self._restore(key, entry, outdir, manifest["artifacts"])
+
+        assembly.write_json(manifest_path, manifest)
+        return cloud_assembly
+
+    def invalidate(
+        self,
+        stack_cls: Type["Stack"] | None = None,
+        config: BaseSettings | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Drop one stack's entry, or the whole cache without arguments."""
+        if stack_cls is None or config is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+        key = self.key(stack_cls, config, **kwargs)
+        shutil.rmtree(self.directory / key, ignore_errors=True)
+
+    def _read_entry(self, key: str) -> dict[str, Any] | None:
+        path = self.directory / key / ENTRY_FILE
+        if not path.is_file():
+            return None
+        return assembly.read_json(path)
+
+    def _store(
+        self,
+        key: str,
+        artifact_id: str,
+        outdir: Path,
+        artifacts: dict[str, Any],
+    ) -> None:
+        entry_artifacts, files = assembly.stack_files(
+            outdir, artifacts, artifact_id
+        )
+
+        entry_dir = self.directory / key
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        for name in files:
+            assembly.copy_path(outdir / name, entry_dir / "files" / name)
+        assembly.write_json(
+            entry_dir / ENTRY_FILE,
+            {
+                "artifact_id": artifact_id,
+                "artifacts": entry_artifacts,
+                "files": files,
+            },
+        )
+
+    def _restore(
+        self,
+        key: str,
+        entry: dict[str, Any],
+        outdir: Path,
+        artifacts: dict[str, Any],
+    ) -> None:
+        for name in entry["files"]:
+            assembly.copy_path(
+                self.directory / key / "files" / name, outdir / name
+            )
+        artifacts.update(entry["artifacts"])
@@ -0,0 +1,186 @@
+"""Serve CDK context lookups (``Vpc.from_lookup``, ``HostedZone.from_lookup``,
+availability zones, ...) from a local file instead of the CDK CLI.
+
+Without context, each lookup makes ``cdk synth`` report it as missing,
+query AWS, and run the app again. Offline, stacks only ever see CDK's
+dummy values. A provider pre-populates the app context instead. Every
+stack that looks up the same VPC or zone reads the one entry, so it is
+resolved once per app::
+
+    lookups = FileLookupProvider("lookups.json")
+    app = lookups.app()
+    ...  # build stacks
+    app.synth()
+    print(lookups.report(app.outdir, max_age=timedelta(days=30)))
+
+Fixtures map CDK context keys to ``{"value": ..., "fetched_at": ...}``. A
+plain ``cdk.context.json`` can be read as-is. :meth:`FileLookupProvider.record`
+copies the lookups from a ``cdk.context.json`` that the CLI filled on a
+host with AWS access, stamping each with the time it was recorded.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import assembly
+
+if TYPE_CHECKING:
+    from aws_cdk import App
+
+DEFAULT_CONTEXT_FILE = "cdk.context.json"
+
+
+@dataclass
+class LookupEntry:
+    value: Any
+    # Unknown for entries read from a plain cdk.context.json
+    fetched_at: datetime | None = None
+
+
+@dataclass
+class LookupReport:
+    # Lookups the app made that the provider had no entry for
+    missing: list[str] = field(default_factory=list)
+    # Entries older than the allowed age
+    stale: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.stale
+
+    def __str__(self) -> str:
+        lines = [
+            f"lookups: {len(self.missing)} missing, {len(self.stale)} stale"
+        ]
+        lines.extend(f"  missing {key}" for key in self.missing)
+        lines.extend(f"  stale {key}" for key in self.stale)
+        return "\n".join(lines)
+
+
+def is_lookup_key(key: str) -> bool:
+    # Lookup keys look like "vpc-provider:account=...:region=...";
+    # feature flags ("@aws-cdk/...") and plain settings are not lookups
+    return ":" in key and not key.startswith("@")
+
+
+def missing_lookups(outdir: str | Path) -> list[str]:
+    manifest = assembly.read_json(Path(outdir) / assembly.MANIFEST_FILE)
+    return [entry["key"] for entry in manifest.get("missing", [])]
+
+
+class LookupProvider(ABC):
+    @abstractmethod
+    def entries(self) -> dict[str, LookupEntry]:
+        pass
+
+    def context(self) -> dict[str, Any]:
+        return {key: entry.value for key, entry in self.entries().items()}
+
+    def app(self, **kwargs: Any) -> "App":
+        """An App whose context holds every lookup entry.
+
+        Context from the CDK CLI still takes precedence, so fresh values
+        from cdk.context.json win over the provider's.
+        """
+        from aws_cdk import App
+
+        context = {**self.context(), **kwargs.pop("context", {})}
+        return App(context=context, **kwargs)
+
+    def stale(
+        self, max_age: timedelta, now: datetime | None = None
+    ) -> list[str]:
+        now = now or datetime.now(timezone.utc)
+        return [
+            key
+            for key, entry in self.entries().items()
+            if entry.fetched_at is not None
+            and now - entry.fetched_at > max_age
+        ]
+
+    def report(
+        self,
+        outdir: str | Path,
+        max_age: timedelta | None = None,
+        now: datetime | None = None,
+    ) -> LookupReport:
+        return LookupReport(
+            missing=missing_lookups(outdir),
+            stale=self.stale(max_age, now) if max_age is not None else [],
+        )
+
+
+class FileLookupProvider(LookupProvider):
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._entries: dict[str, LookupEntry] | None = None
+
+    def entries(self) -> dict[str, LookupEntry]:
+        # Read once, however many stacks or apps use the provider
+        if self._entries is None:
+            self._entries = (
+                self._parse(assembly.read_json(self.path))
+                if self.path.is_file()
+                else {}
+            )
+        return self._entries
+
+    def record(
+        self,
+        context_file: str | Path = DEFAULT_CONTEXT_FILE,
+        now: datetime | None = None,
+    ) -> list[str]:
+        """Copy the lookups in a CLI-filled cdk.context.json into the fixture.
+
+        Returns the keys that were added or whose value changed.
+        """
+        now = now or datetime.now(timezone.utc)
+        entries = dict(self.entries())
+        changed = []
+        for key, value in assembly.read_json(Path(context_file)).items():
+            if not is_lookup_key(key):
+                continue
+            if key not in entries or entries[key].value != value:
+                changed.append(key)
+            entries[key] = LookupEntry(value=value, fetched_at=now)
+
+        self._entries = entries
+        self.save()
+        return changed
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        assembly.write_json(
+            self.path,
+            {
+                key: {
+                    "value": entry.value,
+                    "fetched_at": (
+                        entry.fetched_at.isoformat()
+                        if entry.fetched_at is not None
+                        else None
+                    ),
+                }
+                for key, entry in sorted(self.entries().items())
+            },
+        )
+
+    @staticmethod
+    def _parse(data: dict[str, Any]) -> dict[str, LookupEntry]:
+        entries = {}
+        for key, raw in data.items():
+            if not is_lookup_key(key):
+                continue
+            if isinstance(raw, dict) and set(raw) == {"value", "fetched_at"}:
+                fetched_at = (
+                    datetime.fromisoformat(raw["fetched_at"])
+                    if raw["fetched_at"] is not None
+                    else None
+                )
+                entries[key] = LookupEntry(raw["value"], fetched_at)
+            else:
+                # A plain cdk.context.json value
+                entries[key] = LookupEntry(raw)
+        return entries
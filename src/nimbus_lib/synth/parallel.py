@@ -0,0 +1,238 @@
+"""Build and synthesize independent stacks across worker processes.
+
+Each worker process runs its own jsii runtime and synthesizes one stack
+per task into a scratch assembly. The results are then merged into a
+single cloud assembly, with the same files and manifest artifacts as
+``cdk synth`` of one app holding every stack::
+
+    synth = ParallelSynth(outdir="cdk.out", workers=8)
+    for config in configs:
+        synth.add(config)
+    report = synth.synth()
+    print(report)
+
+Workers are spawned, so they re-import the script that started the
+parent (an ``app.py`` run by ``cdk synth``). Put the synth under an
+``if __name__ == "__main__":`` guard, or each worker would build the app
+again; :meth:`ParallelSynth.synth` raises when called from a worker.
+
+Stacks are built from their config alone, with ``env`` taken from the
+config's account and region. Stacks that reference each other (e.g.
+``FargateStack(..., shared=...)``) can't be split across processes and
+must be synthesized in one app.
+"""
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from importlib import import_module
+from pathlib import Path
+from typing import Any
+
+from nimbus_lib.config import stacks as stack_confs
+
+from . import assembly
+
+SCRATCH_DIR = ".parallel"
+
+# Stack class (in nimbus_lib.stacks) for each config type
+STACK_CLASSES: dict[type[stack_confs.StackConfig], str] = {
+    stack_confs.VpcConfig: "VpcStack",
+    stack_confs.RdsConfig: "RdsStack",
+    stack_confs.CacheConfig: "CacheStack",
+    stack_confs.BastionConfig: "BastionStack",
+    stack_confs.FargateConfig: "FargateStack",
+    stack_confs.SharedAlbConfig: "SharedAlbStack",
+}
+
+
+@dataclass
+class StackTiming:
+    artifact_id: str
+    build_seconds: float
+    synth_seconds: float
+    worker_pid: int
+
+    @property
+    def total_seconds(self) -> float:
+        return self.build_seconds + self.synth_seconds
+
+
+@dataclass
+class ParallelSynthReport:
+    outdir: str
+    workers: int
+    wall_seconds: float = 0.0
+    stacks: list[StackTiming] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.stacks)} stack(s) on {self.workers} worker(s) in"
+            f" {self.wall_seconds:.2f}s -> {self.outdir}"
+        ]
+        for timing in sorted(self.stacks, key=lambda t: -t.total_seconds):
+            lines.append(
+                f"  {timing.artifact_id}: {timing.total_seconds:.2f}s"
+                f" (build {timing.build_seconds:.2f}s,"
+                f" synth {timing.synth_seconds:.2f}s, pid {timing.worker_pid})"
+            )
+        return "\n".join(lines)
+
+
+def stack_class_path(config: stack_confs.StackConfig) -> str:
+    # The most specific registered config type wins, so subclassed
+    # configs still map to their stack
+    for config_type in type(config).__mro__:
+        if config_type in STACK_CLASSES:
+            return f"nimbus_lib.stacks:{STACK_CLASSES[config_type]}"
+    raise ValueError(f"no stack registered for {type(config).__name__}")
+
+
+def _load(path: str) -> Any:
+    module, name = path.split(":", 1)
+    return getattr(import_module(module), name)
+
+
+def _synth_one(
+    stack_path: str, config: stack_confs.StackConfig, scratch: str
+) -> tuple[StackTiming, str]:
+    # Runs in a worker; aws_cdk is imported here so that the parent
+    # process never starts a jsii runtime of its own
+    from aws_cdk import App, Environment
+
+    started = time.perf_counter()
+    app = App(outdir=scratch)
+    stack = _load(stack_path)(
+        app,
+        config,
+        env=Environment(account=config.account, region=config.region),
+    )
+    built = time.perf_counter()
+    app.synth()
+    timing = StackTiming(
+        artifact_id=stack.artifact_id,
+        build_seconds=built - started,
+        synth_seconds=time.perf_counter() - built,
+        worker_pid=os.getpid(),
+    )
+    return timing, scratch
+
+
+class ParallelSynth:
+    def __init__(
+        self,
+        outdir: str | os.PathLike | None = None,
+        workers: int | None = None,
+    ):
+        # Same default output directory as the CDK CLI
+        self.outdir = Path(outdir or os.environ.get("CDK_OUTDIR", "cdk.out"))
+        self.workers = workers or os.cpu_count() or 1
+        self._entries: list[tuple[str, stack_confs.StackConfig]] = []
+
+    def add(
+        self,
+        config: stack_confs.StackConfig,
+        stack_class: str | None = None,
+    ) -> None:
+        """Queue a stack.
+
+        ``stack_class`` is a ``"module:Class"`` path. Pass it for stack
+        subclasses; otherwise the nimbus_lib stack for the config type is
+        used.
+        """
+        self._entries.append((stack_class or stack_class_path(config), config))
+
+    def synth(self) -> ParallelSynthReport:
+        """Synthesize the queued stacks into ``outdir``.
+
+        Call it under an ``if __name__ == "__main__":`` guard; workers
+        re-import the calling script.
+        """
+        if multiprocessing.parent_process() is not None:
+            raise RuntimeError(
+                "ParallelSynth.synth() ran in a worker process; guard the"
+                " app script with if __name__ == '__main__':"
+            )
+        report = ParallelSynthReport(
+            outdir=str(self.outdir), workers=self.workers
+        )
+        scratch_root = self.outdir / SCRATCH_DIR
+        shutil.rmtree(scratch_root, ignore_errors=True)
+
+        started = time.perf_counter()
+        # Forked children would share the parent's jsii pipes
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, max(len(self._entries), 1)),
+            mp_context=context,
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _synth_one,
+                    stack_path,
+                    config,
+                    str(scratch_root / str(idx)),
+                )
+                for idx, (stack_path, config) in enumerate(self._entries)
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except BrokenProcessPool as error:
+                raise RuntimeError(
+                    "a synth worker died; if the app script builds or"
+                    " synthesizes stacks at import time, guard it with"
+                    " if __name__ == '__main__':"
+                ) from error
+
+        self._merge([(timing.artifact_id, Path(d)) for timing, d in results])
+        shutil.rmtree(scratch_root, ignore_errors=True)
+
+        report.stacks = [timing for timing, _ in results]
+        report.wall_seconds = time.perf_counter() - started
+        return report
+
+    def _merge(self, shards: list[tuple[str, Path]]) -> None:
+        manifest: dict[str, Any] = {}
+        tree: dict[str, Any] = {}
+        artifacts: dict[str, Any] = {}
+        missing: dict[str, Any] = {}
+
+        for artifact_id, scratch in shards:
+            shard_manifest = assembly.read_json(
+                scratch / assembly.MANIFEST_FILE
+            )
+            if not manifest:
+                manifest = shard_manifest
+            if artifact_id in artifacts:
+                raise ValueError(f"duplicate stack: {artifact_id}")
+
+            stack_artifacts, files = assembly.stack_files(
+                scratch, shard_manifest["artifacts"], artifact_id
+            )
+            artifacts.update(stack_artifacts)
+            for name in files:
+                assembly.copy_path(scratch / name, self.outdir / name)
+            for entry in shard_manifest.get("missing", []):
+                missing[entry["key"]] = entry
+
+            shard_tree = assembly.read_json(scratch / assembly.TREE_FILE)
+            if not tree:
+                tree = shard_tree
+            else:
+                tree["tree"]["children"][artifact_id] = shard_tree["tree"][
+                    "children"
+                ][artifact_id]
+
+        if not manifest:
+            return
+        if "Tree" in manifest["artifacts"]:
+            artifacts["Tree"] = manifest["artifacts"]["Tree"]
+            assembly.write_json(self.outdir / assembly.TREE_FILE, tree)
+        manifest["artifacts"] = artifacts
+        if missing:
+            manifest["missing"] = list(missing.values())
+        self.outdir.mkdir(parents=True, exist_ok=True)
+        assembly.write_json(self.outdir / assembly.MANIFEST_FILE, manifest)
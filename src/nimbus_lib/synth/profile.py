@@ -0,0 +1,124 @@
+"""Attribute a synthesized template's resources and bytes to the stack
+builder methods (``setup_domains``, ``load_balancer``, ...) that made them.
+
+CloudFormation rejects templates with more than 500 resources or more
+than 1 MB of body, and deploys slow down well before either limit::
+
+    app = App(context={PROFILE_CONTEXT: True})
+    ...  # build stacks
+    app.synth()
+    profile = profile_stack(stack, app.outdir)
+    print(profile)
+    for warning in profile.warnings():
+        ...
+
+With the ``nimbus:profile`` context flag set, builder methods decorated
+with ``nimbus_lib.stacks.profiling.profiled`` record the constructs they
+add. Resources created directly in a stack's ``__init__``, or by CDK
+during synthesis, are reported under ``(stack)``. Nested stacks get
+their own profile.
+"""
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nimbus_lib.stacks.profiling import construct_owners
+from . import assembly
+
+if TYPE_CHECKING:
+    from aws_cdk import Stack
+
+MAX_RESOURCES = 500
+MAX_TEMPLATE_BYTES = 1_000_000
+UNOWNED = "(stack)"
+
+
+@dataclass
+class MethodProfile:
+    method: str
+    resources: int = 0
+    # Minified JSON bytes of the method's resources
+    bytes: int = 0
+
+
+@dataclass
+class TemplateProfile:
+    stack: str
+    resources: int
+    bytes: int
+    methods: list[MethodProfile] = field(default_factory=list)
+    nested: list["TemplateProfile"] = field(default_factory=list)
+
+    def warnings(self, ratio: float = 0.8) -> list[str]:
+        """Templates at or above ``ratio`` of CloudFormation's limits."""
+        warnings = []
+        if self.resources >= MAX_RESOURCES * ratio:
+            warnings.append(
+                f"{self.stack}: {self.resources} of {MAX_RESOURCES} resources"
+            )
+        if self.bytes >= MAX_TEMPLATE_BYTES * ratio:
+            warnings.append(
+                f"{self.stack}: {self.bytes} of {MAX_TEMPLATE_BYTES} "
+                "template bytes"
+            )
+        for nested in self.nested:
+            warnings.extend(nested.warnings(ratio))
+        return warnings
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.stack}: {self.resources} resources, {self.bytes} bytes"
+        ]
+        lines.extend(
+            f"  {method.method:<28} {method.resources:>5} {method.bytes:>9}"
+            for method in self.methods
+        )
+        lines.extend(str(nested) for nested in self.nested)
+        return "\n".join(lines)
+
+
+def profile_stack(stack: "Stack", outdir: str | Path) -> TemplateProfile:
+    """Profile a stack from the templates its app synthesized to outdir."""
+    return _profile(stack, Path(outdir), construct_owners(stack))
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":")).encode())
+
+
+def _profile(
+    stack: "Stack", outdir: Path, owners: dict[str, str]
+) -> TemplateProfile:
+    from aws_cdk import CfnResource, NestedStack, Stack
+
+    template = assembly.read_json(outdir / stack.template_file)
+    resources = template.get("Resources", {})
+    methods: dict[str, MethodProfile] = {}
+    nested = []
+    for construct in stack.node.find_all():
+        if isinstance(construct, NestedStack) and construct is not stack:
+            parent = construct.nested_stack_parent
+            if parent is not None and parent.node.path == stack.node.path:
+                nested.append(_profile(construct, outdir, owners))
+            continue
+        if not isinstance(construct, CfnResource):
+            continue
+        if Stack.of(construct).node.path != stack.node.path:
+            continue
+
+        logical_id = stack.resolve(construct.logical_id)
+        if logical_id not in resources:
+            continue
+        method = owners.get(construct.node.path, UNOWNED)
+        profile = methods.setdefault(method, MethodProfile(method))
+        profile.resources += 1
+        profile.bytes += _size(resources[logical_id])
+
+    return TemplateProfile(
+        stack=stack.node.path,
+        resources=len(resources),
+        bytes=_size(template),
+        methods=sorted(methods.values(), key=lambda m: (-m.bytes, m.method)),
+        nested=nested,
+    )
@@ -1,3 +1,5 @@
+import pytest
+from pydantic import ValidationError
 from aws_cdk import assertions, App, Environment
 from nimbus_lib.stacks.bastion_stack import BastionStack
 from nimbus_lib import config as confs
@@ -20,3 +22,59 @@ def test_bastion_stack_created():
     template.has_resource_properties(
         "AWS::EC2::Instance", {"SourceDestCheck": False}
     )
+
+
+def test_bastion_stack_allowlist():
+    config = confs.BastionConfig(
+        key_pair_name="fake",
+        vpc_id="fake",
+        stack_name="TestBastion",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        ip_allowlist=[
+            "10.0.0.0",
+            "10.0.0.1",
+            "10.0.0.2/31",
+            " 10.0.0.0/32",
+            "192.168.1.77/24",
+            "2001:db8::/33",
+            "2001:db8:8000::/33",
+        ],
+    )
+    assert confs.compile_allowlist(config.ip_allowlist) == [
+        "10.0.0.0/30",
+        "192.168.1.0/24",
+        "2001:db8::/32",
+    ]
+    report = config.allowlist_report
+    assert (report.rules_before, report.rules_after) == (7, 3)
+
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = BastionStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "SecurityGroupIngress": [
+                assertions.Match.object_like({"CidrIp": "10.0.0.0/30"}),
+                assertions.Match.object_like({"CidrIp": "192.168.1.0/24"}),
+                assertions.Match.object_like({"CidrIpv6": "2001:db8::/32"}),
+            ]
+        },
+    )
+
+
+def test_bastion_stack_rejects_bad_allowlist():
+    with pytest.raises(ValidationError):
+        confs.BastionConfig(
+            key_pair_name="fake",
+            vpc_id="fake",
+            stack_name="TestBastion",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            ip_allowlist=["10.0.0.300"],
+        )
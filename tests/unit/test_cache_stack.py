@@ -0,0 +1,119 @@
+import re
+from typing import Any
+import pytest
+from pydantic import ValidationError
+from aws_cdk import assertions, App, Environment
+from nimbus_lib.stacks.cache_stack import CacheStack
+from nimbus_lib import config as confs
+
+
+def test_cache_stack_created():
+    config = confs.CacheConfig(
+        vpc_id="fake",
+        stack_name="TestCache",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        cluster_mode=True,
+        shards=3,
+        replicas_per_shard=2,
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = CacheStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ElastiCache::ReplicationGroup",
+        {
+            "Engine": "redis",
+            "ClusterMode": "enabled",
+            "NumNodeGroups": 3,
+            "ReplicasPerNodeGroup": 2,
+            "CacheParameterGroupName": "default.redis7.cluster.on",
+            "AutomaticFailoverEnabled": True,
+            "TransitEncryptionEnabled": True,
+        },
+    )
+    assert stack.ingress_config().port == 6379
+
+    with pytest.raises(ValueError):
+        confs.CacheConfig(
+            vpc_id="fake",
+            stack_name="TestCache",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            shards=2,
+        )
+
+
+def test_cache_stack_serverless():
+    config = confs.CacheConfig(
+        vpc_id="fake",
+        stack_name="TestCache",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        engine="valkey",
+        serverless=True,
+        max_data_storage_gb=10,
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = CacheStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ElastiCache::ServerlessCache",
+        {
+            "Engine": "valkey",
+            "MajorEngineVersion": "7",
+            "CacheUsageLimits": {"DataStorage": {"Maximum": 10, "Unit": "GB"}},
+        },
+    )
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 0)
+    template.has_resource_properties(
+        "AWS::ElastiCache::ServerlessCache",
+        {"ServerlessCacheName": "testtestcache"},
+    )
+
+
+def test_cache_config_rejects_ignored_settings():
+    base: dict[str, Any] = dict(
+        vpc_id="fake",
+        stack_name="TestCache",
+        env="test",
+        account="fake",
+        region="us-east-1",
+    )
+    rejected: list[dict[str, Any]] = [
+        {"serverless": True, "transit_encryption": False},
+        {"serverless": True, "node_type": "cache.r7g.large"},
+        {"serverless": True, "replicas_per_shard": 2},
+        {"serverless": True, "parameter_group_name": "custom"},
+        {"max_ecpu_per_second": 5000},
+    ]
+    for settings in rejected:
+        with pytest.raises(ValidationError, match="not supported"):
+            confs.CacheConfig(**base, **settings)
+
+
+def test_cache_config_serverless_cache_name():
+    def name(stack_name: str) -> str:
+        return confs.CacheConfig(
+            vpc_id="fake",
+            stack_name=stack_name,
+            env="test",
+            account="fake",
+            region="us-east-1",
+            serverless=True,
+        ).serverless_cache_name
+
+    assert name("Sessions") == "testsessions"
+    assert name("Api_Sessions--v2") == "testapi-sessions-v2"
+    long_names = [name("Sessions" * 6), name("Sessions" * 6 + "2")]
+    for cache_name in long_names:
+        assert len(cache_name) <= 40
+        assert re.fullmatch(r"[a-z][a-z0-9]*(-[a-z0-9]+)*", cache_name)
+    assert long_names[0] != long_names[1]
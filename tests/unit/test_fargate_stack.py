@@ -1,4 +1,8 @@
-from aws_cdk import assertions, App, Environment
+import json
+from typing import Any
+import pytest
+from pydantic import ValidationError
+from aws_cdk import assertions, App, Environment, NestedStack
 from nimbus_lib.stacks.fargate_stack import FargateStack
 from nimbus_lib import config as confs
 
@@ -23,3 +27,1078 @@ def test_fargate_stack_created():
     template.has_resource_properties(
         "AWS::ECS::Service", {"LaunchType": "FARGATE"}
     )
+
+
+def test_fargate_stack_scaling_policies():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+        ),
+        scaling=confs.ScalingConfig(
+            min_task_count=2,
+            max_task_count=10,
+            policies=[
+                confs.RequestCountScalingPolicy(requests_per_target=500),
+                confs.ResponseTimeScalingPolicy(target_seconds=0.25),
+                confs.MemoryScalingPolicy(scale_in_cooldown=300),
+                confs.StepScalingPolicy(
+                    namespace="Custom",
+                    metric_name="QueueDepth",
+                    steps=[
+                        confs.ScalingStepConfig(upper=10, change=-1),
+                        confs.ScalingStepConfig(lower=100, change=+2),
+                    ],
+                ),
+            ],
+        ),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"MinCapacity": 2, "MaxCapacity": 10},
+    )
+    target_tracking = "TargetTrackingScalingPolicyConfiguration"
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            target_tracking: assertions.Match.object_like(
+                {
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": "ALBRequestCountPerTarget",
+                        "ResourceLabel": assertions.Match.any_value(),
+                    },
+                    "TargetValue": 500,
+                }
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            target_tracking: assertions.Match.object_like(
+                {
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": (
+                            "ECSServiceAverageMemoryUtilization"
+                        )
+                    },
+                    "ScaleInCooldown": 300,
+                }
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {"PolicyType": "StepScaling"},
+    )
+    template.resource_count_is("AWS::ElasticLoadBalancingV2::TargetGroup", 1)
+
+
+def test_fargate_stack_task_size():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+        ),
+        task=confs.TaskConfig(
+            cpu=1024,
+            memory_mib=4096,
+            ephemeral_storage_gib=50,
+            architecture=confs.CpuArchitecture.ARM64,
+        ),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "Cpu": "1024",
+            "Memory": "4096",
+            "EphemeralStorage": {"SizeInGiB": 50},
+            "RuntimePlatform": {
+                "CpuArchitecture": "ARM64",
+                "OperatingSystemFamily": "LINUX",
+            },
+        },
+    )
+
+
+def test_task_config_rejects_unsupported_size():
+    with pytest.raises(ValidationError):
+        confs.TaskConfig(cpu=256, memory_mib=4096)
+    with pytest.raises(ValidationError):
+        confs.TaskConfig(cpu=256, memory_mib=1536)
+    with pytest.raises(ValidationError):
+        confs.TaskConfig(cpu=300, memory_mib=512)
+    with pytest.raises(ValidationError):
+        confs.TaskConfig(ephemeral_storage_gib=10)
+
+
+def test_fargate_stack_spot_capacity():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+        ),
+        capacity=confs.CapacityConfig(on_demand_base=2, spot_weight=3),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::ClusterCapacityProviderAssociations",
+        {"CapacityProviders": ["FARGATE", "FARGATE_SPOT"]},
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "CapacityProviderStrategy": [
+                {"CapacityProvider": "FARGATE", "Base": 2, "Weight": 1},
+                {"CapacityProvider": "FARGATE_SPOT", "Weight": 3},
+            ],
+            "LaunchType": assertions.Match.absent(),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                assertions.Match.object_like({"StopTimeout": 120})
+            ]
+        },
+    )
+
+    # Fargate caps stopTimeout at 120 seconds
+    for spot_stop_timeout in (0, 121):
+        with pytest.raises(ValidationError):
+            confs.CapacityConfig(
+                spot_weight=1, spot_stop_timeout=spot_stop_timeout
+            )
+
+
+def test_fargate_stack_target_group_tuning():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+        ),
+        health_check=confs.HealthCheckConfig(
+            path="/healthz",
+            healthy_http_codes="200-299",
+            interval=10,
+            healthy_threshold=2,
+        ),
+        slow_start=60,
+        deregistration_delay=15,
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {
+            "HealthCheckPath": "/healthz",
+            "HealthCheckIntervalSeconds": 10,
+            "HealthyThresholdCount": 2,
+            "Matcher": {"HttpCode": "200-299"},
+            "TargetGroupAttributes": assertions.Match.array_with(
+                [
+                    {
+                        "Key": "deregistration_delay.timeout_seconds",
+                        "Value": "15",
+                    },
+                    {"Key": "slow_start.duration_seconds", "Value": "60"},
+                ]
+            ),
+        },
+    )
+
+
+def test_fargate_stack_alb_tuning():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+        ),
+        domains=[confs.DomainConfig(domain="example.com")],
+        load_balancing_algorithm="LEAST_OUTSTANDING_REQUESTS",
+        stickiness_seconds=3600,
+        protocol_version="GRPC",
+        idle_timeout=300,
+        redirect_http=True,
+        ssl_policy="RECOMMENDED_TLS",
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {
+            "ProtocolVersion": "GRPC",
+            "Matcher": {"GrpcCode": "12"},
+            "TargetGroupAttributes": assertions.Match.array_with(
+                [
+                    {
+                        "Key": "load_balancing.algorithm.type",
+                        "Value": "least_outstanding_requests",
+                    },
+                ]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::LoadBalancer",
+        {
+            "LoadBalancerAttributes": assertions.Match.array_with(
+                [{"Key": "idle_timeout.timeout_seconds", "Value": "300"}]
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::Listener",
+        {
+            "Port": 80,
+            "DefaultActions": [
+                assertions.Match.object_like(
+                    {
+                        "Type": "redirect",
+                        "RedirectConfig": assertions.Match.object_like(
+                            {"Protocol": "HTTPS", "Port": "443"}
+                        ),
+                    }
+                )
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::Listener",
+        {
+            "Port": 443,
+            "SslPolicy": "ELBSecurityPolicy-TLS13-1-2-2021-06",
+        },
+    )
+
+    with pytest.raises(ValidationError):
+        confs.FargateConfig(
+            stack_name="TestFargate",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            vpc_id="fake",
+            container=confs.ContainerConfig(port=80, image="fake"),
+            load_balancing_algorithm="LEAST_OUTSTANDING_REQUESTS",
+            slow_start=60,
+        )
+    # GRPC needs every forwarding listener to be HTTPS
+    with pytest.raises(ValidationError, match="HTTPS listeners"):
+        confs.FargateConfig(
+            stack_name="TestFargate",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            vpc_id="fake",
+            container=confs.ContainerConfig(port=80, image="fake"),
+            domains=[confs.DomainConfig(domain="example.com")],
+            protocol_version="GRPC",
+        )
+
+
+def test_fargate_stack_cdn():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="eu-west-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+        ),
+        public_access=True,
+        domains=[
+            confs.DomainConfig(
+                domain="example.com",
+                subdomain="www",
+                cdn=confs.CdnConfig(
+                    paths=[
+                        confs.CdnPathConfig(path_pattern="/static/*"),
+                        confs.CdnPathConfig(path_pattern="/feed", ttl=30),
+                    ]
+                ),
+            ),
+            confs.DomainConfig(domain="example.com", subdomain="api"),
+        ],
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::CloudFront::Distribution", 1)
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": assertions.Match.object_like(
+                {
+                    "Aliases": ["www.example.com"],
+                    "CacheBehaviors": [
+                        assertions.Match.object_like(
+                            {"PathPattern": "/static/*", "Compress": True}
+                        ),
+                        assertions.Match.object_like({"PathPattern": "/feed"}),
+                    ],
+                    "Origins": [
+                        assertions.Match.object_like(
+                            {
+                                "CustomOriginConfig": (
+                                    assertions.Match.object_like(
+                                        {
+                                            "OriginProtocolPolicy": (
+                                                "http-only"
+                                            ),
+                                            "OriginKeepaliveTimeout": 60,
+                                        }
+                                    )
+                                )
+                            }
+                        )
+                    ],
+                }
+            )
+        },
+    )
+    template.resource_count_is("AWS::CloudFront::CachePolicy", 1)
+    # The viewer certificate is requested in us-east-1
+    template.has_resource_properties(
+        "AWS::CloudFormation::CustomResource",
+        {"DomainName": "www.example.com", "Region": "us-east-1"},
+    )
+    # Public load balancers need no CloudFront prefix list
+    template.resource_count_is("Custom::AWS", 0)
+
+
+def test_fargate_stack_cdn_origin_access():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        domains=[
+            confs.DomainConfig(
+                domain="example.com",
+                cdn=confs.CdnConfig(origin_protocol="HTTP_ONLY"),
+            )
+        ],
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "Custom::AWS",
+        {
+            "Create": assertions.Match.string_like_regexp(
+                "describeManagedPrefixLists.*cloudfront.origin-facing"
+            )
+        },
+    )
+    # Only the origin port CloudFront uses is opened to it
+    cdn_rules = template.find_resources(
+        "AWS::EC2::SecurityGroupIngress",
+        {"Properties": {"Description": "cloudfront origin access"}},
+    )
+    assert len(cdn_rules) == 1
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "Description": "cloudfront origin access",
+            "FromPort": 80,
+            "ToPort": 80,
+            "SourcePrefixListId": {
+                "Fn::GetAtt": [
+                    assertions.Match.any_value(),
+                    "PrefixLists.0.PrefixListId",
+                ]
+            },
+        },
+    )
+    assert config.cdn_origin_ports == (80,)
+
+
+def test_fargate_stack_cdn_with_redirect_http():
+    def make_config(origin_protocol: str) -> confs.FargateConfig:
+        return confs.FargateConfig(
+            stack_name="TestFargate",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            vpc_id="fake",
+            container=confs.ContainerConfig(port=80, image="fake"),
+            domains=[
+                confs.DomainConfig(
+                    domain="example.com",
+                    cdn=confs.CdnConfig(
+                        origin_protocol=origin_protocol  # pyright: ignore
+                    ),
+                )
+            ],
+            redirect_http=True,
+        )
+
+    # An HTTP origin would get the listener's redirect on every request
+    for origin_protocol in ("HTTP_ONLY", "MATCH_VIEWER"):
+        with pytest.raises(ValidationError, match="HTTPS_ONLY"):
+            make_config(origin_protocol)
+
+    config = make_config("HTTPS_ONLY")
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": assertions.Match.object_like(
+                {
+                    "Origins": [
+                        assertions.Match.object_like(
+                            {
+                                "CustomOriginConfig": (
+                                    assertions.Match.object_like(
+                                        {
+                                            "OriginProtocolPolicy": (
+                                                "https-only"
+                                            ),
+                                            "HTTPSPort": 443,
+                                        }
+                                    )
+                                )
+                            }
+                        )
+                    ]
+                }
+            )
+        },
+    )
+    # CloudFront only needs the HTTPS listener
+    cdn_rules = template.find_resources(
+        "AWS::EC2::SecurityGroupIngress",
+        {"Properties": {"Description": "cloudfront origin access"}},
+    )
+    assert [rule["Properties"]["FromPort"] for rule in cdn_rules.values()] == [
+        443
+    ]
+
+
+def test_fargate_stack_volumes():
+    filesystem = confs.FileSystemConfig(
+        throughput_mode="PROVISIONED",
+        provisioned_throughput=64,
+        lifecycle_policy="AFTER_30_DAYS",
+    )
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+            volumes=[
+                confs.VolumeConfig(path="/data", filesystem=filesystem),
+                confs.VolumeConfig(
+                    path="/config",
+                    read_only=True,
+                    filesystem=filesystem,
+                    access_point=confs.AccessPointConfig(path="/config"),
+                ),
+                confs.VolumeConfig(path="/shared", filesys_id="fs-12345678"),
+                confs.VolumeConfig(path="/other", filesys_id="fs-12345678"),
+            ],
+        ),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::EFS::FileSystem", 1)
+    template.has_resource_properties(
+        "AWS::EFS::FileSystem",
+        {
+            "ThroughputMode": "provisioned",
+            "ProvisionedThroughputInMibps": 64,
+            "LifecyclePolicies": [{"TransitionToIA": "AFTER_30_DAYS"}],
+        },
+    )
+    template.resource_count_is("AWS::EFS::AccessPoint", 1)
+    # One security group per filesystem
+    template.resource_properties_count_is(
+        "AWS::EC2::SecurityGroupIngress",
+        {"FromPort": 2049, "ToPort": 2049},
+        2,
+    )
+    # Imported filesystems alongside others are named by ID
+    security_groups = template.find_resources("AWS::EC2::SecurityGroup")
+    assert any("FileSystemSecGrpfs12345678" in key for key in security_groups)
+
+    # A single filesystem keeps the construct IDs it had before volumes
+    # could mount several, so upgrading doesn't replace it
+    single = FargateStack(
+        App(),
+        config.model_copy(
+            update={
+                "container": confs.ContainerConfig(
+                    port=80,
+                    image="fake",
+                    volumes=[
+                        confs.VolumeConfig(
+                            path="/shared", filesys_id="fs-12345678"
+                        )
+                    ],
+                ),
+            }
+        ),
+        env=env,
+    )
+    single_groups = assertions.Template.from_stack(single).find_resources(
+        "AWS::EC2::SecurityGroup"
+    )
+    assert not any("fs12345678" in key for key in single_groups)
+    assert any("FileSystemSecGrp" in key for key in single_groups)
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                assertions.Match.object_like(
+                    {
+                        "MountPoints": assertions.Match.array_with(
+                            [
+                                {
+                                    "ContainerPath": "/config",
+                                    "ReadOnly": True,
+                                    "SourceVolume": "vol-1",
+                                }
+                            ]
+                        )
+                    }
+                )
+            ]
+        },
+    )
+
+    with pytest.raises(ValueError):
+        confs.ContainerConfig(
+            port=80,
+            image="fake",
+            volumes=[
+                confs.VolumeConfig(path="/a"),
+                confs.VolumeConfig(path="/b", filesystem=filesystem),
+            ],
+        )
+
+
+def test_fargate_stack_container_tuning():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+            ulimits=[
+                confs.UlimitConfig(
+                    name="NOFILE", soft_limit=65536, hard_limit=65536
+                )
+            ],
+            init_process=True,
+            stop_timeout=60,
+            logging=confs.LoggingConfig(max_buffer_size_mib=25),
+            health_check=confs.ContainerHealthCheckConfig(
+                command=["CMD-SHELL", "curl -f http://localhost/ || exit 1"]
+            ),
+            memory_reservation_mib=256,
+            readonly_root_filesystem=True,
+        ),
+        capacity=confs.CapacityConfig(spot_weight=1),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                assertions.Match.object_like(
+                    {
+                        "Ulimits": [
+                            {
+                                "Name": "nofile",
+                                "SoftLimit": 65536,
+                                "HardLimit": 65536,
+                            }
+                        ],
+                        "LinuxParameters": {"InitProcessEnabled": True},
+                        # The container's stop timeout wins over spot's
+                        "StopTimeout": 60,
+                        "LogConfiguration": {
+                            "LogDriver": "awslogs",
+                            "Options": assertions.Match.object_like(
+                                {
+                                    "mode": "non-blocking",
+                                    "max-buffer-size": "25m",
+                                }
+                            ),
+                        },
+                        "HealthCheck": assertions.Match.object_like(
+                            {"Retries": 3}
+                        ),
+                        "MemoryReservation": 256,
+                        "ReadonlyRootFilesystem": True,
+                    }
+                )
+            ]
+        },
+    )
+
+    with pytest.raises(ValueError):
+        confs.FargateConfig(
+            stack_name="TestFargate",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            vpc_id="fake",
+            container=confs.ContainerConfig(
+                port=80, image="fake", memory_limit_mib=1024
+            ),
+        )
+
+
+def test_fargate_stack_sidecars():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+            depends_on=[
+                confs.DependencyConfig(container="envoy", condition="HEALTHY")
+            ],
+            sidecars=[
+                confs.SidecarConfig(
+                    name="envoy",
+                    image="envoyproxy/envoy",
+                    port=9901,
+                    memory_reservation_mib=128,
+                    health_check=confs.ContainerHealthCheckConfig(
+                        command=["CMD-SHELL", "curl -f localhost:9901/ready"]
+                    ),
+                ),
+                confs.SidecarConfig(
+                    name="otel",
+                    image="otel/opentelemetry-collector",
+                    essential=False,
+                    environment={"OTEL_LOG_LEVEL": "info"},
+                    volumes=[
+                        confs.VolumeConfig(
+                            path="/etc/otel", filesys_id="fs-12345678"
+                        )
+                    ],
+                    depends_on=[confs.DependencyConfig(container="envoy")],
+                ),
+            ],
+        ),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": [
+                assertions.Match.object_like(
+                    {
+                        "Essential": True,
+                        "DependsOn": [
+                            {"Condition": "HEALTHY", "ContainerName": "envoy"}
+                        ],
+                    }
+                ),
+                assertions.Match.object_like(
+                    {"Name": "envoy", "MemoryReservation": 128}
+                ),
+                assertions.Match.object_like(
+                    {
+                        "Name": "otel",
+                        "Essential": False,
+                        "DependsOn": [
+                            {"Condition": "START", "ContainerName": "envoy"}
+                        ],
+                        "MountPoints": [
+                            assertions.Match.object_like(
+                                {"ContainerPath": "/etc/otel"}
+                            )
+                        ],
+                    }
+                ),
+            ]
+        },
+    )
+    # Only the primary container is registered with the load balancer
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "LoadBalancers": [
+                assertions.Match.object_like({"ContainerPort": 80})
+            ]
+        },
+    )
+
+    with pytest.raises(ValueError):
+        confs.ContainerConfig(
+            port=80,
+            image="fake",
+            depends_on=[confs.DependencyConfig(container="missing")],
+        )
+
+
+def test_fargate_stack_observability():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(
+            port=80,
+            image="fake",
+            volumes=[confs.VolumeConfig(path="/data")],
+        ),
+        scaling=confs.ScalingConfig(max_task_count=6),
+        observability=confs.ObservabilityConfig(
+            p99_response_time_seconds=0.5,
+            alarm_emails=["oncall@example.com"],
+            rds_instance_ids=["main-db"],
+        ),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::Cluster",
+        {
+            "ClusterSettings": [
+                {"Name": "containerInsights", "Value": "enabled"}
+            ]
+        },
+    )
+    template.resource_count_is("AWS::CloudWatch::Dashboard", 1)
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {"MetricName": "TargetResponseTime", "ExtendedStatistic": "p99"},
+    )
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "MetricName": "RunningTaskCount",
+            "Threshold": 6,
+            "AlarmActions": [{"Ref": assertions.Match.any_value()}],
+        },
+    )
+    # p99, 5xx, CPU, memory and max task count
+    template.resource_count_is("AWS::CloudWatch::Alarm", 5)
+    template.has_resource_properties(
+        "AWS::SNS::Subscription",
+        {"Protocol": "email", "Endpoint": "oncall@example.com"},
+    )
+    assert len(stack.file_systems) == 1
+
+
+def test_fargate_stack_nesting():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        domains=[
+            confs.DomainConfig(domain="example.com", subdomain=f"app{idx}")
+            for idx in range(3)
+        ],
+        ip_allowlist=[f"10.{idx}.0.1" for idx in range(30)],
+        nesting=confs.NestingConfig(domains=2),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    # 2 ports x (VPC + 30 allowlist entries) + service + no ingress confs
+    assert config.security_group_rules == 63
+    template.resource_count_is("AWS::CloudFormation::Stack", 2)
+    template.resource_count_is("AWS::CertificateManager::Certificate", 0)
+    # Security groups moved out of the parent stack
+    template.resource_count_is("AWS::EC2::SecurityGroup", 0)
+
+    domains = stack.node.find_child("TestTestFargateDomains")
+    assert isinstance(domains, NestedStack)
+    nested = assertions.Template.from_stack(domains)
+    nested.resource_count_is("AWS::CertificateManager::Certificate", 3)
+    nested.resource_count_is("AWS::Route53::RecordSet", 3)
+
+
+def test_fargate_stack_allowlist_prefix_list():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        domains=[confs.DomainConfig(domain="example.com")],
+        ip_allowlist=[
+            *(f"10.1.{idx}.0/24" for idx in range(8)),
+            "172.16.0.9",
+            "2001:db8::1",
+        ],
+        allowlist_prefix_list=confs.PrefixListConfig(
+            ids=["pl-12345678"], spare_entries=5
+        ),
+    )
+    # 10 entries on both ports -> 3 lists (IPv4, IPv6, shared) per port
+    report = config.allowlist_report
+    assert (report.cidrs, report.rules_before, report.rules_after) == (
+        3,
+        20,
+        6,
+    )
+
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::EC2::PrefixList", 2)
+    template.has_resource_properties(
+        "AWS::EC2::PrefixList",
+        {
+            "AddressFamily": "IPv4",
+            "MaxEntries": 7,
+            "Entries": [{"Cidr": "10.1.0.0/21"}, {"Cidr": "172.16.0.9/32"}],
+        },
+    )
+    # Prefix list rules are separate ingress resources
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {"SourcePrefixListId": "pl-12345678", "FromPort": 443},
+    )
+    template.has_output(
+        "*",
+        {
+            "Value": {
+                "Fn::GetAtt": [assertions.Match.any_value(), "PrefixListId"]
+            }
+        },
+    )
+
+
+def test_fargate_stack_rolling_deployment():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        deployment=confs.DeploymentConfig(
+            min_healthy_percent=100,
+            max_healthy_percent=200,
+            circuit_breaker=True,
+            health_check_grace_period=30,
+        ),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "DeploymentConfiguration": {
+                "MinimumHealthyPercent": 100,
+                "MaximumPercent": 200,
+                "DeploymentCircuitBreaker": {"Enable": True, "Rollback": True},
+            },
+            "HealthCheckGracePeriodSeconds": 30,
+        },
+    )
+
+
+def test_fargate_stack_blue_green():
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        deployment=confs.DeploymentConfig(
+            blue_green=confs.BlueGreenConfig(
+                traffic_shift="linear", shift_percent=20, shift_interval=2
+            )
+        ),
+        observability=confs.ObservabilityConfig(dashboard=False),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {"DeploymentController": {"Type": "CODE_DEPLOY"}},
+    )
+    template.resource_count_is("AWS::ElasticLoadBalancingV2::TargetGroup", 2)
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::Listener",
+        {"Port": 9000, "Protocol": "HTTP"},
+    )
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentConfig",
+        {
+            "TrafficRoutingConfig": {
+                "Type": "TimeBasedLinear",
+                "TimeBasedLinear": {
+                    "LinearInterval": 2,
+                    "LinearPercentage": 20,
+                },
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentGroup",
+        {
+            "AlarmConfiguration": assertions.Match.object_like(
+                {"Enabled": True}
+            ),
+            "AutoRollbackConfiguration": {
+                "Enabled": True,
+                "Events": assertions.Match.array_with(
+                    ["DEPLOYMENT_STOP_ON_ALARM"]
+                ),
+            },
+        },
+    )
+
+    # Deploys alternate production traffic between the target groups, so
+    # the rollback alarms watch both
+    (green,) = [
+        key
+        for key in template.find_resources(
+            "AWS::ElasticLoadBalancingV2::TargetGroup"
+        )
+        if "GreenTargetGroup" in key
+    ]
+    alarms = template.find_resources(
+        "AWS::CloudWatch::Alarm", {"Properties": {"Threshold": 10}}
+    )
+    (alarm,) = alarms.values()
+    metrics = alarm["Properties"]["Metrics"]
+    assert metrics[0]["Expression"] == "SUM([m0, m1])"
+    assert green in json.dumps(metrics)
+
+
+def test_fargate_config_rejects_bad_deployment():
+    base: dict[str, Any] = dict(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+    )
+    with pytest.raises(ValidationError):
+        confs.DeploymentConfig(
+            circuit_breaker=True, blue_green=confs.BlueGreenConfig()
+        )
+    # HTTP and HTTPS both forward to the service
+    with pytest.raises(ValidationError):
+        confs.FargateConfig(
+            **base,
+            domains=[confs.DomainConfig(domain="example.com")],
+            deployment=confs.DeploymentConfig(
+                blue_green=confs.BlueGreenConfig()
+            ),
+        )
+    with pytest.raises(ValidationError):
+        confs.FargateConfig(
+            **base,
+            deployment=confs.DeploymentConfig(
+                blue_green=confs.BlueGreenConfig(test_port=80)
+            ),
+        )
+
+
+def test_response_time_policy_rejects_percentile():
+    with pytest.raises(ValidationError):
+        confs.ResponseTimeScalingPolicy(
+            target_seconds=0.25,
+            statistic="p99",  # pyright: ignore
+        )
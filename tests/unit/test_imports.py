@@ -0,0 +1,168 @@
+import importlib
+import subprocess
+import sys
+from typing import get_args
+
+import pytest
+from pydantic import TypeAdapter
+
+from nimbus_lib.config import cdk_types
+
+# The config keeps static copies of CDK enum names so it can validate
+# without jsii; name type -> the CDK enum it copies
+CDK_ENUMS = {
+    "SubnetTypeName": ("aws_cdk.aws_ec2", "SubnetType"),
+    "InstanceSizeName": ("aws_cdk.aws_ec2", "InstanceSize"),
+    "InstanceClassName": ("aws_cdk.aws_ec2", "InstanceClass"),
+    "RemovalPolicyName": ("aws_cdk", "RemovalPolicy"),
+    "AdjustmentTypeName": (
+        "aws_cdk.aws_applicationautoscaling",
+        "AdjustmentType",
+    ),
+    "LoadBalancingAlgorithmName": (
+        "aws_cdk.aws_elasticloadbalancingv2",
+        "TargetGroupLoadBalancingAlgorithmType",
+    ),
+    "ProtocolVersionName": (
+        "aws_cdk.aws_elasticloadbalancingv2",
+        "ApplicationProtocolVersion",
+    ),
+    "SslPolicyName": ("aws_cdk.aws_elasticloadbalancingv2", "SslPolicy"),
+    "OriginProtocolPolicyName": (
+        "aws_cdk.aws_cloudfront",
+        "OriginProtocolPolicy",
+    ),
+    "PriceClassName": ("aws_cdk.aws_cloudfront", "PriceClass"),
+    "StorageTypeName": ("aws_cdk.aws_rds", "StorageType"),
+    "PerformanceInsightRetentionName": (
+        "aws_cdk.aws_rds",
+        "PerformanceInsightRetention",
+    ),
+    "EfsThroughputModeName": ("aws_cdk.aws_efs", "ThroughputMode"),
+    "EfsPerformanceModeName": ("aws_cdk.aws_efs", "PerformanceMode"),
+    "EfsLifecyclePolicyName": ("aws_cdk.aws_efs", "LifecyclePolicy"),
+    "UlimitNameName": ("aws_cdk.aws_ecs", "UlimitName"),
+    "ContainerDependencyConditionName": (
+        "aws_cdk.aws_ecs",
+        "ContainerDependencyCondition",
+    ),
+    "RetentionDaysName": ("aws_cdk.aws_logs", "RetentionDays"),
+}
+
+CHECK_JSII = """
+import sys
+from nimbus_lib import config as confs
+import nimbus_lib.stacks
+import nimbus_lib.synth
+
+confs.FargateConfig(
+    stack_name="TestFargate",
+    env="test",
+    account="fake",
+    region="us-east-1",
+    vpc_id="fake",
+    container=confs.ContainerConfig(port=80, image="fake"),
+    scaling=confs.ScalingConfig(
+        policies=[
+            confs.StepScalingPolicy(
+                namespace="Custom",
+                metric_name="QueueDepth",
+                steps=[confs.ScalingStepConfig(lower=100, change=2)],
+            )
+        ]
+    ),
+)
+confs.RdsConfig(
+    stack_name="TestRds",
+    env="test",
+    account="fake",
+    region="us-east-1",
+    vpc_id="fake",
+)
+confs.VpcConfig(
+    stack_name="TestVpc", env="test", account="fake", region="us-east-1"
+)
+loaded = sorted(
+    name for name in sys.modules
+    if name.split(".")[0] in ("jsii", "aws_cdk", "constructs")
+)
+print(",".join(loaded))
+"""
+
+
+def test_config_does_not_start_jsii():
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK_JSII],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+CHECK_NAMES = """
+import sys
+from pydantic import ValidationError
+from nimbus_lib import config as confs
+
+try:
+    confs.RdsConfig(
+        stack_name="TestRds",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        subnet_type="BOGUS",
+        removal_policy="NOPE",
+        instance_type={"size": "HUGE", "type_": "Z9"},
+    )
+except ValidationError as error:
+    print(sorted(".".join(map(str, e["loc"])) for e in error.errors()))
+assert "aws_cdk" not in sys.modules
+"""
+
+
+def test_config_checks_cdk_names_without_jsii():
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK_NAMES],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == str(
+        [
+            "instance_type.size",
+            "instance_type.type_",
+            "removal_policy",
+            "subnet_type",
+        ]
+    )
+
+
+def _is_name_type(value) -> bool:
+    validators = getattr(value, "__metadata__", ())
+    return any(
+        getattr(validator, "func", None) is cdk_types.enum_name
+        for validator in validators
+    )
+
+
+def test_cdk_enums_cover_every_name_type():
+    name_types = {
+        name for name, value in vars(cdk_types).items() if _is_name_type(value)
+    }
+    assert name_types == set(CDK_ENUMS)
+
+
+@pytest.mark.parametrize("name_type", sorted(CDK_ENUMS))
+def test_cdk_name_types_match_cdk_enums(name_type):
+    # Catch drift when aws-cdk-lib is upgraded
+    module, enum_name = CDK_ENUMS[name_type]
+    enum = getattr(importlib.import_module(module), enum_name)
+    annotated = getattr(cdk_types, name_type)
+    assert set(get_args(get_args(annotated)[0])) == set(enum.__members__)
+
+    # CDK members are still accepted and stored by name
+    adapter = TypeAdapter(annotated)
+    for member in enum:
+        assert adapter.validate_python(member) == member.name
@@ -0,0 +1,77 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from aws_cdk import App, Environment, assertions
+from nimbus_lib import config as confs
+from nimbus_lib.stacks.rds_stack import RdsStack
+from nimbus_lib.synth import FileLookupProvider, missing_lookups
+
+VPC = {
+    "vpcId": "vpc-12345678",
+    "vpcCidrBlock": "10.0.0.0/16",
+    "availabilityZones": [],
+    "subnetGroups": [
+        {
+            "name": "Isolated",
+            "type": "Isolated",
+            "subnets": [
+                {
+                    "subnetId": f"subnet-{idx}",
+                    "cidr": f"10.0.{idx}.0/24",
+                    "availabilityZone": f"us-east-1{zone}",
+                    "routeTableId": f"rtb-{idx}",
+                }
+                for idx, zone in enumerate("ab")
+            ],
+        }
+    ],
+}
+
+
+def _build(app: App) -> RdsStack:
+    config = confs.RdsConfig(
+        vpc_id="vpc-12345678",
+        stack_name="TestRds",
+        env="test",
+        account="123456789012",
+        region="us-east-1",
+    )
+    env = Environment(account=config.account, region=config.region)
+    return RdsStack(app, config, env=env)
+
+
+def test_lookup_provider_serves_context(tmp_path):
+    # Without a fixture the lookup falls back to dummy values
+    offline = App(outdir=str(tmp_path / "offline"))
+    _build(offline)
+    offline.synth()
+    (vpc_key,) = [
+        key
+        for key in missing_lookups(tmp_path / "offline")
+        if key.startswith("vpc-provider")
+    ]
+
+    # Record what the CLI would have written to cdk.context.json
+    context_file = tmp_path / "cdk.context.json"
+    context_file.write_text(
+        json.dumps({vpc_key: VPC, "@aws-cdk/core:newStyleStackSynthesis": 1})
+    )
+    fetched_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    lookups = FileLookupProvider(tmp_path / "lookups.json")
+    assert lookups.record(context_file, now=fetched_at) == [vpc_key]
+
+    lookups = FileLookupProvider(tmp_path / "lookups.json")
+    app = lookups.app(outdir=str(tmp_path / "fixture"))
+    stack = _build(app)
+    app.synth()
+
+    assertions.Template.from_stack(stack).has_resource_properties(
+        "AWS::RDS::DBSubnetGroup", {"SubnetIds": ["subnet-0", "subnet-1"]}
+    )
+    report = lookups.report(
+        tmp_path / "fixture",
+        max_age=timedelta(days=30),
+        now=fetched_at + timedelta(days=31),
+    )
+    assert vpc_key not in report.missing
+    assert report.stale == [vpc_key]
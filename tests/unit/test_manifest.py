@@ -0,0 +1,68 @@
+import json
+
+import pytest
+from nimbus_lib import config as confs
+
+MANIFEST = {
+    "defaults": {"account": "012345678910", "region": "us-east-1"},
+    "environments": {
+        "dev": {"defaults": {"vpc_id": "vpc-dev"}},
+        "staging": {"extends": "dev"},
+        "prod": {"extends": "staging", "defaults": {"vpc_id": "vpc-prod"}},
+    },
+    "stacks": [
+        {"kind": "vpc", "stack_name": "Network"},
+        {
+            "kind": "fargate",
+            "stack_name": "Api",
+            "container": {"port": 8080, "image": "someuser/api"},
+            "environments": {
+                "staging": {"scaling": {"max_task_count": 4}},
+                "prod": {"container": {"tag": "1.2.3"}},
+            },
+        },
+    ],
+}
+
+
+def test_manifest_inherits_between_environments(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("REGION=eu-west-1\nKEY_PAIR_NAME=unused\n")
+    path = tmp_path / "stacks.json"
+    path.write_text(json.dumps(MANIFEST))
+
+    configs = confs.Manifest.from_file(path, env_file=str(env_file))
+    dev_vpc, dev_api = configs.configs("dev")
+    prod_vpc, prod_api = configs.configs("prod")
+
+    assert isinstance(dev_vpc, confs.VpcConfig)
+    assert isinstance(dev_api, confs.FargateConfig)
+    assert isinstance(prod_api, confs.FargateConfig)
+    assert dev_vpc.construct_id == "DevNetwork"
+    assert prod_api.construct_id == "ProdApi"
+
+    # Manifest defaults win over the env file
+    assert dev_api.region == "us-east-1"
+    assert dev_api.vpc_id == "vpc-dev"
+    assert prod_api.vpc_id == "vpc-prod"
+
+    # prod inherits staging's override and adds its own
+    assert dev_api.scaling.max_task_count == 2
+    assert prod_api.scaling.max_task_count == 4
+    assert prod_api.container.tag == "1.2.3"
+    assert prod_api.container.port == 8080
+    assert prod_vpc.account == "012345678910"
+
+    assert set(configs.all_configs()) == {"dev", "staging", "prod"}
+
+
+def test_manifest_rejects_bad_entries():
+    with pytest.raises(ValueError):
+        confs.Manifest({"stacks": [{"kind": "lambda", "stack_name": "X"}]})
+
+    cyclic = confs.Manifest(
+        {"environments": {"a": {"extends": "b"}, "b": {"extends": "a"}}},
+        env_file=None,
+    )
+    with pytest.raises(ValueError):
+        cyclic.configs("a")
@@ -0,0 +1,82 @@
+import json
+import subprocess
+import sys
+import textwrap
+
+from nimbus_lib import config as confs
+from nimbus_lib.synth import ParallelSynth
+
+
+def test_parallel_synth_merges_assembly(tmp_path):
+    synth = ParallelSynth(outdir=tmp_path / "cdk.out", workers=2)
+    for name in ("One", "Two", "Three"):
+        synth.add(
+            confs.VpcConfig(
+                stack_name=name, env="test", account="fake", region="us-east-1"
+            )
+        )
+    report = synth.synth()
+
+    outdir = tmp_path / "cdk.out"
+    manifest = json.loads((outdir / "manifest.json").read_text())
+    stacks = {
+        artifact_id
+        for artifact_id, artifact in manifest["artifacts"].items()
+        if artifact["type"] == "aws:cloudformation:stack"
+    }
+    assert stacks == {"TestOne", "TestTwo", "TestThree"}
+    assert "Tree" in manifest["artifacts"]
+    tree = json.loads((outdir / "tree.json").read_text())
+    assert stacks <= set(tree["tree"]["children"])
+    for artifact_id in stacks:
+        assert (outdir / f"{artifact_id}.template.json").is_file()
+        assert (outdir / f"{artifact_id}.assets.json").is_file()
+
+    assert {t.artifact_id for t in report.stacks} == stacks
+    assert not (outdir / ".parallel").exists()
+
+
+APP_SCRIPT = """
+from nimbus_lib import config as confs
+from nimbus_lib.synth import ParallelSynth
+
+def main():
+    synth = ParallelSynth(outdir="cdk.out", workers=1)
+    synth.add(
+        confs.VpcConfig(
+            stack_name="One", env="test", account="fake", region="us-east-1"
+        )
+    )
+    synth.synth()
+"""
+
+
+def _run_app(tmp_path, entry_point: str) -> subprocess.CompletedProcess:
+    # Workers re-import the script that started the parent, like an app.py
+    # run by the CDK CLI
+    script = tmp_path / "app.py"
+    script.write_text(APP_SCRIPT + textwrap.dedent(entry_point))
+    return subprocess.run(
+        [sys.executable, str(script)],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+
+
+def test_parallel_synth_from_script(tmp_path):
+    result = _run_app(
+        tmp_path,
+        """
+        if __name__ == "__main__":
+            main()
+        """,
+    )
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / "cdk.out" / "TestOne.template.json").is_file()
+
+    # Without the guard every worker would rerun the app; fail instead
+    result = _run_app(tmp_path, "main()\n")
+    assert result.returncode != 0
+    assert "if __name__ == '__main__'" in result.stderr
@@ -1,4 +1,14 @@
-from aws_cdk import assertions, App, Environment
+import pytest
+from pydantic import ValidationError
+from aws_cdk import (
+    assertions,
+    App,
+    Environment,
+    RemovalPolicy,
+    aws_ec2 as ec2,
+    aws_rds as rds,
+)
+from nimbus_lib.stacks.fargate_stack import FargateStack
 from nimbus_lib.stacks.rds_stack import RdsStack
 from nimbus_lib import config as confs
 
@@ -21,3 +31,238 @@ def test_rds_stack_created():
         "AWS::RDS::DBInstance",
         {"Engine": "postgres", "PubliclyAccessible": False},
     )
+
+
+def test_rds_config_accepts_cdk_values():
+    config = confs.RdsConfig(
+        vpc_id="fake",
+        stack_name="TestRds",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        # CDK members are accepted and stored by name
+        instance_type=confs.Ec2Config(
+            size=ec2.InstanceSize.SMALL,  # pyright: ignore
+            type_=ec2.InstanceClass.T4G,  # pyright: ignore
+        ),
+        engine_version=rds.PostgresEngineVersion.VER_14_7,
+        removal_policy=RemovalPolicy.DESTROY,  # pyright: ignore
+        subnet_type="private_with_egress",  # pyright: ignore
+    )
+    assert config.instance_type.size == "SMALL"
+    assert config.engine_version == "14.7"
+    assert config.removal_policy == "DESTROY"
+    assert config.subnet_type == "PRIVATE_WITH_EGRESS"
+
+    with pytest.raises(ValidationError):
+        confs.RdsConfig(
+            vpc_id="fake",
+            stack_name="TestRds",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            subnet_type="NOT_A_SUBNET_TYPE",  # pyright: ignore
+        )
+
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = RdsStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {"DBInstanceClass": "db.t4g.small", "EngineVersion": "14.7"},
+    )
+    template.has_resource("AWS::RDS::DBInstance", {"DeletionPolicy": "Delete"})
+
+
+def test_rds_stack_proxy():
+    config = confs.RdsConfig(
+        vpc_id="fake",
+        stack_name="TestRds",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        proxy=confs.ProxyConfig(borrow_timeout=30, max_connections_percent=80),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = RdsStack(app, config, env=env)
+
+    ingress = stack.ingress_config()
+    assert ingress.port == 5432
+    fargate_config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        ingress_confs=[ingress],
+    )
+    fargate = FargateStack(app, fargate_config, env=env)
+
+    template = assertions.Template.from_stack(stack)
+    template.has_resource_properties(
+        "AWS::RDS::DBProxy", {"EngineFamily": "POSTGRESQL", "RequireTLS": True}
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {
+            "ConnectionPoolConfigurationInfo": {
+                "ConnectionBorrowTimeout": 30,
+                "MaxConnectionsPercent": 80,
+            }
+        },
+    )
+    assertions.Template.from_stack(fargate).has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "FromPort": 5432,
+            "GroupId": {"Fn::ImportValue": assertions.Match.any_value()},
+        },
+    )
+
+
+def test_rds_stack_storage_and_replicas():
+    config = confs.RdsConfig(
+        vpc_id="fake",
+        stack_name="TestRds",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        allocated_storage=100,
+        max_allocated_storage=500,
+        storage_type="GP3",
+        iops=12000,
+        storage_throughput=500,
+        performance_insights=True,
+        read_replicas=[
+            confs.ReadReplicaConfig(availability_zone="us-east-1b"),
+            confs.ReadReplicaConfig(
+                instance_type=confs.Ec2Config(size="LARGE", type_="R6G")
+            ),
+        ],
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = RdsStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "AllocatedStorage": "100",
+            "MaxAllocatedStorage": 500,
+            "StorageType": "gp3",
+            "Iops": 12000,
+            "StorageThroughput": 500,
+            "EnablePerformanceInsights": True,
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "SourceDBInstanceIdentifier": assertions.Match.any_value(),
+            "AvailabilityZone": "us-east-1b",
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "SourceDBInstanceIdentifier": assertions.Match.any_value(),
+            "DBInstanceClass": "db.r6g.large",
+        },
+    )
+    assert len(stack.read_replicas) == 2
+
+    with pytest.raises(ValueError):
+        confs.RdsConfig(
+            vpc_id="fake",
+            stack_name="TestRds",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            storage_throughput=500,
+        )
+
+
+def test_rds_stack_aurora_serverless():
+    config = confs.RdsConfig(
+        vpc_id="fake",
+        stack_name="TestRds",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        aurora=confs.AuroraConfig(min_capacity=0.5, max_capacity=8, readers=2),
+        proxy=confs.ProxyConfig(),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = RdsStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::RDS::DBCluster", 1)
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {
+            "Engine": "aurora-postgresql",
+            "EngineVersion": "15.3",
+            "ServerlessV2ScalingConfiguration": {
+                "MinCapacity": 0.5,
+                "MaxCapacity": 8,
+            },
+        },
+    )
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance", {"DBInstanceClass": "db.serverless"}, 3
+    )
+    template.has_output(
+        "*",
+        {
+            "Value": {
+                "Fn::GetAtt": [
+                    assertions.Match.any_value(),
+                    "ReadEndpoint.Address",
+                ]
+            }
+        },
+    )
+    assert stack.cluster is not None and stack.instance is None
+    assert stack.ingress_config().port == 5432
+
+    with pytest.raises(ValueError):
+        confs.RdsConfig(
+            vpc_id="fake",
+            stack_name="TestRds",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            aurora=confs.AuroraConfig(engine="mysql"),
+        )
+
+
+def test_rds_stack_aurora_mysql():
+    config = confs.RdsConfig(
+        vpc_id="fake",
+        stack_name="TestRds",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        engine_version="8.0.mysql_aurora.3.04.0",
+        aurora=confs.AuroraConfig(engine="mysql"),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = RdsStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    # The parameter group family uses the "8.0" major version
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {
+            "Engine": "aurora-mysql",
+            "EngineVersion": "8.0.mysql_aurora.3.04.0",
+            "DBClusterParameterGroupName": "default.aurora-mysql8.0",
+        },
+    )
@@ -0,0 +1,220 @@
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+from aws_cdk import assertions, App, Environment
+from nimbus_lib.stacks.fargate_stack import FargateStack
+from nimbus_lib.stacks.shared_alb_stack import SharedAlbStack
+from nimbus_lib import config as confs
+
+
+def test_shared_alb_stack_routes_services():
+    shared_config = confs.SharedAlbConfig(
+        stack_name="TestSharedAlb",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        domains=[confs.DomainConfig(domain="example.com")],
+    )
+    app = App()
+    env = Environment(account=shared_config.account, region="us-east-1")
+    shared = SharedAlbStack(app, shared_config, env=env)
+
+    services = []
+    for idx, routing in enumerate(
+        [
+            confs.RoutingConfig(priority=10, hosts=["api.example.com"]),
+            confs.RoutingConfig(priority=20, paths=["/static/*"]),
+        ]
+    ):
+        config = confs.FargateConfig(
+            stack_name=f"TestService{idx}",
+            env="test",
+            account="fake",
+            region="us-east-1",
+            vpc_id="fake",
+            container=confs.ContainerConfig(port=80, image="fake"),
+            routing=routing,
+        )
+        services.append(FargateStack(app, config, shared=shared, env=env))
+
+    shared_template = assertions.Template.from_stack(shared)
+    shared_template.resource_count_is(
+        "AWS::ElasticLoadBalancingV2::LoadBalancer", 1
+    )
+    shared_template.resource_count_is("AWS::ECS::Cluster", 1)
+    shared_template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::Listener",
+        {
+            "Port": 80,
+            "DefaultActions": [
+                assertions.Match.object_like({"Type": "fixed-response"})
+            ],
+        },
+    )
+
+    api = assertions.Template.from_stack(services[0])
+    api.resource_count_is("AWS::ElasticLoadBalancingV2::LoadBalancer", 0)
+    api.resource_count_is("AWS::ECS::Cluster", 0)
+    api.resource_count_is("AWS::ElasticLoadBalancingV2::ListenerRule", 2)
+    api.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::ListenerRule",
+        {
+            "Priority": 10,
+            "Conditions": [
+                {
+                    "Field": "host-header",
+                    "HostHeaderConfig": {"Values": ["api.example.com"]},
+                }
+            ],
+        },
+    )
+
+    static = assertions.Template.from_stack(services[1])
+    static.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::ListenerRule",
+        {
+            "Priority": 20,
+            "Conditions": [
+                {
+                    "Field": "path-pattern",
+                    "PathPatternConfig": {"Values": ["/static/*"]},
+                }
+            ],
+        },
+    )
+
+
+def test_shared_alb_stack_rejects_service_alb_settings():
+    rejected: list[dict[str, Any]] = [
+        {"public_access": True},
+        {"ip_allowlist": ["10.0.0.0/8"]},
+        {"idle_timeout": 300},
+        {"redirect_http": True},
+        {"ssl_policy": "RECOMMENDED_TLS"},
+    ]
+    for settings in rejected:
+        with pytest.raises(ValidationError, match="shared load balancer"):
+            confs.FargateConfig(
+                stack_name="TestService",
+                env="test",
+                account="fake",
+                region="us-east-1",
+                vpc_id="fake",
+                container=confs.ContainerConfig(port=80, image="fake"),
+                routing=confs.RoutingConfig(priority=10, paths=["/*"]),
+                **settings,
+            )
+
+
+def test_shared_alb_stack_grpc_needs_https_listeners():
+    shared_config = confs.SharedAlbConfig(
+        stack_name="TestSharedAlb",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        domains=[confs.DomainConfig(domain="example.com")],
+    )
+    config = confs.FargateConfig(
+        stack_name="TestService",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        routing=confs.RoutingConfig(priority=10, paths=["/*"]),
+        protocol_version="GRPC",
+    )
+    app = App()
+    env = Environment(account=shared_config.account, region="us-east-1")
+    shared = SharedAlbStack(app, shared_config, env=env)
+
+    # The shared HTTP listener forwards too, so GRPC can't attach
+    with pytest.raises(ValueError, match="HTTPS listeners"):
+        FargateStack(app, config, shared=shared, env=env)
+
+    app = App()
+    redirecting = SharedAlbStack(
+        app,
+        shared_config.model_copy(update={"redirect_http": True}),
+        env=env,
+    )
+    service = FargateStack(app, config, shared=redirecting, env=env)
+    assertions.Template.from_stack(service).resource_count_is(
+        "AWS::ElasticLoadBalancingV2::ListenerRule", 1
+    )
+
+
+def test_shared_alb_stack_service_cdn_origin_access():
+    shared_config = confs.SharedAlbConfig(
+        stack_name="TestSharedAlb",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        domains=[confs.DomainConfig(domain="example.com")],
+    )
+    config = confs.FargateConfig(
+        stack_name="TestService",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        domains=[
+            confs.DomainConfig(domain="example.com", cdn=confs.CdnConfig())
+        ],
+        routing=confs.RoutingConfig(priority=10),
+    )
+    app = App()
+    env = Environment(account=shared_config.account, region="us-east-1")
+    shared = SharedAlbStack(app, shared_config, env=env)
+    service = FargateStack(app, config, shared=shared, env=env)
+
+    # The rule lives in the service stack so the shared stack never
+    # depends on it
+    assertions.Template.from_stack(shared).resource_count_is("Custom::AWS", 0)
+    assertions.Template.from_stack(service).has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "FromPort": 80,
+            "SourcePrefixListId": {
+                "Fn::GetAtt": [
+                    assertions.Match.any_value(),
+                    "PrefixLists.0.PrefixListId",
+                ]
+            },
+        },
+    )
+
+
+def test_shared_alb_stack_service_cdn_with_redirect_http():
+    shared_config = confs.SharedAlbConfig(
+        stack_name="TestSharedAlb",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        domains=[confs.DomainConfig(domain="example.com")],
+        redirect_http=True,
+    )
+    config = confs.FargateConfig(
+        stack_name="TestService",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        domains=[
+            confs.DomainConfig(domain="example.com", cdn=confs.CdnConfig())
+        ],
+        routing=confs.RoutingConfig(priority=10),
+    )
+    app = App()
+    env = Environment(account=shared_config.account, region="us-east-1")
+    shared = SharedAlbStack(app, shared_config, env=env)
+
+    with pytest.raises(ValueError, match="HTTPS_ONLY"):
+        FargateStack(app, config, shared=shared, env=env)
@@ -0,0 +1,70 @@
+import json
+
+from aws_cdk import App
+from nimbus_lib import config as confs
+from nimbus_lib.stacks.vpc_stack import VpcStack
+from nimbus_lib.synth import SynthCache
+
+
+def _config(max_azs: int = 2) -> confs.VpcConfig:
+    # No account/region lookups, so synth never reports missing context
+    return confs.VpcConfig(
+        stack_name="TestVpc",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        max_azs=max_azs,
+    )
+
+
+def test_synth_cache_reuses_templates(tmp_path):
+    cache = SynthCache(tmp_path / "cache")
+
+    first = App(outdir=str(tmp_path / "first"))
+    assert cache.add(first, VpcStack, _config()) is not None
+    cache.synth(first)
+    assert cache.report.misses == ["TestTestVpc"]
+
+    cache = SynthCache(tmp_path / "cache")
+    second = App(outdir=str(tmp_path / "second"))
+    assert cache.add(second, VpcStack, _config()) is None
+    assembly = cache.synth(second)
+    assert cache.report.hits == ["TestTestVpc"]
+
+    template = tmp_path / "second" / "TestTestVpc.template.json"
+    original = tmp_path / "first" / "TestTestVpc.template.json"
+    assert template.read_text() == original.read_text()
+    manifest = json.loads((tmp_path / "second" / "manifest.json").read_text())
+    assert "TestTestVpc" in manifest["artifacts"]
+    assert assembly.directory == str(tmp_path / "second")
+
+    # A config change is a miss, and invalidation drops the entry
+    assert cache.add(App(), VpcStack, _config(max_azs=3)) is not None
+    cache.invalidate(VpcStack, _config())
+    assert cache.add(App(), VpcStack, _config()) is not None
+
+
+def test_synth_cache_key_covers_package_source(monkeypatch, tmp_path):
+    from pathlib import Path
+    from nimbus_lib.synth import cache as cache_module
+
+    cache = SynthCache(tmp_path / "cache")
+    before = cache.key(VpcStack, _config())
+
+    # Config helpers are not in VpcStack's MRO but still shape its template
+    read_bytes = Path.read_bytes
+
+    def edited(path: Path) -> bytes:
+        content = read_bytes(path)
+        if path.name == "components.py":
+            content += b"\n# edited\n"
+        return content
+
+    monkeypatch.setattr(Path, "read_bytes", edited)
+    cache_module._package_digest.cache_clear()
+    try:
+        assert cache.key(VpcStack, _config()) != before
+    finally:
+        monkeypatch.undo()
+        cache_module._package_digest.cache_clear()
+    assert cache.key(VpcStack, _config()) == before
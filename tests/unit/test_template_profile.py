@@ -0,0 +1,42 @@
+from aws_cdk import App, Environment
+from nimbus_lib import config as confs
+from nimbus_lib.stacks.fargate_stack import FargateStack
+from nimbus_lib.synth import PROFILE_CONTEXT, profile_stack
+
+
+def test_template_profile(tmp_path):
+    config = confs.FargateConfig(
+        stack_name="TestFargate",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        vpc_id="fake",
+        container=confs.ContainerConfig(port=80, image="fake"),
+        domains=[
+            confs.DomainConfig(domain="example.com", subdomain=f"app{idx}")
+            for idx in range(3)
+        ],
+        nesting=confs.NestingConfig(domains=2),
+    )
+    app = App(outdir=str(tmp_path), context={PROFILE_CONTEXT: True})
+    env = Environment(account=config.account, region=config.region)
+    stack = FargateStack(app, config, env=env)
+    app.synth()
+
+    profile = profile_stack(stack, tmp_path)
+    methods = {method.method: method for method in profile.methods}
+    assert sum(m.resources for m in profile.methods) == profile.resources
+    assert methods["load_balancer"].resources == 2
+    # Listeners, their certificates and service ingress from the ALB
+    assert methods["setup_listeners"].resources == 6
+    assert methods["fargate_security_groups"].resources == 2
+    assert methods["task_definition"].bytes > 0
+    assert methods["nested_scope"].resources == 1
+    assert "setup_domains" not in methods
+
+    (domains,) = profile.nested
+    assert [m.method for m in domains.methods] == ["setup_domains"]
+    # Three zones, certificates and alias records
+    assert domains.methods[0].resources == domains.resources == 9
+    assert profile.warnings() == []
+    assert profile.warnings(ratio=0) != []
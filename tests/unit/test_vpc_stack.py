@@ -18,3 +18,30 @@ def test_vpc_stack_created():
     template.has_resource_properties(
         "AWS::EC2::VPC", {"EnableDnsHostnames": True}
     )
+
+
+def test_vpc_stack_endpoints():
+    config = confs.VpcConfig(
+        stack_name="TestVpc",
+        env="test",
+        account="fake",
+        region="us-east-1",
+        max_azs=2,
+        nat_gateways=1,
+        gateway_endpoints=["S3"],
+        interface_endpoints=confs.VpcConfig.ecs_endpoints(),
+    )
+    app = App()
+    env = Environment(account=config.account, region=config.region)
+    stack = VpcStack(app, config, env=env)
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::EC2::NatGateway", 1)
+    template.has_resource_properties(
+        "AWS::EC2::VPCEndpoint", {"VpcEndpointType": "Gateway"}
+    )
+    template.resource_properties_count_is(
+        "AWS::EC2::VPCEndpoint",
+        {"VpcEndpointType": "Interface", "PrivateDnsEnabled": True},
+        4,
+    )